@@ -0,0 +1,150 @@
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import jwt
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+# Counters kept by VerifiedTokenCache and decode_token; services register
+# these (plus any of their own) with their metrics module
+AUTH_METRICS = ("auth.cache_hit", "auth.cache_miss", "auth.failed", "auth.decode.count", "auth.decode.total_us")
+
+
+class VerifiedTokenCache:
+    """
+    Thread-safe LRU of tokens that already passed verification, keyed by
+    the token's SHA-256 digest (the raw token is never stored). An entry
+    is only served until the token's own `exp`.
+
+    Auth counters are kept here as plain integers under the same lock, and
+    `drain()` hands them over at most every `flush_interval` seconds, so a
+    request costs no metrics round-trip.
+    """
+
+    def __init__(self, max_size, flush_interval=10):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self._entries = OrderedDict()  # digest -> (value, exp)
+        self._counts = Counter()
+        self._next_flush = time.monotonic() + flush_interval
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token):
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, digest):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None and entry[1] is not None and entry[1] <= time.time():
+                del self._entries[digest]
+                entry = None
+            if entry is None:
+                self._counts["auth.cache_miss"] += 1
+                return None
+            self._counts["auth.cache_hit"] += 1
+            self._entries.move_to_end(digest)
+            return entry[0]
+
+    def set(self, digest, value, exp):
+        with self._lock:
+            self._entries[digest] = (value, exp)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def drain(self, force=False):
+        """
+        Returns the counters gathered since the last drain and resets them;
+        an empty dict when the flush interval has not elapsed yet.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and now < self._next_flush:
+                return {}
+            self._next_flush = now + self.flush_interval
+            counts, self._counts = self._counts, Counter()
+        return counts
+
+    def flush(self, incr, force=False):
+        """Passes each counter due from `drain()` to `incr(name, amount)`."""
+        for name, amount in self.drain(force).items():
+            if amount:
+                incr(name, amount)
+
+
+def decode_token(token, secret_key, tokens):
+    """
+    Decodes a user-service JWT signed with `secret_key` and returns its
+    payload, raising AuthenticationFailed when it is expired, invalid or
+    carries no user_id. Failures and decode time are counted on `tokens`.
+    """
+    started = time.perf_counter()
+    try:
+        payload = jwt.decode(token, secret_key, algorithms=["HS256"])
+    except jwt.ExpiredSignatureError:
+        tokens.count("auth.failed")
+        raise AuthenticationFailed("Token has expired")
+    except jwt.InvalidTokenError:
+        tokens.count("auth.failed")
+        raise AuthenticationFailed("Invalid token")
+    finally:
+        tokens.count("auth.decode.count")
+        tokens.count("auth.decode.total_us", int((time.perf_counter() - started) * 1_000_000))
+
+    if not payload.get("user_id"):
+        tokens.count("auth.failed")
+        raise AuthenticationFailed("user_id not found")
+    return payload
+
+
+class TokenUser:
+    """
+    The caller identified by a JWT. Users live in user-service, so there is
+    no local row to load; views only need the id.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id):
+        self.id = self.pk = int(user_id)
+
+    def __str__(self):
+        return f"TokenUser({self.id})"
+
+
+class BearerAuthentication(BaseAuthentication):
+    """
+    Authenticates `Authorization: Bearer <token>` through `verify(token)`,
+    which subclasses implement to return the user id or raise
+    AuthenticationFailed. Requests without a bearer token stay anonymous.
+    `request.auth` is the raw token, for forwarding to other services.
+    """
+    keyword = b"bearer"
+
+    def verify(self, token):
+        raise NotImplementedError
+
+    def authenticate(self, request):
+        parts = get_authorization_header(request).split()
+        if not parts or parts[0].lower() != self.keyword:
+            return None
+        if len(parts) != 2:
+            raise AuthenticationFailed("Authorization header is missing or invalid")
+
+        token = parts[1].decode("latin-1")
+        return TokenUser(self.verify(token)), token
+
+    def authenticate_header(self, request):
+        # Makes DRF answer unauthenticated requests with 401 instead of 403
+        return "Bearer"
@@ -0,0 +1,47 @@
+import json
+
+import pika
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from .rabbitmq import connect_to_rabbitmq, peek_dead_letters, replay_dead_letters
+
+
+class DeadLettersCommand(BaseCommand):
+    """
+    Base of each service's `dead_letters` management command; subclasses
+    only set `example_queue` to one of their own queues for the help text.
+    """
+    help = 'Lists the dead-lettered messages of a consumer queue, or replays them into the queue'
+    example_queue = None
+
+    def add_arguments(self, parser):
+        parser.add_argument("queue", help=f"Consumer queue, e.g. {self.example_queue}")
+        parser.add_argument("--limit", type=int, default=None,
+                            help="Messages to show (default 20) or replay (default all)")
+        parser.add_argument("--replay", action="store_true",
+                            help="Move the messages back into the queue with a fresh retry budget")
+
+    def handle(self, *args, **options):
+        queue = options["queue"]
+        connection = connect_to_rabbitmq(pika.URLParameters(settings.RABBITMQ_URL))
+        try:
+            channel = connection.channel()
+            if options["replay"]:
+                replayed = replay_dead_letters(channel, queue, options["limit"])
+                self.stdout.write(f"Replayed {replayed} message(s) into {queue}.")
+                return
+
+            messages = peek_dead_letters(channel, queue, options["limit"] or 20)
+            for index, (properties, body) in enumerate(messages, start=1):
+                headers = properties.headers or {}
+                self.stdout.write(f"#{index} {headers.get('x-original-exchange')}/{headers.get('x-original-routing-key')}"
+                                  f" retries={headers.get('x-retry-count', 0)}")
+                self.stdout.write(f"   error: {headers.get('x-last-error')}")
+                try:
+                    self.stdout.write(f"   body:  {json.dumps(json.loads(body))}")
+                except ValueError:
+                    self.stdout.write(f"   body:  {body!r}")
+            self.stdout.write(f"{len(messages)} message(s) shown from {queue}.dead.")
+        finally:
+            connection.close()
@@ -0,0 +1,321 @@
+import json
+import logging
+import time
+
+import pika
+from django.conf import settings
+from django.db import DataError, IntegrityError, close_old_connections
+
+RETRY_COUNT_HEADER = "x-retry-count"
+
+logger = logging.getLogger(__name__)
+
+# Database errors caused by the message itself; retrying will not help
+BAD_DATA_ERRORS = (DataError, IntegrityError)
+
+
+class PermanentError(Exception):
+    """
+    Raised by a handler for a message that can never succeed (bad payload,
+    unknown reference...). It goes to the dead-letter queue without retries.
+    """
+
+
+def connect_to_rabbitmq(params, retries=5, delay=5):
+    for attempt in range(1, retries + 1):
+        try:
+            return pika.BlockingConnection(params)
+        except pika.exceptions.AMQPConnectionError:
+            logger.warning("RabbitMQ connection failed (attempt %s/%s), retrying in %ss", attempt, retries, delay)
+            time.sleep(delay)
+    raise Exception("[x] Could not connect to RabbitMQ after multiple retries.")
+
+
+class Consumer:
+    """
+    Consumes `queue` with bounded retries and a dead-letter queue, so a
+    failing message never blocks the ones behind it.
+
+    A message whose handler raises is acked and re-published to a retry
+    queue `<queue>.retry.<delay>ms`. That queue has no consumer, and its
+    TTL dead-letters the message back into `queue` after the delay. Each
+    entry of `retry_delays` (milliseconds) is one more attempt. After the
+    last one, or right away for PermanentError and undecodable JSON, the
+    message goes to DEAD_LETTER_EXCHANGE and lands in `<queue>.dead`. The
+    `dead_letters` management command lists and replays it from there.
+    """
+
+    def __init__(self, queue, exchange=None, routing_key=None, exchange_type="topic", retry_delays=None):
+        self.queue = queue
+        self.exchange = exchange
+        self.routing_key = routing_key
+        self.exchange_type = exchange_type
+        self.retry_delays = list(settings.CONSUMER_RETRY_DELAYS_MS if retry_delays is None else retry_delays)
+        self.dead_letter_exchange = settings.DEAD_LETTER_EXCHANGE
+
+    def retry_queue(self, attempt):
+        return f"{self.queue}.retry.{self.retry_delays[attempt]}ms"
+
+    @property
+    def dead_letter_queue(self):
+        return f"{self.queue}.dead"
+
+    def connect(self):
+        connection = connect_to_rabbitmq(pika.URLParameters(settings.RABBITMQ_URL))
+        channel = connection.channel()
+        self.declare(channel)
+        # Retries are re-published before the original is acked; confirms
+        # make sure the broker has them first
+        channel.confirm_delivery()
+        return connection, channel
+
+    def declare(self, channel):
+        channel.queue_declare(queue=self.queue, durable=True)
+        if self.exchange:
+            channel.exchange_declare(exchange=self.exchange, exchange_type=self.exchange_type, durable=True)
+            channel.queue_bind(queue=self.queue, exchange=self.exchange, routing_key=self.routing_key)
+
+        for attempt, delay in enumerate(self.retry_delays):
+            channel.queue_declare(queue=self.retry_queue(attempt), durable=True, arguments={
+                "x-message-ttl": delay,
+                "x-dead-letter-exchange": "",
+                "x-dead-letter-routing-key": self.queue,
+            })
+
+        channel.exchange_declare(exchange=self.dead_letter_exchange, exchange_type="direct", durable=True)
+        channel.queue_declare(queue=self.dead_letter_queue, durable=True)
+        channel.queue_bind(queue=self.dead_letter_queue, exchange=self.dead_letter_exchange, routing_key=self.queue)
+
+    def fail(self, channel, method, properties, body, error, permanent=False):
+        """
+        Re-publishes a failed message to its next retry queue, or to the
+        dead-letter exchange once retries are used up. The caller acks the
+        original afterwards. Returns True when the message was dead-lettered.
+        """
+        headers = dict(properties.headers or {})
+        attempt = int(headers.get(RETRY_COUNT_HEADER, 0))
+        headers["x-last-error"] = f"{type(error).__name__}: {error}"[:1000]
+        # A retried message comes back through the default exchange, so
+        # remember where it was first published
+        headers.setdefault("x-original-exchange", method.exchange)
+        headers.setdefault("x-original-routing-key", method.routing_key)
+
+        dead = permanent or attempt >= len(self.retry_delays)
+        if dead:
+            headers["x-dead-lettered-at"] = int(time.time())
+            exchange, routing_key = self.dead_letter_exchange, self.queue
+        else:
+            headers[RETRY_COUNT_HEADER] = attempt + 1
+            exchange, routing_key = "", self.retry_queue(attempt)
+
+        channel.basic_publish(
+            exchange=exchange,
+            routing_key=routing_key,
+            body=body,
+            properties=pika.BasicProperties(
+                content_type=properties.content_type,
+                delivery_mode=2,
+                message_id=properties.message_id,
+                headers=headers,
+            ),
+        )
+        if dead:
+            logger.error("Message from %s dead-lettered after %s retries: %s", self.queue, attempt, headers["x-last-error"])
+        else:
+            logger.warning("Message from %s failed, retry %s/%s in %sms: %s", self.queue, attempt + 1,
+                           len(self.retry_delays), self.retry_delays[attempt], headers["x-last-error"])
+        return dead
+
+    def on_message(self, handler):
+        """A pika callback running `handler(data)` on each decoded message."""
+        def callback(ch, method, properties, body):
+            try:
+                data = json.loads(body)
+            except ValueError as e:
+                self.fail(ch, method, properties, body, e, permanent=True)
+            else:
+                try:
+                    handler(data)
+                except PermanentError as e:
+                    self.fail(ch, method, properties, body, e, permanent=True)
+                except Exception as e:
+                    self.fail(ch, method, properties, body, e)
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+        return callback
+
+    def run(self, handler, prefetch_count=1):
+        connection, channel = self.connect()
+        channel.basic_qos(prefetch_count=prefetch_count)
+        channel.basic_consume(queue=self.queue, on_message_callback=self.on_message(handler))
+        logger.info("Waiting for messages on %s", self.queue)
+        channel.start_consuming()
+
+    def run_batched(self, parse, store, batch_size, max_wait, batcher_class=None):
+        """
+        Consumes in batches: `parse(data)` validates each message as it
+        arrives (raising PermanentError for a bad one) and `store(items)`
+        writes up to `batch_size` parsed messages at once, or whatever
+        arrived within `max_wait` seconds of the first. `batcher_class`
+        is a Batcher subclass adding service-specific metrics.
+        """
+        connection, channel = self.connect()
+        batch_size = max(1, batch_size)
+        batcher = (batcher_class or Batcher)(self, channel, parse, store, batch_size, max_wait)
+        # Room for the batch being filled plus the next one in flight
+        channel.basic_qos(prefetch_count=batch_size * 2)
+        channel.basic_consume(queue=self.queue, on_message_callback=batcher.on_message)
+
+        logger.info("Waiting for messages on %s (batches of up to %s)", self.queue, batch_size)
+        while True:
+            connection.process_data_events(time_limit=batcher.time_left())
+            if batcher.time_left() == 0:
+                batcher.flush()
+
+
+class Batcher:
+    """
+    Buffers a consumer's messages and stores them together. A batch is
+    settled with a single multi-ack. If storing the batch fails, its
+    messages are stored one at a time so that only the failing ones go to
+    the retry or dead-letter queues. With batch_size=1 every message is
+    stored and acked on its own.
+    """
+    # Raised by store() for a message that can never be stored
+    permanent_errors = (PermanentError, *BAD_DATA_ERRORS)
+
+    def __init__(self, consumer, channel, parse, store, batch_size, max_wait):
+        self.consumer = consumer
+        self.channel = channel
+        self.parse = parse
+        self.store = store
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._pending = []  # (method, properties, body, item)
+        self._first_at = None
+
+    def on_message(self, ch, method, properties, body):
+        try:
+            item = self.parse(json.loads(body))
+        except (ValueError, PermanentError) as e:
+            # Malformed messages can never succeed; dead-letter before batching
+            self.fail(method, properties, body, e, permanent=True)
+            self.channel.basic_ack(delivery_tag=method.delivery_tag)
+            return
+
+        if not self._pending:
+            self._first_at = time.monotonic()
+        self._pending.append((method, properties, body, item))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def time_left(self):
+        """Seconds until the pending batch is due; None when nothing is pending."""
+        if not self._pending:
+            return None
+        return max(0.0, self._first_at + self.max_wait - time.monotonic())
+
+    def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        waited = time.monotonic() - self._first_at
+
+        # Drop a connection broken by an earlier batch so this one reconnects
+        close_old_connections()
+        started = time.monotonic()
+        try:
+            self.store([item for _, _, _, item in batch])
+            failed = 0
+        except Exception as e:
+            logger.warning("Batch of %d message(s) from %s failed (%s); storing them one by one",
+                           len(batch), self.consumer.queue, e)
+            failed = self.store_individually(batch)
+
+        # Failed messages were re-published to a retry or dead-letter queue,
+        # so the whole batch is settled with one ack
+        self.channel.basic_ack(delivery_tag=batch[-1][0].delivery_tag, multiple=True)
+        self.flushed(len(batch), failed, waited, time.monotonic() - started)
+
+    def store_individually(self, batch):
+        """Stores the messages of a failed batch one by one; returns how many failed again."""
+        failed = 0
+        for method, properties, body, item in batch:
+            close_old_connections()
+            try:
+                self.store([item])
+            except self.permanent_errors as e:
+                self.fail(method, properties, body, e, permanent=True)
+                failed += 1
+            except Exception as e:
+                # Not the message's fault (e.g. the database is unreachable);
+                # try it again after a delay
+                self.fail(method, properties, body, e)
+                failed += 1
+        return failed
+
+    def fail(self, method, properties, body, error, permanent=False):
+        """Hands one message to the consumer's retry or dead-letter queues; True when dead-lettered."""
+        return self.consumer.fail(self.channel, method, properties, body, error, permanent=permanent)
+
+    def flushed(self, size, failed, waited, took):
+        """Called after each batch with its size, failures, wait and store time in seconds."""
+        logger.info("Stored %d/%d message(s) from %s in %.0fms", size - failed, size, self.consumer.queue, took * 1000)
+
+
+def peek_dead_letters(channel, queue, limit):
+    """
+    Returns up to `limit` (properties, body) pairs from the dead-letter
+    queue of `queue` without removing them: they stay unacked while being
+    read and are requeued in place afterwards.
+    """
+    messages = []
+    try:
+        while len(messages) < limit:
+            method, properties, body = channel.basic_get(queue=f"{queue}.dead")
+            if method is None:
+                break
+            messages.append((properties, body))
+    finally:
+        if messages:
+            channel.basic_nack(delivery_tag=0, multiple=True, requeue=True)
+    return messages
+
+
+def replay_dead_letters(channel, queue, limit=None):
+    """
+    Moves up to `limit` messages from the dead-letter queue of `queue` back
+    into `queue` with a fresh retry budget. Only messages present when the
+    replay starts are moved, so ones that fail again are not replayed twice.
+    """
+    dead_letter_queue = f"{queue}.dead"
+    pending = channel.queue_declare(queue=dead_letter_queue, durable=True, passive=True).method.message_count
+    if limit is not None:
+        pending = min(pending, limit)
+
+    channel.confirm_delivery()
+    replayed = 0
+    while replayed < pending:
+        method, properties, body = channel.basic_get(queue=dead_letter_queue)
+        if method is None:
+            break
+        headers = {
+            key: value for key, value in (properties.headers or {}).items()
+            if key not in (RETRY_COUNT_HEADER, "x-dead-lettered-at")
+        }
+        headers["x-replayed-at"] = int(time.time())
+        # Straight to the queue, not the original exchange: other services
+        # bound to it already handled the message
+        channel.basic_publish(
+            exchange="",
+            routing_key=queue,
+            body=body,
+            properties=pika.BasicProperties(
+                content_type=properties.content_type,
+                delivery_mode=2,
+                message_id=properties.message_id,
+                headers=headers,
+            ),
+        )
+        channel.basic_ack(delivery_tag=method.delivery_tag)
+        replayed += 1
+    return replayed
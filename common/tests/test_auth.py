@@ -0,0 +1,114 @@
+import time
+import unittest
+from unittest import mock
+
+import jwt
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+
+from hackmate_common.auth import BearerAuthentication, TokenUser, VerifiedTokenCache, decode_token
+
+SECRET = "shared-test-secret-of-32-bytes!!"
+
+
+def make_token(**claims):
+    now = int(time.time())
+    return jwt.encode({"user_id": 9, "iat": now, "exp": now + 3600, **claims}, SECRET, algorithm="HS256")
+
+
+class VerifiedTokenCacheTests(unittest.TestCase):
+    def test_hit_and_miss(self):
+        tokens = VerifiedTokenCache(max_size=10)
+        digest = VerifiedTokenCache.digest("token")
+        self.assertIsNone(tokens.get(digest))
+        tokens.set(digest, 7, exp=None)
+        self.assertEqual(tokens.get(digest), 7)
+        self.assertEqual(tokens.drain(force=True), {"auth.cache_miss": 1, "auth.cache_hit": 1})
+        self.assertEqual(tokens.drain(force=True), {})
+
+    def test_least_recently_used_is_evicted_at_max_size(self):
+        tokens = VerifiedTokenCache(max_size=3)
+        digests = [VerifiedTokenCache.digest(f"token-{i}") for i in range(4)]
+        for user_id, digest in enumerate(digests[:3]):
+            tokens.set(digest, user_id, exp=None)
+        tokens.get(digests[0])  # now the most recently used
+        tokens.set(digests[3], 3, exp=None)
+
+        self.assertIsNone(tokens.get(digests[1]))
+        self.assertEqual([tokens.get(d) for d in (digests[0], digests[2], digests[3])], [0, 2, 3])
+
+    def test_entry_expires_at_token_exp(self):
+        tokens = VerifiedTokenCache(max_size=10)
+        digest = VerifiedTokenCache.digest("token")
+        now = time.time()
+        tokens.set(digest, 7, exp=now + 60)
+        with mock.patch("hackmate_common.auth.time.time", return_value=now + 59):
+            self.assertEqual(tokens.get(digest), 7)
+        with mock.patch("hackmate_common.auth.time.time", return_value=now + 60):
+            self.assertIsNone(tokens.get(digest))
+        # Gone for good, not just hidden
+        self.assertIsNone(tokens.get(digest))
+
+    def test_drain_waits_for_flush_interval(self):
+        tokens = VerifiedTokenCache(max_size=10, flush_interval=60)
+        tokens.count("auth.failed")
+        self.assertEqual(tokens.drain(), {})
+        self.assertEqual(tokens.drain(force=True), {"auth.failed": 1})
+
+    def test_flush_skips_zero_counters(self):
+        tokens = VerifiedTokenCache(max_size=10)
+        tokens.count("auth.failed", 2)
+        tokens.count("auth.revoked", 0)
+        incr = mock.Mock()
+        tokens.flush(incr, force=True)
+        incr.assert_called_once_with("auth.failed", 2)
+
+
+class DecodeTokenTests(unittest.TestCase):
+    def setUp(self):
+        self.tokens = VerifiedTokenCache(max_size=10)
+
+    def test_valid_token_returns_payload(self):
+        self.assertEqual(decode_token(make_token(), SECRET, self.tokens)["user_id"], 9)
+        counts = self.tokens.drain(force=True)
+        self.assertEqual(counts["auth.decode.count"], 1)
+        self.assertNotIn("auth.failed", counts)
+
+    def test_bad_tokens_fail_and_are_counted(self):
+        cases = [
+            (make_token(exp=int(time.time()) - 1), "Token has expired"),
+            ("not.a.jwt", "Invalid token"),
+            (jwt.encode({"user_id": 9}, "another-secret-of-32-bytes-long!", algorithm="HS256"), "Invalid token"),
+            (make_token(user_id=None), "user_id not found"),
+        ]
+        for token, message in cases:
+            with self.subTest(message=message), self.assertRaisesRegex(AuthenticationFailed, message):
+                decode_token(token, SECRET, self.tokens)
+        counts = self.tokens.drain(force=True)
+        self.assertEqual((counts["auth.failed"], counts["auth.decode.count"]), (4, 4))
+
+
+class BearerAuthenticationTests(unittest.TestCase):
+    class Authentication(BearerAuthentication):
+        def verify(self, token):
+            if token != "good":
+                raise AuthenticationFailed("Invalid token")
+            return "12"
+
+    def authenticate(self, header=None):
+        request = APIRequestFactory().get("/", **({"HTTP_AUTHORIZATION": header} if header else {}))
+        return self.Authentication().authenticate(request)
+
+    def test_bearer_token_is_verified(self):
+        user, token = self.authenticate("Bearer good")
+        self.assertIsInstance(user, TokenUser)
+        self.assertEqual((user.id, token), (12, "good"))
+
+    def test_requests_without_bearer_token_stay_anonymous(self):
+        self.assertIsNone(self.authenticate())
+        self.assertIsNone(self.authenticate("Basic dXNlcjpwYXNz"))
+
+    def test_bad_header_or_token_fails(self):
+        for header in ("Bearer", "Bearer good extra", "Bearer bad"):
+            with self.subTest(header=header), self.assertRaises(AuthenticationFailed):
+                self.authenticate(header)
@@ -0,0 +1,135 @@
+import json
+import unittest
+from unittest import mock
+
+import pika
+
+from hackmate_common.rabbitmq import RETRY_COUNT_HEADER, Batcher, Consumer, PermanentError
+
+
+def delivery(body, headers=None, tag=1):
+    method = mock.Mock(delivery_tag=tag, exchange="events", routing_key="user.created")
+    properties = pika.BasicProperties(content_type="application/json", message_id="m-1", headers=headers)
+    return method, properties, json.dumps(body).encode() if not isinstance(body, bytes) else body
+
+
+class ConsumerRetryTests(unittest.TestCase):
+    def setUp(self):
+        self.consumer = Consumer("orders", retry_delays=[1000, 5000])
+        self.channel = mock.Mock()
+
+    def deliver(self, handler, body=None, headers=None):
+        method, properties, body = delivery({"id": 1} if body is None else body, headers)
+        with self.assertLogs("hackmate_common.rabbitmq", level="WARNING"):
+            self.consumer.on_message(handler)(self.channel, method, properties, body)
+        self.channel.basic_ack.assert_called_once_with(delivery_tag=method.delivery_tag)
+        self.channel.basic_publish.assert_called_once()
+        return self.channel.basic_publish.call_args.kwargs
+
+    def test_retry_queues_are_declared_with_their_delay(self):
+        self.consumer.declare(self.channel)
+        declared = {call.kwargs["queue"]: call.kwargs.get("arguments") for call in self.channel.queue_declare.call_args_list}
+        self.assertEqual(declared["orders.retry.1000ms"]["x-message-ttl"], 1000)
+        self.assertEqual(declared["orders.retry.5000ms"]["x-dead-letter-routing-key"], "orders")
+        self.assertIn("orders.dead", declared)
+
+    def test_success_is_acked_without_republishing(self):
+        handler = mock.Mock()
+        method, properties, body = delivery({"id": 1})
+        self.consumer.on_message(handler)(self.channel, method, properties, body)
+        handler.assert_called_once_with({"id": 1})
+        self.channel.basic_publish.assert_not_called()
+        self.channel.basic_ack.assert_called_once_with(delivery_tag=1)
+
+    def test_failure_goes_to_the_next_retry_queue_with_a_higher_count(self):
+        handler = mock.Mock(side_effect=RuntimeError("database down"))
+        published = self.deliver(handler)
+        self.assertEqual((published["exchange"], published["routing_key"]), ("", "orders.retry.1000ms"))
+        headers = published["properties"].headers
+        self.assertEqual(headers[RETRY_COUNT_HEADER], 1)
+        self.assertEqual(headers["x-last-error"], "RuntimeError: database down")
+        self.assertEqual((headers["x-original-exchange"], headers["x-original-routing-key"]), ("events", "user.created"))
+
+        self.channel.reset_mock()
+        published = self.deliver(handler, headers=headers)
+        self.assertEqual(published["routing_key"], "orders.retry.5000ms")
+        self.assertEqual(published["properties"].headers[RETRY_COUNT_HEADER], 2)
+        # Where it was first published survives the trip through the retry queue
+        self.assertEqual(published["properties"].headers["x-original-exchange"], "events")
+
+    def test_failure_after_the_last_delay_is_dead_lettered(self):
+        handler = mock.Mock(side_effect=RuntimeError("still down"))
+        published = self.deliver(handler, headers={RETRY_COUNT_HEADER: 2})
+        self.assertEqual((published["exchange"], published["routing_key"]), ("dead-letters", "orders"))
+        self.assertIn("x-dead-lettered-at", published["properties"].headers)
+        self.assertEqual(published["properties"].headers[RETRY_COUNT_HEADER], 2)
+
+    def test_permanent_error_skips_retries(self):
+        handler = mock.Mock(side_effect=PermanentError("unknown user"))
+        published = self.deliver(handler)
+        self.assertEqual(published["exchange"], "dead-letters")
+        self.assertNotIn(RETRY_COUNT_HEADER, published["properties"].headers)
+        handler.assert_called_once()
+
+    def test_undecodable_body_is_dead_lettered_without_calling_the_handler(self):
+        handler = mock.Mock()
+        published = self.deliver(handler, body=b"{not json")
+        self.assertEqual(published["exchange"], "dead-letters")
+        self.assertEqual(published["body"], b"{not json")
+        handler.assert_not_called()
+
+    def test_no_retry_delays_means_dead_letter_on_first_failure(self):
+        self.consumer = Consumer("orders", retry_delays=[])
+        published = self.deliver(mock.Mock(side_effect=RuntimeError("boom")))
+        self.assertEqual(published["exchange"], "dead-letters")
+
+    def test_retry_delays_default_to_settings(self):
+        self.assertEqual(Consumer("orders").retry_delays, [1000, 5000])
+
+
+class BatcherTests(unittest.TestCase):
+    def setUp(self):
+        self.consumer = Consumer("orders", retry_delays=[1000])
+        self.channel = mock.Mock()
+        self.stored = []
+
+    def store(self, items):
+        if any(item["id"] < 0 for item in items):
+            raise PermanentError("negative id")
+        self.stored.append([item["id"] for item in items])
+
+    def batcher(self, batch_size):
+        return Batcher(self.consumer, self.channel, lambda data: data, self.store, batch_size, max_wait=60)
+
+    def test_full_batch_is_stored_at_once_and_settled_with_one_ack(self):
+        batcher = self.batcher(batch_size=3)
+        for tag in (1, 2, 3):
+            batcher.on_message(self.channel, *delivery({"id": tag}, tag=tag))
+        self.assertEqual(self.stored, [[1, 2, 3]])
+        self.channel.basic_ack.assert_called_once_with(delivery_tag=3, multiple=True)
+        self.assertIsNone(batcher.time_left())
+
+    def test_failed_batch_is_stored_one_by_one(self):
+        batcher = self.batcher(batch_size=10)
+        for tag, item_id in ((1, 1), (2, -1), (3, 3)):
+            batcher.on_message(self.channel, *delivery({"id": item_id}, tag=tag))
+        with self.assertLogs("hackmate_common.rabbitmq", level="WARNING"):
+            batcher.flush()
+        self.assertEqual(self.stored, [[1], [3]])
+        # Only the bad message is dead-lettered; the batch is still one ack
+        self.channel.basic_publish.assert_called_once()
+        self.assertEqual(self.channel.basic_publish.call_args.kwargs["exchange"], "dead-letters")
+        self.channel.basic_ack.assert_called_once_with(delivery_tag=3, multiple=True)
+
+    def test_partial_batch_waits_for_max_wait(self):
+        batcher = self.batcher(batch_size=10)
+        batcher.on_message(self.channel, *delivery({"id": 1}))
+        self.assertEqual(self.stored, [])
+        self.assertGreater(batcher.time_left(), 0)
+
+    def test_undecodable_message_is_dead_lettered_before_batching(self):
+        batcher = self.batcher(batch_size=10)
+        with self.assertLogs("hackmate_common.rabbitmq", level="WARNING"):
+            batcher.on_message(self.channel, *delivery(b"{not json", tag=7))
+        self.channel.basic_ack.assert_called_once_with(delivery_tag=7)
+        self.assertIsNone(batcher.time_left())
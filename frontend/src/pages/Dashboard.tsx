@@ -8,13 +8,23 @@ import { useNavigate } from "react-router-dom";
 import {
 	FETCH_TEAM_APPLICATIONS,
 	FETCH_NOTIFICATIONS,
+	FETCH_UNREAD_NOTIFICATION_COUNT,
+	NOTIFICATION_STREAM,
+	NOTIFICATION_STREAM_TICKET,
 	CREATE_JOIN_REQUEST,
 } from "../urls";
 
 const Dashboard = () => {
 	const { user, token } = useAuthContext();
 	const [applications, setApplications] = useState<any[]>([]);
+	const [applicationsCursor, setApplicationsCursor] = useState<
+		string | null
+	>(null);
 	const [notifications, setNotifications] = useState<any[]>([]);
+	const [notificationsCursor, setNotificationsCursor] = useState<
+		string | null
+	>(null);
+	const [unreadCount, setUnreadCount] = useState(0);
 	const [showModal, setShowModal] = useState(false);
 	const [selectedApp, setSelectedApp] = useState<any | null>(null);
 	const [message, setMessage] = useState("");
@@ -22,7 +32,8 @@ const Dashboard = () => {
 
 	const navigate = useNavigate();
 
-	const fetchApplications = async () => {
+	// Loads the newest page, or the page after `cursor` when given
+	const fetchApplications = async (cursor?: string) => {
 		try {
 			const res = await axios.get(
 				// "http://localhost:8002/api/team-applications/",
@@ -31,26 +42,36 @@ const Dashboard = () => {
 					headers: token
 						? { Authorization: `Bearer ${token}` }
 						: undefined,
+					params: cursor ? { cursor } : undefined,
 				}
 			);
-			setApplications(res.data);
+			setApplications((prev) =>
+				cursor ? [...prev, ...res.data.results] : res.data.results
+			);
+			setApplicationsCursor(res.data.next_cursor);
 		} catch (error) {
 			console.error("Failed to fetch applications:", error);
 		}
 	};
 
-	const fetchNotifications = async () => {
+	// Loads the newest page, or the page after `cursor` when given
+	const fetchNotifications = async (cursor?: string) => {
 		if (!user || !token) return;
 		try {
-			const res = await axios.get(
-				// "http://localhost:8003/api/notifications/",
-				FETCH_NOTIFICATIONS,
-				{
-					headers: { Authorization: `Bearer ${token}` },
-				}
+			const headers = { Authorization: `Bearer ${token}` };
+			const [res, unreadRes] = await Promise.all([
+				axios.get(
+					// "http://localhost:8003/api/notifications/",
+					FETCH_NOTIFICATIONS,
+					{ headers, params: cursor ? { cursor } : undefined }
+				),
+				axios.get(FETCH_UNREAD_NOTIFICATION_COUNT, { headers }),
+			]);
+			setNotifications((prev) =>
+				cursor ? [...prev, ...res.data.results] : res.data.results
 			);
-			setNotifications(res.data);
-			console.log(res.data);
+			setNotificationsCursor(res.data.next_cursor);
+			setUnreadCount(unreadRes.data.unread);
 		} catch (error) {
 			console.error("Failed to fetch notifications:", error);
 		}
@@ -81,6 +102,46 @@ const Dashboard = () => {
 		console.log(user);
 	}, [user]);
 
+	// New notifications are pushed over server-sent events. The stream is
+	// opened with a single-use ticket, so every reconnect fetches a new one
+	useEffect(() => {
+		if (!user || !token) return;
+		let stream: EventSource | null = null;
+		let retry: ReturnType<typeof setTimeout> | undefined;
+		let closed = false;
+
+		const connect = async () => {
+			try {
+				const res = await axios.post(NOTIFICATION_STREAM_TICKET, null, {
+					headers: { Authorization: `Bearer ${token}` },
+				});
+				if (closed) return;
+				stream = new EventSource(
+					`${NOTIFICATION_STREAM}?ticket=${encodeURIComponent(res.data.ticket)}`
+				);
+				stream.addEventListener("notification", (event) => {
+					const notif = JSON.parse((event as MessageEvent).data);
+					setNotifications((prev) => [notif, ...prev]);
+					setUnreadCount((count) => count + 1);
+				});
+				stream.onerror = () => {
+					stream?.close();
+					if (!closed) retry = setTimeout(connect, 5000);
+				};
+			} catch (error) {
+				console.error("Failed to open notification stream:", error);
+				if (!closed) retry = setTimeout(connect, 5000);
+			}
+		};
+		connect();
+
+		return () => {
+			closed = true;
+			clearTimeout(retry);
+			stream?.close();
+		};
+	}, [user, token]);
+
 	const getRoleBorderStyle = (role: string) => {
 		switch (role) {
 			case "owner":
@@ -187,6 +248,15 @@ const Dashboard = () => {
 									</div>
 								</Link>
 							))}
+							{applicationsCursor && (
+								<button
+									onClick={() =>
+										fetchApplications(applicationsCursor)
+									}
+									className="w-full text-sm font-semibold text-blue-600 hover:underline py-2">
+									Load more
+								</button>
+							)}
 						</div>
 					</main>
 
@@ -196,9 +266,14 @@ const Dashboard = () => {
 							<div className="flex justify-between items-center mb-4">
 								<h3 className="text-lg font-bold text-slate-800">
 									Notifications
+									{unreadCount > 0 && (
+										<span className="ml-2 bg-red-500 text-white text-xs font-semibold rounded-full px-2 py-0.5 align-middle">
+											{unreadCount}
+										</span>
+									)}
 								</h3>
 								<button
-									onClick={fetchNotifications}
+									onClick={() => fetchNotifications()}
 									className="text-sm font-semibold text-blue-600 hover:underline">
 									Refresh
 								</button>
@@ -236,6 +311,15 @@ const Dashboard = () => {
 											No new notifications.
 										</p>
 									)}
+									{notificationsCursor && (
+										<button
+											onClick={() =>
+												fetchNotifications(notificationsCursor)
+											}
+											className="w-full text-sm font-semibold text-blue-600 hover:underline py-2">
+											Load more
+										</button>
+									)}
 								</ul>
 							)}
 						</div>
@@ -2,7 +2,7 @@ import { useState } from "react";
 import { useNavigate } from "react-router-dom";
 import axios from "axios";
 import { useAuthContext } from "../context/AuthContext";
-import { REGISTER_URL } from "../urls";
+import { PROFILE_IMAGE_UPLOAD_URL, REGISTER_URL } from "../urls";
 
 const Register = () => {
 	const navigate = useNavigate();
@@ -40,6 +40,24 @@ const Register = () => {
 		}
 	};
 
+	// Uploads the image straight to S3 with a presigned POST and returns the
+	// token that registration uses to reference it.
+	const uploadProfileImage = async (file: File) => {
+		const intent = await axios.post(PROFILE_IMAGE_UPLOAD_URL, {
+			content_type: file.type,
+		});
+		const { url, fields, upload_token } = intent.data;
+
+		const uploadData = new FormData();
+		Object.entries(fields).forEach(([name, value]) => {
+			uploadData.append(name, value as string);
+		});
+		// S3 requires the file to be the last field
+		uploadData.append("file", file);
+		await axios.post(url, uploadData);
+		return upload_token as string;
+	};
+
 	const handleRegister = async (e: React.FormEvent) => {
 		console.log("HELLO");
 		console.log(REGISTER_URL);
@@ -50,14 +68,18 @@ const Register = () => {
 		formData.append("email", email);
 		formData.append("password", password);
 		formData.append("full_name", fullName);
-		if (profileImageFile) {
-			formData.append("profile_image", profileImageFile);
-		}
 		skillList.forEach((skill) => {
 			formData.append("skills", skill);
 		});
 
 		try {
+			if (profileImageFile) {
+				formData.append(
+					"profile_image_upload",
+					await uploadProfileImage(profileImageFile)
+				);
+			}
+
 			const response = await axios.post(
 				// "http://localhost:8001/api/register/",
 				REGISTER_URL,
@@ -177,7 +199,7 @@ const Register = () => {
 						)}
 						<input
 							type="file"
-							accept="image/*"
+							accept="image/jpeg,image/png,image/webp"
 							onChange={handleImageChange}
 							className="block w-full text-sm text-slate-500 file:mr-4 file:py-2 file:px-4 file:rounded-full file:border-0 file:text-sm file:font-semibold file:bg-blue-50 file:text-blue-700 hover:file:bg-blue-100"
 						/>
@@ -5,10 +5,14 @@ const NOTIFICATION_SERVICE_BASE = import.meta.env
 
 export const FETCH_TEAM_APPLICATIONS = `${TEAM_SERVICE_BASE}/team-applications/`;
 export const FETCH_NOTIFICATIONS = `${NOTIFICATION_SERVICE_BASE}/notifications/`;
+export const NOTIFICATION_STREAM = `${NOTIFICATION_SERVICE_BASE}/notifications/stream/`;
+export const NOTIFICATION_STREAM_TICKET = `${NOTIFICATION_SERVICE_BASE}/notifications/stream/ticket/`;
+export const FETCH_UNREAD_NOTIFICATION_COUNT = `${NOTIFICATION_SERVICE_BASE}/notifications/unread-count/`;
 export const CREATE_JOIN_REQUEST = `${TEAM_SERVICE_BASE}/join-request/`;
 export const LOGIN_URL = `${USER_SERVICE_BASE}/login/`;
 export const FETCH_MY_TEAMS = `${TEAM_SERVICE_BASE}/user/teams/`;
 export const REGISTER_URL = `${USER_SERVICE_BASE}/register/`;
+export const PROFILE_IMAGE_UPLOAD_URL = `${USER_SERVICE_BASE}/register/profile-image/`;
 export const FETCH_TEAM_DETAIL = `${TEAM_SERVICE_BASE}/team/`;
 export const FETCH_JOIN_REQUESTS = `${TEAM_SERVICE_BASE}/join-requests/`;
 export const APPROVE_REJECT_URL = "";
@@ -1,2 +0,0 @@
-# Global dict to hold active WebSocket connections
-ACTIVE_CONNECTIONS = {}  # user_id -> WebSocket instance
@@ -1,7 +1,5 @@
-import json
+import logging
 import os
-import time
-import pika
 import django
 
 # Django setup
@@ -9,58 +7,57 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "notification_service.settings")
 django.setup()
 
 from django.conf import settings
-from notify.models import Notification  
+from notify.utils import metrics
+from notify.utils.ingest import InvalidEvent, parse_event, store_events
+from hackmate_common.rabbitmq import Batcher, Consumer, PermanentError
 
 
-
-def connect_to_rabbitmq(params, retries=5, delay=5):
-    for attempt in range(1, retries + 1):
-        try:
-            return pika.BlockingConnection(params)
-        except pika.exceptions.AMQPConnectionError as e:
-            print(f"[!] RabbitMQ connection failed (attempt {attempt}/{retries}). Retrying in {delay}s...")
-            time.sleep(delay)
-    raise Exception("[x] Could not connect to RabbitMQ after multiple retries.")
-
-
-def save_notification(data):
-    notification = Notification.objects.create(
-        user_id=data["user_id"],
-        team_application_id=data["team_application_id"],
-        message=data["message"],
-        type=data["type"]
-    )
-    print(f"[✓] Notification saved for user {notification.user_id}")
-    return notification
-
-
-def callback(ch, method, properties, body):
+def parse_notification_event(data):
+    """A queue event as the (data, notifications) pair store_events() takes."""
     try:
-        data = json.loads(body)
-        print(f"[→] Received event: {data}")
+        return data, parse_event(data)
+    except InvalidEvent as e:
+        raise PermanentError(f"Invalid notification event: {e}")
 
-        save_notification(data)
-        ch.basic_ack(delivery_tag=method.delivery_tag)
 
-    except Exception as e:
-        print(f"[x] Error handling notification event: {e}")
+class NotificationBatcher(Batcher):
+    """
+    The shared Batcher, recording notification_consumer.* metrics for each
+    batch and for every event sent to the retry or dead-letter queues.
+    """
+    def store_individually(self, batch):
+        metrics.incr("notification_consumer.batch_fallbacks")
+        return super().store_individually(batch)
 
+    def fail(self, method, properties, body, error, permanent=False):
+        dead = super().fail(method, properties, body, error, permanent=permanent)
+        metrics.incr("notification_consumer.dead_lettered" if dead else "notification_consumer.retried")
+        return dead
 
-def run_notification_consumer():
-    params = pika.URLParameters(settings.RABBITMQ_URL)
-    conn = connect_to_rabbitmq(params)
-    ch = conn.channel()
-
-    ch.exchange_declare(exchange=settings.NOTIFICATION_EXCHANGE, exchange_type='direct', durable=True)
-    ch.queue_declare(queue=settings.NOTIFICATION_QUEUE, durable=True)
-    ch.queue_bind(exchange=settings.NOTIFICATION_EXCHANGE, queue=settings.NOTIFICATION_QUEUE, routing_key=settings.NOTIFICATION_ROUTING_KEY)
+    def flushed(self, size, failed, waited, took):
+        super().flushed(size, failed, waited, took)
+        metrics.observe("notification_consumer.batch_wait", waited)
+        metrics.observe("notification_consumer.flush", took)
+        metrics.incr("notification_consumer.batches")
+        metrics.incr("notification_consumer.messages", size)
 
-    ch.basic_qos(prefetch_count=1)
-    ch.basic_consume(queue=settings.NOTIFICATION_QUEUE, on_message_callback=callback)
 
-    print(" [*] Waiting for notification events. To exit press CTRL+C")
-    ch.start_consuming()
+def run_notification_consumer():
+    consumer = Consumer(
+        settings.NOTIFICATION_QUEUE,
+        exchange=settings.NOTIFICATION_EXCHANGE,
+        routing_key=settings.NOTIFICATION_ROUTING_KEY,
+        exchange_type="direct",
+    )
+    consumer.run_batched(
+        parse_notification_event,
+        store_events,
+        batch_size=settings.NOTIFICATION_BATCH_SIZE,
+        max_wait=settings.NOTIFICATION_BATCH_MAX_WAIT_MS / 1000,
+        batcher_class=NotificationBatcher,
+    )
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     run_notification_consumer()
@@ -0,0 +1,51 @@
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+import django
+
+# Django setup
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "notification_service.settings")
+django.setup()
+
+from django.conf import settings
+from notify.models import TokenRevocation
+from hackmate_common.rabbitmq import Consumer, PermanentError
+
+
+def save_revocation(data):
+    """
+    Records that tokens of `user_id` issued before `revoked_before` (unix
+    seconds) are no longer valid. Only ever moves the cutoff forward, so
+    redelivered or reordered events are harmless.
+    """
+    try:
+        user_id = data["user_id"]
+        revoked_before = datetime.fromtimestamp(data["revoked_before"], tz=timezone.utc)
+    except (KeyError, TypeError, ValueError, OverflowError) as e:
+        raise PermanentError(f"Invalid tokens_revoked payload: {e!r}")
+
+    revocation, created = TokenRevocation.objects.get_or_create(
+        user_id=user_id, defaults={"revoked_before": revoked_before}
+    )
+    if not created and revocation.revoked_before < revoked_before:
+        revocation.revoked_before = revoked_before
+        revocation.save(update_fields=["revoked_before"])
+
+    # Every token older than its lifetime has expired anyway
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.JWT_LIFETIME_SECONDS)
+    TokenRevocation.objects.filter(revoked_before__lt=cutoff).delete()
+    print(f"[✓] Tokens of user {user_id} issued before {revoked_before} revoked")
+
+
+def run_revocation_consumer():
+    consumer = Consumer(
+        settings.TOKEN_REVOCATION_QUEUE,
+        exchange=settings.USER_EVENTS_EXCHANGE,
+        routing_key=settings.USER_TOKENS_REVOKED_ROUTING_KEY,
+    )
+    consumer.run(save_revocation)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    run_revocation_consumer()
@@ -0,0 +1,16 @@
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from notify.authentication import flush_metrics as flush_auth_metrics
+from notify.utils import metrics
+# Registers the notification consumer's metrics so they are listed here too
+from notify.utils import ingest  # noqa: F401
+
+
+class MetricsView(APIView):
+    authentication_classes = []
+
+    def get(self, request):
+        # Auth counters are gathered in-process; add this worker's latest
+        # ones (other workers flush theirs every AUTH_METRICS_FLUSH_SECONDS)
+        flush_auth_metrics(force=True)
+        return Response(metrics.snapshot())
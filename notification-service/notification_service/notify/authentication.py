@@ -0,0 +1,93 @@
+import threading
+import time
+
+from django.conf import settings
+from hackmate_common.auth import AUTH_METRICS, BearerAuthentication, VerifiedTokenCache, decode_token
+from rest_framework.exceptions import AuthenticationFailed
+
+from .models import TokenRevocation
+from .utils import metrics
+
+metrics.register(*AUTH_METRICS, "auth.revoked")
+
+
+class RevocationList:
+    """
+    In-memory copy of the TokenRevocation table, reloaded at most every
+    `refresh_seconds`, so checking a token costs no query on the request
+    path. Revocations therefore take up to that long to apply.
+    """
+
+    def __init__(self, refresh_seconds):
+        self.refresh_seconds = refresh_seconds
+        self._revoked_before = {}  # user_id -> unix timestamp
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and self._loaded_at is not None and now - self._loaded_at < self.refresh_seconds:
+            return
+        with self._lock:
+            if not force and self._loaded_at is not None and now - self._loaded_at < self.refresh_seconds:
+                return
+            self._revoked_before = {
+                user_id: revoked_before.timestamp()
+                for user_id, revoked_before in TokenRevocation.objects.values_list("user_id", "revoked_before")
+            }
+            self._loaded_at = now
+
+    def is_revoked(self, user_id, issued_at):
+        self.refresh()
+        revoked_before = self._revoked_before.get(user_id)
+        return revoked_before is not None and (issued_at is None or issued_at < revoked_before)
+
+
+verified_tokens = VerifiedTokenCache(
+    max_size=settings.JWT_VERIFY_CACHE_SIZE,
+    flush_interval=settings.AUTH_METRICS_FLUSH_SECONDS,
+)
+revocations = RevocationList(refresh_seconds=settings.JWT_DENYLIST_REFRESH_SECONDS)
+
+
+def flush_metrics(force=False):
+    """Adds this process's auth counters to the shared metrics once they are due."""
+    verified_tokens.flush(metrics.incr, force)
+
+
+def verify_token(token):
+    """
+    Verifies a user-service JWT locally with the shared signing key and
+    returns its (user_id, iat). Tokens seen before are answered from
+    `verified_tokens` without decoding again.
+    """
+    digest = VerifiedTokenCache.digest(token)
+    claims = verified_tokens.get(digest)
+    if claims is None:
+        claims = _decode_claims(token, digest)
+
+    # Checked on every request, cached or not, so a revocation also
+    # applies to tokens verified before it arrived
+    if settings.JWT_REVOCATION_CHECK and revocations.is_revoked(*claims):
+        verified_tokens.count("auth.revoked")
+        raise AuthenticationFailed("Token has been revoked")
+    flush_metrics()
+    return claims
+
+
+def _decode_claims(token, digest):
+    payload = decode_token(token, settings.JWT_SECRET_KEY, verified_tokens)
+    claims = (int(payload["user_id"]), payload.get("iat"))
+    verified_tokens.set(digest, claims, payload.get("exp"))
+    return claims
+
+
+class JWTAuthentication(BearerAuthentication):
+    """
+    Authenticates bearer tokens locally, without calling user-service; a
+    bad or revoked token is rejected with 401.
+    """
+
+    def verify(self, token):
+        user_id, _ = verify_token(token)
+        return user_id
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+import psycopg2
+from django.conf import settings
+from django.db import connection
+
+NOTIFY_CHANNEL = "notification_created"
+# NOTIFY payloads are capped at 8000 bytes; split recipient lists well below
+RECIPIENTS_PER_NOTIFY = 100
+
+logger = logging.getLogger(__name__)
+
+
+def announce(notifications):
+    """
+    Tells every streaming worker about newly stored notifications with a
+    Postgres NOTIFY (delivered when the surrounding transaction commits).
+    Notifications from one event share their content, so it is sent once
+    with the list of (user_id, id) recipients.
+    """
+    if not notifications:
+        return
+    first = notifications[0]
+    content = {
+        "team_application_id": first.team_application_id,
+        "message": first.message,
+        "type": first.type,
+        "is_read": False,
+        "created_at": first.created_at.isoformat(),
+        "team_name": first.team_name,
+        "leader_name": first.leader_name,
+    }
+    recipients = [[notif.user_id, str(notif.id)] for notif in notifications]
+    with connection.cursor() as cursor:
+        for start in range(0, len(recipients), RECIPIENTS_PER_NOTIFY):
+            payload = {**content, "recipients": recipients[start:start + RECIPIENTS_PER_NOTIFY]}
+            cursor.execute("SELECT pg_notify(%s, %s)", [NOTIFY_CHANNEL, json.dumps(payload)])
+
+
+class NotificationHub:
+    """
+    In-process async pub/sub of new notifications for the streaming
+    endpoint. Each connected client owns a small asyncio.Queue; one LISTEN
+    connection per worker process, watched with loop.add_reader (no
+    thread), feeds them all. An idle client costs a queue and a suspended
+    coroutine, so one worker holds thousands. Opening the LISTEN
+    connection blocks, so it runs in the loop's default executor.
+    """
+
+    def __init__(self, queue_size=100, reconnect_delay=2):
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self._subscribers = defaultdict(set)  # user_id -> {asyncio.Queue}
+        self._listener = None
+        self._connecting = None  # asyncio.Task opening the listener
+        self._loop = None
+
+    async def subscribe(self, user_id):
+        await self._ensure_listening()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    @property
+    def connection_count(self):
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, user_id, notification):
+        for queue in self._subscribers.get(user_id, ()):
+            if queue.full():
+                # A stalled client loses its oldest undelivered event rather
+                # than growing without bound; it can refetch the list
+                queue.get_nowait()
+            queue.put_nowait(notification)
+
+    async def _ensure_listening(self):
+        if self._listener is not None:
+            return
+        # Clients subscribing while the connection is being opened wait for
+        # the same attempt instead of opening one each
+        if self._connecting is None:
+            self._loop = asyncio.get_running_loop()
+            self._connecting = self._loop.create_task(self._listen())
+        await asyncio.shield(self._connecting)
+
+    async def _listen(self):
+        try:
+            listener = await self._loop.run_in_executor(None, self._connect)
+        finally:
+            self._connecting = None
+        self._listener = listener
+        self._loop.add_reader(listener.fileno(), self._on_notify)
+
+    @staticmethod
+    def _connect():
+        db = settings.DATABASES["default"]
+        listener = psycopg2.connect(
+            dbname=db["NAME"], user=db["USER"], password=db["PASSWORD"],
+            host=db["HOST"], port=db["PORT"],
+        )
+        listener.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with listener.cursor() as cursor:
+            cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+        return listener
+
+    def _on_notify(self):
+        try:
+            self._listener.poll()
+        except psycopg2.Error as e:
+            logger.warning("Notification listener lost its connection: %s", e)
+            self._reset()
+            self._schedule_reconnect()
+            return
+
+        while self._listener.notifies:
+            data = json.loads(self._listener.notifies.pop(0).payload)
+            recipients = data.pop("recipients")
+            for user_id, notification_id in recipients:
+                if user_id in self._subscribers:
+                    self.publish(user_id, {"id": notification_id, "user_id": user_id, **data})
+
+    def _reset(self):
+        if self._listener is None:
+            return
+        self._loop.remove_reader(self._listener.fileno())
+        try:
+            self._listener.close()
+        except psycopg2.Error:
+            pass
+        self._listener = None
+
+    def _schedule_reconnect(self):
+        self._loop.call_later(self.reconnect_delay, lambda: self._loop.create_task(self._reconnect()))
+
+    async def _reconnect(self):
+        if self._listener is not None or not self._subscribers:
+            return
+        try:
+            await self._ensure_listening()
+        except psycopg2.Error as e:
+            logger.warning("Notification listener reconnect failed: %s", e)
+            self._schedule_reconnect()
+
+
+notification_hub = NotificationHub(queue_size=settings.NOTIFICATION_STREAM_QUEUE_SIZE)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notify', '0002_tokenrevocation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='leader_name',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='leader_profile_image',
+            field=models.CharField(blank=True, max_length=1000, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='team_name',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
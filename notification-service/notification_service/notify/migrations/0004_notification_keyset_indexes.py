@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notify', '0003_notification_team_context'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notify_noti_user_id_2f0c99_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notify_noti_is_read_eee8c9_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user_id', '-created_at', '-id'], name='notif_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['user_id'], name='notif_user_unread_idx'),
+        ),
+    ]
@@ -18,6 +18,15 @@ class Notification(models.Model):
 
     team_application_id = models.IntegerField()
 
+    # Team context copied from the event at ingest, so reads need no call
+    # to team-service. Patched by team.updated events; null on rows stored
+    # before these fields existed.
+    team_name = models.CharField(max_length=255, null=True, blank=True)
+
+    leader_name = models.CharField(max_length=255, null=True, blank=True)
+
+    leader_profile_image = models.CharField(max_length=1000, null=True, blank=True)
+
     message = models.TextField()
 
     type = models.CharField(max_length=50, choices=NotificationType.choices)
@@ -29,6 +38,19 @@ class Notification(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['user_id']),
-            models.Index(fields=['is_read']),
-        ]
\ No newline at end of file
+            # Keyset pagination of a user's notifications, newest first
+            models.Index(fields=['user_id', '-created_at', '-id'], name='notif_user_created_idx'),
+            # Unread badge: only unread rows are indexed, so counting stays
+            # cheap however much read history a user has
+            models.Index(fields=['user_id'], condition=models.Q(is_read=False), name='notif_user_unread_idx'),
+        ]
+
+class TokenRevocation(models.Model):
+    """
+    Local replica of user-service token revocations, fed by
+    user.tokens_revoked events. Tokens of `user_id` issued before
+    `revoked_before` are rejected.
+    """
+    user_id = models.IntegerField(primary_key=True)
+
+    revoked_before = models.DateTimeField()
@@ -2,8 +2,6 @@ from rest_framework import serializers
 from notify.models import Notification, NotificationType
 
 class NotificationSerializer(serializers.ModelSerializer):
-    team_name = serializers.CharField()
-    leader_name = serializers.CharField()
     # profile_image = serializers.URLField()
 
     class Meta:
@@ -1,3 +1,363 @@
-from django.test import TestCase
+import asyncio
+import base64
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest import mock
 
-# Create your tests here.
+import jwt
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from hackmate_common.auth import VerifiedTokenCache
+from rest_framework.exceptions import AuthenticationFailed
+
+from . import authentication
+from .authentication import RevocationList, verify_token
+from .hub import NotificationHub
+from .models import Notification, TokenRevocation
+from .utils.ingest import parse_event, store_events
+from .utils.team_meta import apply_team_context, fetch_team_meta
+from .utils.pagination import decode_cursor, encode_cursor
+
+
+def bearer(user_id, **claims):
+    now = int(time.time())
+    token = jwt.encode(
+        {"user_id": user_id, "iat": now, "exp": now + 3600, **claims}, settings.JWT_SECRET_KEY, algorithm="HS256"
+    )
+    return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+
+def create_notification(user_id, **fields):
+    defaults = {
+        "team_application_id": 1, "message": "Hello", "type": "request_accepted",
+        "team_name": "Team", "leader_name": "Leader",
+    }
+    return Notification.objects.create(user_id=user_id, **{**defaults, **fields})
+
+
+class NotificationPaginationTests(TestCase):
+    """A user's notifications page on (created_at, id), newest first."""
+    user_id = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        cls.notifications = [create_notification(cls.user_id, message=f"#{i}") for i in range(17)]
+        # Runs of equal timestamps, so the id tie-break is exercised
+        for i, notif in enumerate(cls.notifications):
+            Notification.objects.filter(id=notif.id).update(created_at=base + timedelta(minutes=i // 4))
+        create_notification(cls.user_id + 1, message="someone else's")
+
+    def walk(self, limit):
+        url = reverse("get-notifications")
+        ids, cursor = [], None
+        for _ in range(len(self.notifications) + 1):
+            query = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+            response = self.client.get(url, query, **bearer(self.user_id))
+            self.assertEqual(response.status_code, 200, response.content)
+            page = response.json()
+            self.assertLessEqual(len(page["results"]), limit)
+            ids += [row["id"] for row in page["results"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return ids
+        self.fail("next_cursor never ran out")
+
+    def test_pages_return_every_row_once_in_order(self):
+        expected = [
+            str(notif_id) for notif_id in
+            Notification.objects.filter(user_id=self.user_id).order_by("-created_at", "-id").values_list("id", flat=True)
+        ]
+        for limit in (1, 3, 4, 17, 100):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.walk(limit), expected)
+
+    def test_cursor_round_trip(self):
+        notif = Notification.objects.get(id=self.notifications[0].id)
+        self.assertEqual(decode_cursor(encode_cursor(notif)), (notif.created_at, notif.id))
+
+    def test_malformed_cursor_is_rejected(self):
+        url = reverse("get-notifications")
+        tampered = [
+            "not-a-cursor",
+            base64.urlsafe_b64encode(json.dumps({"created_at": "2026-01-01T00:00:00+00:00", "id": "42"}).encode()).decode(),
+            base64.urlsafe_b64encode(json.dumps({"created_at": "soon", "id": str(self.notifications[0].id)}).encode()).decode(),
+            base64.urlsafe_b64encode(json.dumps({"id": str(self.notifications[0].id)}).encode()).decode(),
+        ]
+        for cursor in tampered:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(url, {"cursor": cursor}, **bearer(self.user_id))
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"error": "Invalid cursor"})
+
+
+def revoke(user_id, before):
+    TokenRevocation.objects.update_or_create(
+        user_id=user_id, defaults={"revoked_before": datetime.fromtimestamp(before, tz=timezone.utc)}
+    )
+
+
+class RevocationListTests(TestCase):
+    def test_tokens_issued_before_the_cutoff_are_revoked(self):
+        revoke(3, before=1000)
+        revocations = RevocationList(refresh_seconds=60)
+        self.assertTrue(revocations.is_revoked(3, 999))
+        self.assertFalse(revocations.is_revoked(3, 1000))
+        self.assertFalse(revocations.is_revoked(4, 999))
+        # A token without iat cannot prove it is newer than the cutoff
+        self.assertTrue(revocations.is_revoked(3, None))
+
+    def test_table_is_reloaded_only_after_refresh_seconds(self):
+        revocations = RevocationList(refresh_seconds=30)
+        with mock.patch("notify.authentication.time.monotonic", return_value=100.0):
+            self.assertFalse(revocations.is_revoked(3, 999))
+        revoke(3, before=1000)
+        with self.assertNumQueries(0), mock.patch("notify.authentication.time.monotonic", return_value=129.0):
+            self.assertFalse(revocations.is_revoked(3, 999))
+        with self.assertNumQueries(1), mock.patch("notify.authentication.time.monotonic", return_value=130.0):
+            self.assertTrue(revocations.is_revoked(3, 999))
+
+    def test_forced_refresh_reloads_at_once(self):
+        revocations = RevocationList(refresh_seconds=3600)
+        revocations.refresh()
+        revoke(3, before=1000)
+        revocations.refresh(force=True)
+        self.assertTrue(revocations.is_revoked(3, 999))
+
+
+@override_settings(JWT_REVOCATION_CHECK=True)
+class VerifyTokenRevocationTests(TestCase):
+    def setUp(self):
+        for name, value in [
+            ("verified_tokens", VerifiedTokenCache(max_size=10)),
+            ("revocations", RevocationList(refresh_seconds=3600)),
+        ]:
+            patcher = mock.patch.object(authentication, name, value)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def token(self, issued_at):
+        return jwt.encode(
+            {"user_id": 3, "iat": issued_at, "exp": int(time.time()) + 3600}, settings.JWT_SECRET_KEY, algorithm="HS256"
+        )
+
+    def test_revocation_applies_to_already_cached_tokens(self):
+        now = int(time.time())
+        old, fresh = self.token(now - 60), self.token(now)
+        self.assertEqual(verify_token(old), (3, now - 60))
+
+        revoke(3, before=now - 30)
+        self.revocations.refresh(force=True)
+        with self.assertRaisesMessage(AuthenticationFailed, "Token has been revoked"):
+            verify_token(old)
+        self.assertEqual(verify_token(fresh), (3, now))
+        counts = self.verified_tokens.drain(force=True)
+        self.assertEqual((counts["auth.revoked"], counts["auth.cache_hit"]), (1, 1))
+
+    def test_revoked_token_is_rejected_with_401(self):
+        now = int(time.time())
+        revoke(3, before=now)
+        self.revocations.refresh(force=True)
+        response = self.client.get(
+            reverse("get-notifications"), HTTP_AUTHORIZATION=f"Bearer {self.token(now - 60)}"
+        )
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(JWT_REVOCATION_CHECK=False)
+    def test_check_can_be_switched_off(self):
+        now = int(time.time())
+        revoke(3, before=now)
+        self.revocations.refresh(force=True)
+        self.assertEqual(verify_token(self.token(now - 60)), (3, now - 60))
+
+
+class StreamTicketTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def issue(self, user_id):
+        response = self.client.post(reverse("notification-stream-ticket"), **bearer(user_id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["expires_in"], settings.NOTIFICATION_STREAM_TICKET_TTL_SECONDS)
+        return response.json()["ticket"]
+
+    def test_ticket_needs_a_token(self):
+        self.assertEqual(self.client.post(reverse("notification-stream-ticket")).status_code, 401)
+
+    def test_ticket_opens_one_stream(self):
+        ticket = self.issue(5)
+        url = reverse("notification-stream")
+        # The stream body is never read, so no hub subscription is made
+        first = self.client.get(url, {"ticket": ticket})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first["Content-Type"], "text/event-stream")
+        second = self.client.get(url, {"ticket": ticket})
+        self.assertEqual(second.status_code, 401)
+        self.assertEqual(second.json(), {"error": "Invalid or expired ticket"})
+
+    def test_unknown_ticket_and_missing_credentials_are_rejected(self):
+        url = reverse("notification-stream")
+        self.assertEqual(self.client.get(url, {"ticket": "made-up"}).status_code, 401)
+        self.assertEqual(self.client.get(url).json(), {"error": "Missing ticket"})
+
+    def test_only_the_ticket_digest_is_cached(self):
+        with mock.patch("notify.utils.stream_tickets.cache.set", wraps=cache.set) as cache_set:
+            ticket = self.issue(5)
+        key, user_id = cache_set.call_args.args
+        self.assertEqual(user_id, 5)
+        self.assertNotIn(ticket, key)
+
+
+class FakeListener:
+    """Stands in for the LISTEN connection: a pipe the loop can watch."""
+
+    def __init__(self):
+        self.read_fd, self.write_fd = os.pipe()
+        self.notifies = []
+        self.opened_on = threading.current_thread()
+
+    def fileno(self):
+        return self.read_fd
+
+    def close(self):
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+
+class NotificationHubTests(SimpleTestCase):
+    def run_hub(self, scenario):
+        listeners = []
+
+        def connect():
+            listeners.append(FakeListener())
+            return listeners[-1]
+
+        async def run():
+            hub = NotificationHub(queue_size=2)
+            with mock.patch.object(NotificationHub, "_connect", side_effect=connect):
+                try:
+                    await scenario(hub)
+                finally:
+                    hub._reset()
+        asyncio.run(run())
+        return listeners
+
+    def test_concurrent_subscribers_share_one_listener_opened_off_the_loop(self):
+        async def scenario(hub):
+            await asyncio.gather(*(hub.subscribe(user_id) for user_id in (1, 1, 2)))
+            self.assertEqual(hub.connection_count, 3)
+
+        listeners = self.run_hub(scenario)
+        self.assertEqual(len(listeners), 1)
+        self.assertIsNot(listeners[0].opened_on, threading.main_thread())
+
+    def test_notify_fans_out_to_every_stream_of_each_recipient(self):
+        async def scenario(hub):
+            first, second, other = await hub.subscribe(1), await hub.subscribe(1), await hub.subscribe(2)
+            payload = {"message": "Hello", "recipients": [[1, "a"], [3, "b"]]}
+            hub._listener.notifies.append(mock.Mock(payload=json.dumps(payload)))
+            with mock.patch.object(hub._listener, "poll", create=True):
+                hub._on_notify()
+            for queue in (first, second):
+                self.assertEqual(queue.get_nowait(), {"id": "a", "user_id": 1, "message": "Hello"})
+            self.assertTrue(other.empty())
+
+        self.run_hub(scenario)
+
+    def test_full_queue_drops_its_oldest_event(self):
+        async def scenario(hub):
+            queue = await hub.subscribe(1)
+            for index in range(3):
+                hub.publish(1, {"id": index})
+            self.assertEqual([queue.get_nowait()["id"] for _ in range(queue.qsize())], [1, 2])
+
+        self.run_hub(scenario)
+
+    def test_unsubscribe_forgets_users_without_streams(self):
+        async def scenario(hub):
+            queue = await hub.subscribe(1)
+            hub.unsubscribe(1, queue)
+            hub.unsubscribe(1, queue)
+            self.assertEqual(hub.connection_count, 0)
+            self.assertNotIn(1, hub._subscribers)
+
+        self.run_hub(scenario)
+
+
+class NotificationHubListenTests(TransactionTestCase):
+    """Stored notifications reach subscribers through a real LISTEN/NOTIFY."""
+
+    def test_stored_event_reaches_subscribed_recipients(self):
+        event = {
+            "recipient_ids": [5, 6], "team_application_id": 1, "message": "Welcome",
+            "type": "new_member_added", "team_name": "Team", "leader_name": "Leader",
+        }
+
+        def store():
+            try:
+                store_events([(event, parse_event(event))])
+            finally:
+                connection.close()
+
+        async def run():
+            hub = NotificationHub()
+            try:
+                mine, other = await hub.subscribe(5), await hub.subscribe(7)
+                await sync_to_async(store)()
+                received = await asyncio.wait_for(mine.get(), timeout=5)
+                self.assertTrue(other.empty())
+                return received
+            finally:
+                hub._reset()
+
+        received = asyncio.run(run())
+        stored = Notification.objects.get(user_id=5)
+        self.assertEqual(received["id"], str(stored.id))
+        self.assertEqual((received["user_id"], received["message"], received["is_read"]), (5, "Welcome", False))
+
+
+class TeamContextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_apply_team_context_patches_only_the_given_teams(self):
+        patched = [create_notification(user_id, team_application_id=1) for user_id in (5, 6)]
+        other_field = create_notification(5, team_application_id=2, leader_name="Second Leader")
+        untouched = create_notification(5, team_application_id=3, team_name="Third", leader_name="Third Leader")
+
+        updated = apply_team_context({
+            1: {"team_name": "First v2", "leader_name": "New Leader", "leader_profile_image": "avatars/1.png"},
+            # A missing field is cleared, not left as it was
+            2: {"team_name": "Second v2"},
+        })
+
+        self.assertEqual(updated, 3)
+        rows = {
+            notif_id: (team_name, leader_name, image) for notif_id, team_name, leader_name, image in
+            Notification.objects.values_list("id", "team_name", "leader_name", "leader_profile_image")
+        }
+        for notif in patched:
+            self.assertEqual(rows[notif.id], ("First v2", "New Leader", "avatars/1.png"))
+        self.assertEqual(rows[other_field.id], ("Second v2", None, None))
+        self.assertEqual(rows[untouched.id], ("Third", "Third Leader", None))
+
+    def test_apply_team_context_without_teams_is_a_no_op(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(apply_team_context({}), 0)
+
+    def test_failed_fetch_is_logged_and_left_out(self):
+        cache.set("team_meta:1", {"team_name": "Cached"})
+        refused = requests.ConnectionError("refused")
+        with mock.patch("notify.utils.team_meta.requests.get", side_effect=refused) as get, \
+                self.assertLogs("notify.utils.team_meta", level="WARNING") as logs:
+            self.assertEqual(fetch_team_meta([1, 2]), {1: {"team_name": "Cached"}})
+        self.assertIn("Failed to fetch team metadata for 1 teams", logs.output[0])
+        self.assertEqual(get.call_args.kwargs["params"], {"ids": "2"})
@@ -1,6 +1,9 @@
 from django.urls import path
-from .views import GetNotificationsView
+from .views import GetNotificationsView, NotificationStreamTicketView, NotificationStreamView, UnreadNotificationCountView
 
 urlpatterns = [
     path('notifications/', GetNotificationsView.as_view(), name='get-notifications'),
+    path('notifications/stream/', NotificationStreamView.as_view(), name='notification-stream'),
+    path('notifications/stream/ticket/', NotificationStreamTicketView.as_view(), name='notification-stream-ticket'),
+    path('notifications/unread-count/', UnreadNotificationCountView.as_view(), name='unread-notification-count'),
 ]
\ No newline at end of file
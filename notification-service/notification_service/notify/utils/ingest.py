@@ -0,0 +1,95 @@
+from django.db import transaction
+
+from ..hub import announce
+from ..models import Notification
+from . import metrics
+from .team_meta import TEAM_CONTEXT_FIELDS, apply_team_context
+
+TEAM_UPDATED_EVENT = "team.updated"
+
+metrics.register(
+    "notification_consumer.messages",
+    "notification_consumer.batches",
+    "notification_consumer.retried",
+    "notification_consumer.dead_lettered",
+    "notification_consumer.batch_fallbacks",
+    "notification_consumer.flush.count",
+    "notification_consumer.flush.total_us",
+    "notification_consumer.batch_wait.count",
+    "notification_consumer.batch_wait.total_us",
+)
+
+
+class InvalidEvent(Exception):
+    pass
+
+
+def parse_event(data):
+    """
+    Validates one queue event without touching the database. Returns the
+    unsaved Notification rows it expands to (one per recipient; a team
+    event carries `recipient_ids` instead of a single `user_id`), or None
+    for a team.updated event.
+    """
+    if not isinstance(data, dict):
+        raise InvalidEvent("event is not an object")
+    if data.get("event") == TEAM_UPDATED_EVENT:
+        teams = data.get("teams")
+        if not isinstance(teams, list) or not all(isinstance(team, dict) and "team_application_id" in team for team in teams):
+            raise InvalidEvent("team.updated event without valid teams")
+        return None
+
+    try:
+        recipient_ids = data.get("recipient_ids")
+        if recipient_ids is None:
+            recipient_ids = [data["user_id"]]
+        return [
+            Notification(
+                user_id=user_id,
+                team_application_id=data["team_application_id"],
+                message=data["message"],
+                type=data["type"],
+                team_name=data.get("team_name"),
+                leader_name=data.get("leader_name"),
+                leader_profile_image=data.get("leader_profile_image"),
+            )
+            for user_id in recipient_ids
+        ]
+    except (KeyError, TypeError) as e:
+        raise InvalidEvent(f"missing or malformed field {e}")
+
+
+def store_events(events):
+    """
+    Stores a batch of parsed events, given as (data, notifications) pairs
+    in queue order, in one transaction: the team.updated patches, then a
+    single INSERT for every notification in the batch.
+    Streaming clients are told about the new rows on commit.
+    """
+    with transaction.atomic():
+        # Patches go first, against the rows stored by earlier batches. Rows
+        # of this batch that precede a patch get it applied in memory; those
+        # after it already carry context at least as recent.
+        earlier = []
+        for data, rows in events:
+            if rows is not None:
+                earlier.extend(rows)
+                continue
+            teams = {team["team_application_id"]: team for team in data["teams"]}
+            apply_team_context(teams)
+            for notif in earlier:
+                if notif.team_application_id in teams:
+                    for field in TEAM_CONTEXT_FIELDS:
+                        setattr(notif, field, teams[notif.team_application_id].get(field))
+
+        notifications = Notification.objects.bulk_create(earlier)
+
+        # announce() sends one payload per event, as the rows of an event
+        # share their content
+        start = 0
+        for _, rows in events:
+            if rows:
+                announce(notifications[start:start + len(rows)])
+                start += len(rows)
+    return len(notifications)
+
@@ -0,0 +1,37 @@
+import hashlib
+import secrets
+
+from django.conf import settings
+from django.core.cache import cache
+
+CACHE_KEY = "stream_ticket:{}"
+
+
+def _key(ticket):
+    # Only the ticket's digest is stored, never the ticket itself
+    return CACHE_KEY.format(hashlib.sha256(ticket.encode()).hexdigest())
+
+
+def issue_ticket(user_id):
+    """
+    Returns a random ticket that opens one notification stream for
+    `user_id` within NOTIFICATION_STREAM_TICKET_TTL_SECONDS. EventSource
+    cannot send headers, so the stream URL carries this ticket instead of
+    the long-lived JWT.
+    """
+    ticket = secrets.token_urlsafe(32)
+    cache.set(_key(ticket), user_id, timeout=settings.NOTIFICATION_STREAM_TICKET_TTL_SECONDS)
+    return ticket
+
+
+def redeem_ticket(ticket):
+    """
+    Returns the user_id a ticket was issued for and invalidates it, or
+    None when it is unknown, expired or already used. Of two concurrent
+    redemptions only the one whose delete removes the key succeeds.
+    """
+    key = _key(ticket)
+    user_id = cache.get(key)
+    if user_id is None or not cache.delete(key):
+        return None
+    return user_id
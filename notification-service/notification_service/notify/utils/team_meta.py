@@ -0,0 +1,81 @@
+import logging
+import os
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, CharField, Value, When
+
+from ..models import Notification
+
+CACHE_KEY = "team_meta:{}"
+BATCH_SIZE = 200  # team-service's TeamMetaBatchView limit
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_team_meta(team_ids):
+    """
+    Returns {team_id: {"team_name", "leader_name", "profile_image"}} for the
+    given teams. Metadata is cached for TEAM_META_CACHE_TTL seconds; the
+    rest is fetched from team-service with one call per 200 teams.
+    Teams team-service could not return are left out.
+    """
+    team_ids = set(team_ids)
+    cached = cache.get_many([CACHE_KEY.format(team_id) for team_id in team_ids])
+    meta = {
+        team_id: cached[CACHE_KEY.format(team_id)]
+        for team_id in team_ids if CACHE_KEY.format(team_id) in cached
+    }
+
+    missing = sorted(team_ids - meta.keys())
+    team_service_url = os.getenv("TEAM_SERVICE_URL", "http://team-service:8000")
+    for start in range(0, len(missing), BATCH_SIZE):
+        batch = missing[start:start + BATCH_SIZE]
+        try:
+            response = requests.get(
+                f"{team_service_url}/api/teams/meta/",
+                params={"ids": ",".join(map(str, batch))},
+                timeout=settings.TEAM_META_TIMEOUT,
+            )
+            response.raise_for_status()
+            fetched = {int(team_id): data for team_id, data in response.json()["teams"].items()}
+        except (requests.RequestException, KeyError, ValueError) as e:
+            logger.warning("Failed to fetch team metadata for %d teams: %s", len(batch), e)
+            continue
+
+        meta.update(fetched)
+        cache.set_many(
+            {CACHE_KEY.format(team_id): data for team_id, data in fetched.items()},
+            timeout=settings.TEAM_META_CACHE_TTL,
+        )
+    return meta
+
+
+TEAM_CONTEXT_FIELDS = ("team_name", "leader_name", "leader_profile_image")
+
+
+def apply_team_context(teams):
+    """
+    Patches the stored team context of every notification of the given
+    teams with a single UPDATE.
+
+    Args:
+        teams: {team_application_id: {"team_name", "leader_name", "leader_profile_image"}}
+
+    Returns:
+        The number of rows updated.
+    """
+    if not teams:
+        return 0
+    return Notification.objects.filter(team_application_id__in=teams.keys()).update(**{
+        field: Case(
+            *[
+                When(team_application_id=team_id, then=Value(context.get(field)))
+                for team_id, context in teams.items()
+            ],
+            default=field,
+            output_field=CharField(),
+        )
+        for field in TEAM_CONTEXT_FIELDS
+    })
@@ -1,9 +1,21 @@
-import requests
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
 from .models import Notification
 from .serializers import NotificationSerializer
-import os
+from .authentication import verify_token
+from .hub import notification_hub
+from .utils.pagination import decode_cursor, paginate_keyset, parse_page_size
+from .utils.stream_tickets import issue_ticket, redeem_ticket
+from .utils.team_meta import apply_team_context, fetch_team_meta
 
 # class GetNotificationsView(APIView):
 #     def get(self, request):
@@ -51,52 +63,120 @@ import os
 #         return Response(NotificationSerializer(enriched_notifications, many=True).data)
 
 class GetNotificationsView(APIView):
-    def get(self, request):
-        token = request.headers.get("Authorization")
-        if not token:
-            return Response({"error": "Missing token"}, status=401)
+    permission_classes = [IsAuthenticated]
 
-        # Get service URLs from env
-        user_service_url = os.getenv("USER_SERVICE_URL", "http://user-service:8000")
-        team_service_url = os.getenv("TEAM_SERVICE_URL", "http://team-service:8000")
+    def get(self, request):
+        # The token is verified locally by JWTAuthentication
+        user_id = request.user.id
 
-        # Verify user from user-service
         try:
-            verify_response = requests.get(
-                f"{user_service_url}/api/verify-user/",
-                headers={"Authorization": token}
-            )
-            data = verify_response.json()
-
-            if not data.get("valid"):
-                return Response({"error": "Invalid user"}, status=401)
-
-            user_id = data["user_id"]
-        except Exception as e:
-            return Response({"error": "User verification failed", "detail": str(e)}, status=500)
-
-        notifications = Notification.objects.filter(user_id=user_id).order_by('-created_at')
+            cursor = decode_cursor(request.query_params.get("cursor"))
+            page_size = parse_page_size(request.query_params.get("limit"))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        # Team context is stored on each row at ingest: one index range scan
+        notifications, next_cursor = paginate_keyset(
+            Notification.objects.filter(user_id=user_id), cursor, page_size
+        )
+
+        # Rows stored before the team context was denormalized are filled
+        # in once from team-service and patched, so later reads skip this
+        legacy_team_ids = {notif.team_application_id for notif in notifications if notif.team_name is None}
+        if legacy_team_ids:
+            team_meta = fetch_team_meta(legacy_team_ids)
+            apply_team_context({
+                team_id: {
+                    "team_name": meta.get("team_name"),
+                    "leader_name": meta.get("leader_name"),
+                    "leader_profile_image": meta.get("profile_image"),
+                }
+                for team_id, meta in team_meta.items()
+            })
+            for notif in notifications:
+                meta = team_meta.get(notif.team_application_id)
+                if notif.team_name is None and meta is not None:
+                    notif.team_name = meta.get("team_name")
+                    notif.leader_name = meta.get("leader_name")
+
+        return Response({
+            "results": NotificationSerializer(notifications, many=True).data,
+            "next_cursor": next_cursor,
+        })
+
+
+class UnreadNotificationCountView(APIView):
+    """
+    GET /api/notifications/unread-count/
+    Returns {"unread": <n>}, counted from the partial index on unread rows.
+    """
+    permission_classes = [IsAuthenticated]
 
-        enriched_notifications = []
-        for notif in notifications:
+    def get(self, request):
+        unread = Notification.objects.filter(user_id=request.user.id, is_read=False).count()
+        return Response({"unread": unread})
+
+
+class NotificationStreamTicketView(APIView):
+    """
+    POST /api/notifications/stream/ticket/
+    Returns {"ticket": ..., "expires_in": <seconds>}: a short-lived,
+    single-use ticket for opening NotificationStreamView.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return Response({
+            "ticket": issue_ticket(request.user.id),
+            "expires_in": settings.NOTIFICATION_STREAM_TICKET_TTL_SECONDS,
+        })
+
+
+class NotificationStreamView(View):
+    """
+    GET /api/notifications/stream/?ticket=<ticket>
+    Server-sent events: one `notification` event per notification stored
+    for the caller, in the same shape as GetNotificationsView results.
+    EventSource cannot send headers, so browsers pass a ticket from
+    NotificationStreamTicketView instead of their JWT, which would end up
+    in access logs; other clients may send the usual Authorization header.
+    A ticket opens one stream, so a reconnect needs a new one. Must be
+    served by the ASGI app.
+    """
+
+    async def get(self, request):
+        ticket = request.GET.get("ticket")
+        if ticket:
+            user_id = await sync_to_async(redeem_ticket)(ticket)
+            if user_id is None:
+                return JsonResponse({"error": "Invalid or expired ticket"}, status=401)
+        else:
+            auth_header = request.headers.get("Authorization", "").split()
+            if len(auth_header) != 2 or auth_header[0].lower() != "bearer":
+                return JsonResponse({"error": "Missing ticket"}, status=401)
             try:
-                # Fetch team data from team-service
-                team_res = requests.get(f"{team_service_url}/api/teams/{notif.team_application_id}/meta/")
-                team_data = team_res.json()
-
-                enriched = {
-                    "id": notif.id,
-                    "user_id": notif.user_id,
-                    "message": notif.message,
-                    "type": notif.type,
-                    "team_application_id": notif.team_application_id,
-                    "is_read": notif.is_read,
-                    "created_at": notif.created_at,
-                    "team_name": team_data.get("team_name"),
-                    "leader_name": team_data.get("leader_name"),
-                }
-                enriched_notifications.append(enriched)
-            except Exception as e:
-                print(f"Failed to fetch team data for notif {notif.id}: {e}")
+                user_id, _ = await sync_to_async(verify_token)(auth_header[1])
+            except AuthenticationFailed as e:
+                return JsonResponse({"error": str(e.detail)}, status=401)
 
-        return Response(NotificationSerializer(enriched_notifications, many=True).data)
\ No newline at end of file
+        response = StreamingHttpResponse(self.events(user_id), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+        return response
+
+    async def events(self, user_id):
+        queue = await notification_hub.subscribe(user_id)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    notification = await asyncio.wait_for(
+                        queue.get(), timeout=settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Comment line; keeps proxies from closing an idle stream
+                    yield ": ping\n\n"
+                    continue
+                yield f"id: {notification['id']}\nevent: notification\ndata: {json.dumps(notification)}\n\n"
+        finally:
+            notification_hub.unsubscribe(user_id, queue)
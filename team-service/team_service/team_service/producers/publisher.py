@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+import queue
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+import pika
+from pika.exceptions import AMQPChannelError, AMQPConnectionError, NackError, UnroutableError
+
+logger = logging.getLogger(__name__)
+
+# Errors after which the pooled connection is discarded and the publish is
+# retried on a fresh one.
+RECONNECT_ERRORS = (AMQPConnectionError, AMQPChannelError, ConnectionError, OSError)
+
+
+class PublishError(Exception):
+    """The broker did not confirm a message (nacked or unroutable)."""
+
+
+class Publisher:
+    """
+    Process-wide, thread-safe RabbitMQ publisher.
+
+    Keeps a small pool of long-lived connections, each with one channel in
+    publisher-confirm mode and the exchange/queue/binding declared once when
+    the channel is opened. A thread checks a channel out for the duration of
+    a publish, so pika's non-thread-safe BlockingConnection is never shared.
+    Broken connections are dropped and replaced transparently. The pool is
+    rebuilt after fork, so it is safe to create at import time under
+    gunicorn's pre-fork model.
+    """
+
+    def __init__(self, url, exchange, routing_key, queue_name=None, exchange_type="direct", pool_size=4, attempts=3):
+        self.url = url
+        self.exchange = exchange
+        self.routing_key = routing_key
+        self.queue_name = queue_name
+        self.exchange_type = exchange_type
+        self.pool_size = pool_size
+        self.attempts = attempts
+        self._lock = threading.Lock()
+        self._reset_pool()
+
+    def _reset_pool(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+
+    def _open(self):
+        connection = pika.BlockingConnection(pika.URLParameters(self.url))
+        try:
+            channel = connection.channel()
+            channel.exchange_declare(exchange=self.exchange, exchange_type=self.exchange_type, durable=True)
+            if self.queue_name:
+                channel.queue_declare(queue=self.queue_name, durable=True)
+                channel.queue_bind(exchange=self.exchange, queue=self.queue_name, routing_key=self.routing_key)
+            channel.confirm_delivery()
+        except BaseException:
+            # Not handed out yet, so _checkout cannot close it
+            self._close(connection)
+            raise
+        return connection, channel
+
+    @staticmethod
+    def _close(connection):
+        try:
+            if connection.is_open:
+                connection.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def _checkout(self):
+        if self._pid != os.getpid():
+            # Forked worker: never reuse sockets inherited from the parent
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset_pool()
+
+        self._slots.acquire()
+        connection = channel = None
+        try:
+            try:
+                connection, channel = self._idle.get_nowait()
+                # Services heartbeats and surfaces a dead connection now
+                connection.process_data_events(time_limit=0)
+            except queue.Empty:
+                connection, channel = self._open()
+            except RECONNECT_ERRORS:
+                self._close(connection)
+                connection, channel = self._open()
+
+            yield channel
+        except BaseException:
+            if connection is not None:
+                self._close(connection)
+            connection = None
+            raise
+        finally:
+            if connection is not None and connection.is_open and channel.is_open:
+                self._idle.put((connection, channel))
+            self._slots.release()
+
+    def publish_many(self, messages):
+        """
+        Publishes `messages` (JSON-serializable dicts) on one pooled channel
+        and waits for the broker to confirm each. If the connection drops
+        mid-batch, the unconfirmed remainder is retried on a new connection.
+
+        On a BlockingChannel in confirm mode every basic_publish waits for
+        its own ack, so a batch still costs one broker round trip per
+        message; what it saves over calling publish() in a loop is the
+        connection checkout and its heartbeat check.
+        """
+        pending = deque(json.dumps(message) for message in messages)
+        for attempt in range(1, self.attempts + 1):
+            if not pending:
+                return
+            try:
+                with self._checkout() as channel:
+                    while pending:
+                        try:
+                            channel.basic_publish(
+                                exchange=self.exchange,
+                                routing_key=self.routing_key,
+                                body=pending[0],
+                                properties=pika.BasicProperties(
+                                    content_type="application/json",
+                                    delivery_mode=2  # Make message persistent
+                                ),
+                                mandatory=True,
+                            )
+                        except (NackError, UnroutableError) as e:
+                            raise PublishError(str(e)) from e
+                        pending.popleft()
+            except RECONNECT_ERRORS as e:
+                if attempt == self.attempts:
+                    raise
+                logger.warning("RabbitMQ publish failed (attempt %s/%s): %s", attempt, self.attempts, e)
+
+    def publish(self, message):
+        self.publish_many([message])
+
+    def close(self):
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(connection)
@@ -1,37 +1,14 @@
-import pika
-import json
-import os
 from django.conf import settings
 
+from .publisher import Publisher
 
-def publish_notification_event(message: dict):
-    # Connect using the RabbitMQ URL from settings
-    params = pika.URLParameters(settings.RABBITMQ_URL)
-    connection = pika.BlockingConnection(params)
-    channel = connection.channel()
+# One pool per process; connections are opened lazily on first publish.
+notification_publisher = Publisher(
+    url=settings.RABBITMQ_URL,
+    exchange=settings.NOTIFICATION_EXCHANGE,
+    routing_key=settings.NOTIFICATION_ROUTING_KEY,
+    queue_name=settings.NOTIFICATION_QUEUE,
+    exchange_type='direct',
+    pool_size=settings.NOTIFICATION_PUBLISHER_POOL_SIZE,
+)
 
-    # Declare exchange and queue from settings
-    channel.exchange_declare(
-        exchange=settings.NOTIFICATION_EXCHANGE,
-        exchange_type='direct',
-        durable=True
-    )
-
-    channel.queue_declare(queue=settings.NOTIFICATION_QUEUE, durable=True)
-
-    channel.queue_bind(
-        exchange=settings.NOTIFICATION_EXCHANGE,
-        queue=settings.NOTIFICATION_QUEUE,
-        routing_key=settings.NOTIFICATION_ROUTING_KEY
-    )
-
-    channel.basic_publish(
-        exchange=settings.NOTIFICATION_EXCHANGE,
-        routing_key=settings.NOTIFICATION_ROUTING_KEY,
-        body=json.dumps(message),
-        properties=pika.BasicProperties(
-            delivery_mode=2  # Make message persistent
-        )
-    )
-
-    connection.close()
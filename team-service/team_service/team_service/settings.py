@@ -42,6 +42,23 @@ TEAM_SKILL_QUEUE = "team-service.skill-created"
 NOTIFICATION_EXCHANGE = "notification_exchange"
 NOTIFICATION_ROUTING_KEY = "notification.join_request"
 NOTIFICATION_QUEUE = "notification_queue"
+
+# Long-lived publisher connections kept per process
+NOTIFICATION_PUBLISHER_POOL_SIZE = int(os.getenv("NOTIFICATION_PUBLISHER_POOL_SIZE", 4))
+
+# Consumers retry a failed message once per delay (milliseconds), then move
+# it to <queue>.dead through DEAD_LETTER_EXCHANGE
+CONSUMER_RETRY_DELAYS_MS = [int(ms) for ms in os.getenv("CONSUMER_RETRY_DELAYS_MS", "1000,10000,60000").split(",") if ms]
+DEAD_LETTER_EXCHANGE = "dead-letter"
+
+# user_sync/skill_sync upsert up to BATCH_SIZE events per statement, waiting
+# at most MAX_WAIT_MS for a batch to fill
+REPLICA_SYNC_BATCH_SIZE = int(os.getenv("REPLICA_SYNC_BATCH_SIZE", 1000))
+REPLICA_SYNC_MAX_WAIT_MS = int(os.getenv("REPLICA_SYNC_MAX_WAIT_MS", 200))
+
+# bootstrap_replicas pulls users and skills from user-service's export
+USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://user-service:8000")
+REPLICA_EXPORT_TOKEN = os.getenv("REPLICA_EXPORT_TOKEN", "")
 #####
 
 
@@ -63,6 +80,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'teams',
     'corsheaders',
     "django_celery_beat",
@@ -109,6 +127,7 @@ AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_STORAGE_BUCKET_NAME = os.getenv("AWS_STORAGE_BUCKET_NAME")
 AWS_S3_REGION_NAME = os.getenv("AWS_S3_REGION_NAME", "ap-south-1")
+AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL")  # e.g. a local minio/moto server
 AWS_S3_CUSTOM_DOMAIN = f'{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com'
 AWS_S3_OBJECT_PARAMETERS = {
     'CacheControl': 'max-age=86400',
@@ -122,6 +141,10 @@ MEDIA_ROOT = 'profile_images/'
 # By default, files are private. We will generate pre-signed URLs to access them.
 AWS_DEFAULT_ACL = 'private'
 
+# Presigned profile image URLs are cached per process for up to this long
+PRESIGNED_URL_CACHE_SIZE = int(os.getenv("PRESIGNED_URL_CACHE_SIZE", 10000))
+PRESIGNED_URL_CACHE_TTL = int(os.getenv("PRESIGNED_URL_CACHE_TTL", 3000))
+
 
 
 # Database
@@ -148,6 +171,42 @@ DATABASES = {
 }
 
 
+# Cache
+# locmem by default, for tests and a single dev process; compose points
+# every team-service process at Redis, so invalidations from the celery
+# worker and the consumers reach the web workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'team-service'),
+    }
+}
+
+TEAM_LISTING_CACHE_ENABLED = os.getenv('TEAM_LISTING_CACHE_ENABLED', 'true').lower() == 'true'
+TEAM_LISTING_CACHE_TTL = int(os.getenv('TEAM_LISTING_CACHE_TTL', 300))
+
+# Skill search ranks at most this many of the newest matching teams
+TEAM_SKILL_SEARCH_CANDIDATES = int(os.getenv('TEAM_SKILL_SEARCH_CANDIDATES', 1000))
+
+# How often each process folds changed teams into its in-memory
+# recommendation index
+RECOMMENDER_REFRESH_SECONDS = float(os.getenv('RECOMMENDER_REFRESH_SECONDS', 5))
+# How often it also drops deleted teams, which leave no updated row behind
+RECOMMENDER_RECONCILE_SECONDS = float(os.getenv('RECOMMENDER_RECONCILE_SECONDS', 300))
+
+
+# DRF: every view authenticates `Authorization: Bearer <jwt>` through the
+# cached verifier; public views opt into OptionalJWTAuthentication
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': ['teams.authentication.JWTAuthentication'],
+}
+
+# Verified tokens remembered per process (LRU, bounded by each token's exp)
+JWT_VERIFY_CACHE_SIZE = int(os.getenv('JWT_VERIFY_CACHE_SIZE', 10000))
+# How often each process adds its auth counters to the shared metrics
+AUTH_METRICS_FLUSH_SECONDS = float(os.getenv('AUTH_METRICS_FLUSH_SECONDS', 10))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
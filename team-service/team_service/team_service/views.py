@@ -1,6 +1,20 @@
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from teams.utils import metrics
+from teams.utils.verify_user import flush_metrics as flush_auth_metrics
 
 class HealthCheckView(APIView):
+    authentication_classes = []
+
+    def get(self, request):
+        return Response({"status": "ok"})
+
+
+class MetricsView(APIView):
+    authentication_classes = []
+
     def get(self, request):
-        return Response({"status": "ok"})
\ No newline at end of file
+        # Auth counters are gathered in-process; add this worker's latest
+        # ones (other workers flush theirs every AUTH_METRICS_FLUSH_SECONDS)
+        flush_auth_metrics(force=True)
+        return Response(metrics.snapshot())
@@ -0,0 +1,27 @@
+from hackmate_common.auth import BearerAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from .utils.verify_user import verify_user
+
+
+class JWTAuthentication(BearerAuthentication):
+    """
+    Authenticates bearer tokens through the cached verify_user; a bad
+    token is rejected with 401.
+    """
+
+    def verify(self, token):
+        return verify_user(token)
+
+
+class OptionalJWTAuthentication(JWTAuthentication):
+    """
+    For public views that only personalise their output: an invalid or
+    expired token is treated like no token at all.
+    """
+
+    def authenticate(self, request):
+        try:
+            return super().authenticate(request)
+        except AuthenticationFailed:
+            return None
@@ -0,0 +1,48 @@
+import time
+
+import boto3
+from botocore.config import Config
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from teams.utils.generate_s3_url import URL_EXPIRES_IN, generate_presigned_s3_urls, presigned_url_cache
+
+
+class Command(BaseCommand):
+    help = 'Compares per-call boto3 client presigning with the shared client and URL cache (works against AWS_S3_ENDPOINT_URL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keys", type=int, default=8, help="Distinct object keys, e.g. members on a team page")
+        parser.add_argument("--requests", type=int, default=200)
+
+    def handle(self, *args, **options):
+        keys = [f"profile_images/benchmark_{i}.jpg" for i in range(options["keys"])]
+        requests = options["requests"]
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            for key in keys:
+                # Mirrors the previous implementation: a new client per URL
+                client = boto3.client(
+                    's3',
+                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                    region_name=settings.AWS_S3_REGION_NAME,
+                    endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+                    config=Config(signature_version='s3v4')
+                )
+                client.generate_presigned_url(
+                    'get_object',
+                    Params={'Bucket': settings.AWS_STORAGE_BUCKET_NAME, 'Key': key},
+                    ExpiresIn=URL_EXPIRES_IN
+                )
+        per_call_client = time.perf_counter() - start
+
+        presigned_url_cache.clear()
+        start = time.perf_counter()
+        for _ in range(requests):
+            generate_presigned_s3_urls(keys)
+        cached = time.perf_counter() - start
+
+        for label, elapsed in [("client per URL", per_call_client), ("shared client + URL cache", cached)]:
+            self.stdout.write(f"{label:<26} {elapsed * 1000 / requests:8.3f} ms per {len(keys)}-avatar page")
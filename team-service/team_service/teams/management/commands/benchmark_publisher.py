@@ -0,0 +1,67 @@
+import json
+import time
+
+import pika
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from team_service.producers.publisher import Publisher
+
+EXCHANGE = "benchmark.publisher"
+QUEUE = "benchmark.publisher"
+ROUTING_KEY = "benchmark"
+
+
+class Command(BaseCommand):
+    help = 'Compares per-message connect publishing with the pooled publisher against the configured RabbitMQ'
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=500)
+
+    def publish_connect_per_message(self, message):
+        # Mirrors the previous send_notification implementation
+        connection = pika.BlockingConnection(pika.URLParameters(settings.RABBITMQ_URL))
+        channel = connection.channel()
+        channel.exchange_declare(exchange=EXCHANGE, exchange_type='direct', durable=True)
+        channel.queue_declare(queue=QUEUE, durable=True)
+        channel.queue_bind(exchange=EXCHANGE, queue=QUEUE, routing_key=ROUTING_KEY)
+        channel.basic_publish(
+            exchange=EXCHANGE,
+            routing_key=ROUTING_KEY,
+            body=json.dumps(message),
+            properties=pika.BasicProperties(delivery_mode=2),
+        )
+        connection.close()
+
+    def handle(self, *args, **options):
+        count = options["messages"]
+        messages = [{"user_id": i, "team_application_id": 0, "message": "benchmark", "type": "benchmark"} for i in range(count)]
+        publisher = Publisher(settings.RABBITMQ_URL, EXCHANGE, ROUTING_KEY, queue_name=QUEUE)
+
+        try:
+            start = time.perf_counter()
+            for message in messages:
+                self.publish_connect_per_message(message)
+            per_message = time.perf_counter() - start
+
+            publisher.publish(messages[0])  # warm the pool
+            start = time.perf_counter()
+            for message in messages:
+                publisher.publish(message)
+            pooled = time.perf_counter() - start
+
+            start = time.perf_counter()
+            publisher.publish_many(messages)
+            batched = time.perf_counter() - start
+        finally:
+            publisher.close()
+            connection = pika.BlockingConnection(pika.URLParameters(settings.RABBITMQ_URL))
+            connection.channel().queue_delete(queue=QUEUE)
+            connection.close()
+
+        for label, elapsed in [
+            ("connect per message", per_message),
+            ("pooled publish (confirmed)", pooled),
+            ("pooled publish_many (confirmed)", batched),
+        ]:
+            self.stdout.write(f"{label:<34} {elapsed * 1000 / count:8.3f} ms/msg  {count / elapsed:10.1f} msg/s")
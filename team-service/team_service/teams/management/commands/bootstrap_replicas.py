@@ -0,0 +1,107 @@
+import json
+
+import pika
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from hackmate_common.rabbitmq import Consumer, connect_to_rabbitmq
+from teams.models import ReplicaBootstrap
+from teams.utils.replicas import copy_row, copy_rows
+
+
+class Command(BaseCommand):
+    help = ("Seeds the user and skill replicas from user-service's export. Run with team-consumer and "
+            "team-consumer-skill stopped; start them afterwards to apply the events queued meanwhile.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=50000, help="Rows requested per export page")
+        parser.add_argument("--restart", action="store_true",
+                            help="Ignore recorded progress and load everything again")
+        parser.add_argument("--force", action="store_true",
+                            help="Run even though a replica consumer is connected")
+
+    def handle(self, *args, **options):
+        if not settings.REPLICA_EXPORT_TOKEN:
+            raise CommandError("REPLICA_EXPORT_TOKEN is not set.")
+
+        # Step 1: Declare the consumer queues before reading the snapshot.
+        # Every event published from here on is kept in them, so the
+        # consumers resume exactly where the snapshot starts, without gaps.
+        # Consumers running meanwhile could be overwritten by older pages.
+        consumers = [
+            Consumer(settings.TEAM_SKILL_QUEUE, exchange=settings.SKILL_EVENTS_EXCHANGE,
+                     routing_key=settings.SKILL_CREATED_ROUTING_KEY),
+            Consumer(settings.TEAM_SERVICE_QUEUE, exchange=settings.USER_EVENTS_EXCHANGE,
+                     routing_key=settings.USER_CREATED_ROUTING_KEY),
+        ]
+        connection = connect_to_rabbitmq(pika.URLParameters(settings.RABBITMQ_URL))
+        try:
+            channel = connection.channel()
+            for consumer in consumers:
+                consumer.declare(channel)
+                if self.queue_state(channel, consumer.queue).consumer_count and not options["force"]:
+                    raise CommandError(f"A consumer is connected to {consumer.queue}; stop it first or pass --force.")
+
+            # Step 2: Load the snapshot page by page; skills first, they are small
+            for table in ("skills", "users"):
+                self.load(table, options["page_size"], options["restart"])
+
+            # Step 3: Report what the consumers will catch up on
+            for consumer in consumers:
+                queued = self.queue_state(channel, consumer.queue).message_count
+                self.stdout.write(f"{queued} event(s) waiting in {consumer.queue}; start its consumer to apply them.")
+        finally:
+            connection.close()
+
+    @staticmethod
+    def queue_state(channel, queue):
+        return channel.queue_declare(queue=queue, durable=True, passive=True).method
+
+    def load(self, table, page_size, restart):
+        state, created = ReplicaBootstrap.objects.get_or_create(table=table, defaults={"started_at": timezone.now()})
+        if restart and not created:
+            state.last_id = state.rows_loaded = 0
+            state.started_at = timezone.now()
+            state.completed_at = None
+            state.save()
+        elif state.completed_at:
+            self.stdout.write(f"{table}: already loaded ({state.rows_loaded} rows); pass --restart to reload.")
+            return
+        elif state.last_id:
+            self.stdout.write(f"{table}: resuming after id {state.last_id}")
+
+        # An empty page marks the end: a short page may just be capped by
+        # user-service's maximum page size
+        while True:
+            rows = self.fetch_page(table, state.last_id, page_size)
+            if not rows:
+                break
+            # The page and the progress that skips it next time commit together
+            with transaction.atomic():
+                copy_rows(table, rows)
+                state.last_id = rows[-1][0]
+                state.rows_loaded += len(rows)
+                state.save(update_fields=["last_id", "rows_loaded"])
+            self.stdout.write(f"{table}: {state.rows_loaded} rows loaded (last id {state.last_id})")
+
+        state.completed_at = timezone.now()
+        state.save(update_fields=["completed_at"])
+        self.stdout.write(f"{table}: done, {state.rows_loaded} rows")
+
+    def fetch_page(self, table, after, page_size):
+        response = requests.get(
+            f"{settings.USER_SERVICE_URL}/api/export/{table}/",
+            params={"after": after, "limit": page_size},
+            headers={"Authorization": f"Bearer {settings.REPLICA_EXPORT_TOKEN}"},
+            stream=True,
+            timeout=(5, 60),
+        )
+        try:
+            if response.status_code != 200:
+                raise CommandError(f"user-service export of {table} failed with HTTP {response.status_code}")
+            return [copy_row(table, json.loads(line)) for line in response.iter_lines() if line]
+        finally:
+            response.close()
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+
+from team_service.producers.send_notification import notification_publisher
+from teams.utils import outbox
+
+
+class Command(BaseCommand):
+    help = 'Publishes outbox events to RabbitMQ as they are committed'
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--poll-interval", type=float, default=5.0,
+                            help="Seconds to wait for a NOTIFY before checking the outbox anyway")
+        parser.add_argument("--once", action="store_true", help="Drain the outbox once and exit")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if options["once"]:
+            total = 0
+            while (published := outbox.relay_batch(notification_publisher, batch_size)):
+                total += published
+            self.stdout.write(f"Published {total} outbox events.")
+            return
+
+        self.stdout.write(" [*] Relaying outbox events. To exit press CTRL+C")
+        while True:
+            try:
+                outbox.listen()
+                while outbox.relay_batch(notification_publisher, batch_size) == batch_size:
+                    pass
+                outbox.wait_for_events(options["poll_interval"])
+            except DatabaseError as e:
+                self.stderr.write(f"[!] Outbox relay database error: {e}")
+                connection.close()
+                time.sleep(1)
+            except Exception as e:
+                # Broker unavailable or message nacked; rows stay in the outbox
+                self.stderr.write(f"[!] Outbox relay publish failed: {e}")
+                time.sleep(1)
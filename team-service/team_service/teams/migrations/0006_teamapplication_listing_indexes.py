@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0005_alter_customuser_profile_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='teamapplication',
+            index=models.Index(fields=['-created_at', '-id'], name='teamapp_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teamapplication',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='teamapp_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teamapplication',
+            index=models.Index(fields=['status', 'hackathon_date'], name='teamapp_status_hackdate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teamapplication',
+            index=models.Index(condition=models.Q(('capacity_left__gt', 0)), fields=['-created_at', '-id'], name='teamapp_has_capacity_idx'),
+        ),
+    ]
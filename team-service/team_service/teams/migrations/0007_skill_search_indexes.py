@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:08
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0006_teamapplication_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(django.db.models.functions.text.Lower('skill'), name='skill_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teamapplication',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skills'], name='teamapp_skills_gin_idx'),
+        ),
+    ]
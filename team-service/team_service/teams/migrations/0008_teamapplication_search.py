@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:09
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0007_skill_search_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='teamapplication',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('team_name', config='english', weight='A'), '||', django.contrib.postgres.search.SearchVector('title', config='english', weight='A'), django.contrib.postgres.search.SearchConfig('english')), '||', django.contrib.postgres.search.SearchVector('description', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('english')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='teamapplication',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='teamapp_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teamapplication',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['team_name'], name='teamapp_team_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Leaders first so they keep the leader role even when they also appear in
+# member_user_ids (they always do for teams created through the API).
+BACKFILL_MEMBERSHIPS = """
+INSERT INTO teams_teammembership (team_id, user_id, role, joined_at)
+SELECT id, leader_user_id, 'leader', created_at
+FROM teams_teamapplication
+ON CONFLICT (team_id, user_id) DO NOTHING;
+
+INSERT INTO teams_teammembership (team_id, user_id, role, joined_at)
+SELECT t.id, m.user_id, 'member', t.updated_at
+FROM teams_teamapplication t
+CROSS JOIN LATERAL unnest(t.member_user_ids) AS m(user_id)
+ON CONFLICT (team_id, user_id) DO NOTHING;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0009_customuser_skills'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('role', models.CharField(choices=[('leader', 'Leader'), ('member', 'Member')], default='member', max_length=10)),
+                ('joined_at', models.DateTimeField(auto_now_add=True)),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='teams.teamapplication')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_id', 'team'], name='membership_user_team_idx')],
+                'constraints': [models.UniqueConstraint(fields=('team', 'user_id'), name='unique_team_membership')],
+            },
+        ),
+        migrations.RunSQL(
+            sql=BACKFILL_MEMBERSHIPS,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
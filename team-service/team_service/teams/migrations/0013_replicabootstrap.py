@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0012_customuser_profile_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReplicaBootstrap',
+            fields=[
+                ('table', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_id', models.IntegerField(default=0)),
+                ('rows_loaded', models.IntegerField(default=0)),
+                ('started_at', models.DateTimeField()),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
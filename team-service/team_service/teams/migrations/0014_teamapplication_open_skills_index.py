@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:51
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0013_replicabootstrap'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='teamapplication',
+            index=django.contrib.postgres.indexes.GinIndex(condition=models.Q(('status', 'open')), fields=['skills'], name='teamapp_open_skills_gin_idx'),
+        ),
+    ]
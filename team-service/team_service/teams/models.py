@@ -1,5 +1,8 @@
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db.models.functions import Lower
 from django.core.files.storage import default_storage
 
 
@@ -33,6 +36,37 @@ class TeamApplication(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    # Full-text document maintained by Postgres on every insert/update
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('team_name', weight='A', config='english')
+            + SearchVector('title', weight='A', config='english')
+            + SearchVector('description', weight='B', config='english')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            # Keyset pagination on (created_at, id), newest first
+            models.Index(fields=['-created_at', '-id'], name='teamapp_created_id_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='teamapp_status_created_idx'),
+            models.Index(fields=['status', 'hackathon_date'], name='teamapp_status_hackdate_idx'),
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(capacity_left__gt=0),
+                name='teamapp_has_capacity_idx',
+            ),
+            # Array operators (&&, @>) on required skills
+            GinIndex(fields=['skills'], name='teamapp_skills_gin_idx'),
+            # Skill search defaults to open teams
+            GinIndex(fields=['skills'], condition=models.Q(status='open'), name='teamapp_open_skills_gin_idx'),
+            GinIndex(fields=['search_vector'], name='teamapp_search_vector_idx'),
+            # Typo-tolerant team name lookups (pg_trgm)
+            GinIndex(fields=['team_name'], opclasses=['gin_trgm_ops'], name='teamapp_team_name_trgm_idx'),
+        ]
     
 
 class TeamJoinRequest(models.Model):
@@ -54,20 +88,79 @@ class TeamJoinRequest(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
 
+class TeamMembership(models.Model):
+    team = models.ForeignKey(TeamApplication, on_delete=models.CASCADE, related_name='memberships')
+    user_id = models.IntegerField()  # Refers to CustomUser.id (integer)
+    role = models.CharField(
+        max_length=10,
+        choices=[
+            ('leader', 'Leader'),
+            ('member', 'Member')
+        ],
+        default='member'
+    )
+    joined_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['team', 'user_id'], name='unique_team_membership'),
+        ]
+        indexes = [
+            # "My teams" and role lookups are index-only scans on this
+            models.Index(fields=['user_id', 'team'], name='membership_user_team_idx'),
+        ]
+
+
+class OutboxEvent(models.Model):
+    """
+    Notification event written in the same transaction as the state change
+    that caused it, and published to RabbitMQ later by the outbox relay.
+    """
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class ReplicaBootstrap(models.Model):
+    """
+    Progress of `bootstrap_replicas` per replica table: the last id loaded
+    from user-service's export, so an interrupted run resumes there.
+    """
+    table = models.CharField(max_length=50, primary_key=True)
+    last_id = models.IntegerField(default=0)
+    rows_loaded = models.IntegerField(default=0)
+    started_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+
 class CustomUser(models.Model):
     id = models.IntegerField(primary_key=True)       
     email = models.EmailField(unique=True)
     full_name = models.CharField(max_length=255)
     # profile_image = models.URLField(max_length=1000, null=True, blank=True)
     profile_image = models.CharField(max_length=1000, null=True, blank=True)
+    # Resized copies from user-service, e.g. {"small": "..._64.webp", "medium": "..._256.webp"}
+    profile_image_variants = models.JSONField(default=dict, blank=True)
+    skills = ArrayField(models.IntegerField(), default=list, blank=True)
     
     def __str__(self):
         return self.email
+
+    def avatar_key(self, variant="medium"):
+        """
+        Storage key to hand out for this user's avatar: the resized variant
+        once user-service has generated it, the original upload until then.
+        """
+        return (self.profile_image_variants or {}).get(variant) or self.profile_image
     
 
 class Skill(models.Model):
     id = models.IntegerField(primary_key=True) 
     skill = models.CharField(max_length=100)
 
+    class Meta:
+        indexes = [
+            models.Index(Lower('skill'), name='skill_lower_idx'),
+        ]
+
     def __str__(self):
         return self.skill
\ No newline at end of file
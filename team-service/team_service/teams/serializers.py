@@ -2,64 +2,10 @@
 
 from rest_framework import serializers
 from .models import TeamApplication, TeamJoinRequest, CustomUser, Skill
-from django.conf import settings
-import boto3
-from botocore.exceptions import ClientError
+from .utils.generate_s3_url import generate_presigned_s3_url, generate_presigned_s3_urls
 
 # --- Base Serializers ---
 
-
-import logging
-
-# It's good practice to set up a logger for utility functions
-logger = logging.getLogger(__name__)
-
-def generate_presigned_s3_url(object_key: str) -> str | None:
-    """
-    Generates a pre-signed URL for a given S3 object key.
-
-    This function is designed to work with a CharField that stores the
-    path to the file in S3 (e.g., 'profile_images/scdc9r8ud5pb1.jpg').
-
-    Args:
-        object_key: The key (path) of the object in the S3 bucket.
-
-    Returns:
-        A pre-signed URL string if successful, otherwise None.
-    """
-    if not object_key:
-        return None
-
-    # Initialize the S3 client using credentials from Django settings
-    s3_client = boto3.client(
-        's3',
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_S3_REGION_NAME,
-        # You might need to add this for pre-signed URLs
-        config=boto3.session.Config(signature_version='s3v4')
-    )
-
-    try:
-        # Generate the pre-signed URL.
-        # The 'Key' is the object_key passed to the function.
-        presigned_url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={
-                'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
-                'Key': object_key
-            },
-            ExpiresIn=3600  # URL expires in 1 hour (in seconds)
-        )
-        return presigned_url
-    except ClientError as e:
-        # Log the error for debugging purposes
-        logger.error(f"Error generating pre-signed URL for key '{object_key}': {e}")
-        return None
-
-
-from .utils.generate_s3_url import generate_presigned_s3_url
-
 class CustomUserSerializer(serializers.ModelSerializer):
     profile_image = serializers.SerializerMethodField()
 
@@ -68,7 +14,12 @@ class CustomUserSerializer(serializers.ModelSerializer):
         fields = ['id', 'email', 'full_name', 'profile_image']
 
     def get_profile_image(self, obj):
-        return generate_presigned_s3_url(obj.profile_image)
+        # Prefer URLs presigned in bulk by the parent serializer
+        key = obj.avatar_key()
+        profile_image_urls = self.context.get("profile_image_urls")
+        if profile_image_urls is not None and key in profile_image_urls:
+            return profile_image_urls[key]
+        return generate_presigned_s3_url(key)
     
 
 class SkillSerializer(serializers.ModelSerializer):
@@ -136,11 +87,35 @@ class TeamApplicationListSerializer(serializers.ModelSerializer):
         user_id = self.context.get("current_user_id")
         if user_id is None: return "default"
         if int(obj.leader_user_id) == int(user_id): return "owner"
-        if int(user_id) in obj.member_user_ids: return "member"
+        member_team_ids = self.context.get("member_team_ids")
+        if member_team_ids is not None:
+            if obj.id in member_team_ids: return "member"
+        elif int(user_id) in obj.member_user_ids: return "member"
         if int(obj.id) in self.context.get("user_join_requests_map", set()): return "pending"
         return "default"
 
 
+class TeamSkillMatchSerializer(TeamApplicationListSerializer):
+    match_count = serializers.IntegerField(read_only=True)
+
+    class Meta(TeamApplicationListSerializer.Meta):
+        fields = TeamApplicationListSerializer.Meta.fields + ['match_count']
+
+
+class TeamSearchResultSerializer(TeamApplicationListSerializer):
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(TeamApplicationListSerializer.Meta):
+        fields = TeamApplicationListSerializer.Meta.fields + ['rank']
+
+
+class TeamRecommendationSerializer(TeamApplicationListSerializer):
+    score = serializers.FloatField(read_only=True)
+
+    class Meta(TeamApplicationListSerializer.Meta):
+        fields = TeamApplicationListSerializer.Meta.fields + ['score']
+
+
 
 class TeamApplicationDetailSerializer(serializers.ModelSerializer):
     skill_names = serializers.SerializerMethodField()
@@ -161,10 +136,19 @@ class TeamApplicationDetailSerializer(serializers.ModelSerializer):
         skill_map = self.context.get("skill_map", {})
         return [skill_map.get(skill_id) for skill_id in obj.skills if skill_map.get(skill_id)]
 
+    def _user_context(self):
+        # Presign every avatar on this team once, for leader and members
+        if not hasattr(self, "_profile_image_urls"):
+            user_map = self.context.get("user_map", {})
+            self._profile_image_urls = generate_presigned_s3_urls(
+                user.avatar_key() for user in user_map.values()
+            )
+        return {"profile_image_urls": self._profile_image_urls}
+
     def get_leader(self, obj):
         user_map = self.context.get("user_map", {})
         user = user_map.get(obj.leader_user_id)
-        return CustomUserSerializer(user).data if user else None
+        return CustomUserSerializer(user, context=self._user_context()).data if user else None
 
     def get_members(self, obj):
         user_map = self.context.get("user_map", {})
@@ -172,5 +156,5 @@ class TeamApplicationDetailSerializer(serializers.ModelSerializer):
         for user_id in obj.member_user_ids:
             user = user_map.get(user_id)
             if user:
-                member_data.append(CustomUserSerializer(user).data)
+                member_data.append(CustomUserSerializer(user, context=self._user_context()).data)
         return member_data
@@ -1,12 +1,19 @@
+import logging
+
 from celery import shared_task
 from datetime import date
+from django.utils import timezone
 from .models import TeamApplication
+from .utils import listing_cache
+
+logger = logging.getLogger(__name__)
 
 @shared_task
 def expire_old_team_applications():
-    print("TASK RAN!!!!!!!!!!!!")
     today = date.today()
     expired_teams = TeamApplication.objects.filter(status='open', hackathon_date__lt=today)
 
-    count = expired_teams.update(status='expired')
-    print(f"[CRON] Marked {count} teams as expired.")
+    count = expired_teams.update(status='expired', updated_at=timezone.now())
+    if count:
+        listing_cache.invalidate()
+    logger.info("Marked %d teams as expired", count)
@@ -1,3 +1,924 @@
-from django.test import TestCase
+import base64
+import json
+import os
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
 
-# Create your tests here.
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from pika.exceptions import NackError, StreamLostError
+from rest_framework.exceptions import AuthenticationFailed
+from team_service.producers.publisher import Publisher, PublishError
+from django.urls import reverse
+from django.utils import timezone as django_timezone
+
+from .models import CustomUser, OutboxEvent, Skill, TeamApplication, TeamJoinRequest, TeamMembership
+from .utils import listing_cache, metrics, outbox
+from .utils.join_requests import JoinRequestConflict, accept_join_request
+from .utils.conditional import PRESIGN_WINDOW_SECONDS
+from .utils.pagination import decode_cursor, encode_cursor, paginate_keyset
+from .utils import verify_user as verify_user_module
+from .utils.recommender import TeamSkillIndex
+from .utils.replicas import upsert_users, user_from_event
+from .utils.search import rank_by_skill_overlap, resolve_skill_ids
+from .utils.verify_user import VerifiedTokenCache, verify_user
+
+
+def create_team(**fields):
+    defaults = {
+        "title": "Team", "team_name": "Team", "leader_user_id": 1, "member_user_ids": [1],
+        "skills": [], "capacity": 4, "capacity_left": 3, "hackathon_date": date.today(),
+    }
+    return TeamApplication.objects.create(**{**defaults, **fields})
+
+
+def bearer(user_id, **claims):
+    now = int(time.time())
+    token = jwt.encode(
+        {"user_id": user_id, "iat": now, "exp": now + 3600, **claims}, os.environ["JWT_SECRET_KEY"], algorithm="HS256"
+    )
+    return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+
+class AcceptJoinRequestConcurrencyTests(TransactionTestCase):
+    """
+    Fires hundreds of accepts at one team at the same time. Runs against
+    real Postgres transactions, so the row locking of the seat claim is
+    what is being tested.
+    """
+    capacity = 5
+    requesters = 300
+    # Threads start together but share this many database connections,
+    # staying under Postgres' default max_connections of 100
+    max_connections = 50
+
+    def create_team(self, **fields):
+        defaults = {
+            "title": "Race", "team_name": "Race", "leader_user_id": 1, "member_user_ids": [1],
+            "skills": [], "capacity": self.capacity, "capacity_left": self.capacity,
+            "hackathon_date": date.today(),
+        }
+        return TeamApplication.objects.create(**{**defaults, **fields})
+
+    def test_parallel_accepts_fill_team_exactly(self):
+        team = self.create_team()
+        join_requests = TeamJoinRequest.objects.bulk_create([
+            TeamJoinRequest(team_application=team, user_id=1000 + i, message="Let me in")
+            for i in range(self.requesters)
+        ])
+
+        start = threading.Barrier(self.requesters)
+        slots = threading.BoundedSemaphore(self.max_connections)
+        lock = threading.Lock()
+        accepted, conflicts, errors = [], [], []
+
+        def accept(join_request):
+            start.wait()
+            with slots:
+                try:
+                    result = accept_join_request(join_request)
+                    with lock:
+                        accepted.append(result)
+                except JoinRequestConflict as e:
+                    with lock:
+                        conflicts.append(str(e))
+                except Exception as e:
+                    with lock:
+                        errors.append(e)
+                finally:
+                    connections.close_all()
+
+        threads = [threading.Thread(target=accept, args=(jr,)) for jr in join_requests]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(accepted), self.capacity)
+        self.assertEqual(len(conflicts), self.requesters - self.capacity)
+        self.assertEqual(set(conflicts), {"Team is already full"})
+
+        team.refresh_from_db()
+        self.assertEqual(team.capacity_left, 0)
+        self.assertEqual(team.status, "filled")
+        self.assertEqual(TeamMembership.objects.filter(team=team).count(), self.capacity)
+        self.assertEqual(TeamJoinRequest.objects.filter(team_application=team, status="accepted").count(), self.capacity)
+        self.assertEqual(len(team.member_user_ids), self.capacity + 1)
+
+    def test_accepting_existing_member_is_a_distinct_conflict(self):
+        team = self.create_team(member_user_ids=[1, 42])
+        join_request = TeamJoinRequest.objects.create(team_application=team, user_id=42, message="Again")
+
+        with self.assertRaisesMessage(JoinRequestConflict, "User is already a member of this team"):
+            accept_join_request(join_request)
+
+        join_request.refresh_from_db()
+        team.refresh_from_db()
+        self.assertEqual(join_request.status, "pending")
+        self.assertEqual(team.capacity_left, self.capacity)
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.team = create_team(leader_user_id=1, member_user_ids=[1, 2])
+        self.join_request = TeamJoinRequest.objects.create(team_application=self.team, user_id=3, message="Hi")
+        self.url = reverse("update-join-request-status", args=[self.join_request.id])
+
+    def decide(self, status):
+        return self.client.patch(self.url, {"status": status}, content_type="application/json", **bearer(1))
+
+    def test_accept_writes_events_for_members_and_requester(self):
+        response = self.decide("accepted")
+        self.assertEqual(response.status_code, 200, response.content)
+        events = list(OutboxEvent.objects.order_by("id").values_list("payload", flat=True))
+        self.assertEqual(
+            [(event.get("recipient_ids"), event.get("user_id"), event["type"]) for event in events],
+            [([1, 2], None, "new_member_added"), (None, 3, "request_accepted")],
+        )
+
+    def test_events_roll_back_with_the_decision(self):
+        def enqueue_then_fail(events):
+            outbox.enqueue(events)
+            raise RuntimeError("decision failed after the events were written")
+
+        with mock.patch("teams.views.outbox.enqueue", side_effect=enqueue_then_fail):
+            with self.assertRaises(RuntimeError):
+                self.decide("accepted")
+        self.assertFalse(OutboxEvent.objects.exists())
+        self.join_request.refresh_from_db()
+        self.assertEqual(self.join_request.status, "pending")
+
+    def test_conflict_writes_no_events(self):
+        TeamApplication.objects.filter(id=self.team.id).update(capacity_left=0, status="filled")
+        self.assertEqual(self.decide("accepted").status_code, 400)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_relay_deletes_rows_only_after_the_broker_confirms(self):
+        outbox.enqueue([{"n": 1}, {"n": 2}, {"n": 3}])
+        publisher = mock.Mock()
+        # Rows are still there while publish_many waits for the confirms
+        publisher.publish_many.side_effect = lambda payloads: self.assertEqual(OutboxEvent.objects.count(), 3)
+
+        self.assertEqual(outbox.relay_batch(publisher, batch_size=2), 2)
+        publisher.publish_many.assert_called_once_with([{"n": 1}, {"n": 2}])
+        self.assertEqual(list(OutboxEvent.objects.values_list("payload", flat=True)), [{"n": 3}])
+
+    def test_relay_keeps_rows_when_publishing_fails(self):
+        outbox.enqueue([{"n": 1}, {"n": 2}])
+        publisher = mock.Mock()
+        publisher.publish_many.side_effect = ConnectionError("broker nacked")
+
+        with self.assertRaises(ConnectionError):
+            outbox.relay_batch(publisher)
+        self.assertEqual(OutboxEvent.objects.count(), 2)
+
+        publisher.publish_many.side_effect = None
+        self.assertEqual(outbox.relay_batch(publisher), 2)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+
+class KeysetPaginationTests(TestCase):
+    """Team listing pages follow (created_at, id) newest first."""
+
+    @classmethod
+    def setUpTestData(cls):
+        base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        cls.teams = []
+        for i in range(23):
+            team = create_team(
+                team_name=f"Team {i}",
+                status=["open", "closed", "filled"][i % 3],
+                skills=[1, 2] if i % 2 else [2],
+                capacity_left=i % 4,
+                hackathon_date=date(2026, 6, 1) + timedelta(days=i),
+            )
+            cls.teams.append(team)
+        # Runs of equal timestamps, so the id tie-break is exercised
+        for i, team in enumerate(cls.teams):
+            TeamApplication.objects.filter(id=team.id).update(created_at=base + timedelta(minutes=i // 3))
+
+    def setUp(self):
+        # Listing pages are cached; start every test from an empty cache
+        cache.clear()
+
+    def newest_first(self, teams):
+        return [
+            team.id for team in
+            TeamApplication.objects.filter(id__in=[t.id for t in teams]).order_by("-created_at", "-id")
+        ]
+
+    def walk(self, params=None, limit=4):
+        """All ids returned by following next_cursor from the first page."""
+        url = reverse("list-team-applications")
+        ids, cursor = [], None
+        for _ in range(len(self.teams) + 1):
+            query = {**(params or {}), "limit": limit}
+            if cursor:
+                query["cursor"] = cursor
+            response = self.client.get(url, query)
+            self.assertEqual(response.status_code, 200, response.content)
+            page = response.json()
+            self.assertLessEqual(len(page["results"]), limit)
+            ids += [row["id"] for row in page["results"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return ids
+        self.fail("next_cursor never ran out")
+
+    def test_pages_return_every_row_once_in_order(self):
+        ids = self.walk()
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(ids, self.newest_first(self.teams))
+
+    def test_page_size_dividing_the_row_count(self):
+        self.assertEqual(self.walk(limit=1), self.newest_first(self.teams))
+        self.assertEqual(self.walk(limit=23), self.newest_first(self.teams))
+
+    def test_paginate_keyset_resumes_after_cursor(self):
+        queryset = TeamApplication.objects.all()
+        first, cursor = paginate_keyset(queryset, None, 5)
+        second, _ = paginate_keyset(queryset, decode_cursor(cursor), 5)
+        expected = self.newest_first(self.teams)
+        self.assertEqual([team.id for team in first + second], expected[:10])
+        self.assertEqual(decode_cursor(encode_cursor(first[-1])), (first[-1].created_at, first[-1].id))
+
+    def test_malformed_cursor_is_rejected(self):
+        url = reverse("list-team-applications")
+        tampered = [
+            "not-a-cursor",
+            base64.urlsafe_b64encode(b"[1, 2]").decode(),
+            base64.urlsafe_b64encode(json.dumps({"created_at": "yesterday", "id": 1}).encode()).decode(),
+            base64.urlsafe_b64encode(json.dumps({"created_at": "2026-01-01T00:00:00+00:00"}).encode()).decode(),
+            base64.urlsafe_b64encode(json.dumps({"created_at": "2026-01-01T00:00:00+00:00", "id": "x"}).encode()).decode(),
+        ]
+        for cursor in tampered:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(url, {"cursor": cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"error": "Invalid cursor"})
+
+    def test_invalid_limit_is_rejected(self):
+        url = reverse("list-team-applications")
+        for limit in ("0", "-3", "ten"):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.client.get(url, {"limit": limit}).status_code, 400)
+
+    def test_status_filter(self):
+        expected = [t for t in self.teams if t.status in ("open", "filled")]
+        self.assertEqual(self.walk({"status": "open,filled"}), self.newest_first(expected))
+        self.assertEqual(self.client.get(reverse("list-team-applications"), {"status": "gone"}).status_code, 400)
+
+    def test_hackathon_date_filters(self):
+        start, end = date(2026, 6, 5), date(2026, 6, 12)
+        expected = [t for t in self.teams if start <= t.hackathon_date <= end]
+        params = {"hackathon_from": start.isoformat(), "hackathon_to": end.isoformat()}
+        self.assertEqual(self.walk(params), self.newest_first(expected))
+        self.assertEqual(
+            self.client.get(reverse("list-team-applications"), {"hackathon_from": "June"}).status_code, 400
+        )
+
+    def test_skills_filter_requires_every_skill(self):
+        expected = [t for t in self.teams if {1, 2} <= set(t.skills)]
+        self.assertEqual(self.walk({"skills": "1,2"}), self.newest_first(expected))
+        self.assertEqual(self.client.get(reverse("list-team-applications"), {"skills": "a,b"}).status_code, 400)
+
+    def test_has_capacity_filter(self):
+        expected = [t for t in self.teams if t.capacity_left > 0]
+        self.assertEqual(self.walk({"has_capacity": "true"}), self.newest_first(expected))
+
+    def test_filters_combine_across_pages(self):
+        expected = [t for t in self.teams if t.status == "open" and t.capacity_left > 0 and 1 in t.skills]
+        params = {"status": "open", "has_capacity": "true", "skills": "1"}
+        self.assertEqual(self.walk(params, limit=2), self.newest_first(expected))
+
+
+class ListingCacheTests(TestCase):
+    """
+    The listing caches one user-independent page per query and overlays
+    the caller's role; runs against the locmem test cache.
+    """
+    leader, member, requester, stranger = 1, 2, 3, 4
+
+    @classmethod
+    def setUpTestData(cls):
+        for user_id in (cls.leader, cls.member, cls.requester, cls.stranger):
+            CustomUser.objects.create(id=user_id, email=f"u{user_id}@example.com", full_name=f"User {user_id}")
+        cls.team = create_team(leader_user_id=cls.leader, member_user_ids=[cls.leader, cls.member])
+        TeamMembership.objects.create(team=cls.team, user_id=cls.leader, role="leader")
+        TeamMembership.objects.create(team=cls.team, user_id=cls.member, role="member")
+        cls.join_request = TeamJoinRequest.objects.create(
+            team_application=cls.team, user_id=cls.requester, message="Hi"
+        )
+        cls.other_team = create_team(leader_user_id=cls.stranger, member_user_ids=[cls.stranger])
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("list-team-applications")
+
+    def counters(self):
+        snapshot = metrics.snapshot()
+        return snapshot["team_listing_cache.hit"], snapshot["team_listing_cache.miss"]
+
+    def roles(self, response):
+        return {row["id"]: row["user_role"] for row in response.json()["results"]}
+
+    def test_miss_then_hit(self):
+        first = self.client.get(self.url)
+        self.assertEqual(self.counters(), (0, 1))
+
+        # An anonymous hit needs no query at all
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(self.counters(), (1, 1))
+        self.assertEqual(first.json(), second.json())
+
+        # Another query is another page
+        self.client.get(self.url, {"status": "open"})
+        self.assertEqual(self.counters(), (1, 2))
+
+    def test_team_creation_bumps_generation(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        skill_sync = mock.Mock(**{"json.return_value": {"skills": [{"id": 7, "skill": "python"}]}})
+        with mock.patch("teams.views.requests.post", return_value=skill_sync):
+            response = self.client.post(reverse("create-team"), {
+                "title": "New", "description": "New team", "team_name": "New team",
+                "capacity": 3, "hackathon_date": date.today().isoformat(), "skills": ["python"],
+            }, content_type="application/json", **bearer(self.stranger))
+        self.assertEqual(response.status_code, 201, response.content)
+
+        listing = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(listing.status_code, 200)
+        self.assertNotEqual(listing["ETag"], etag)
+        self.assertIn(response.json()["team_id"], self.roles(listing))
+
+    def test_join_decision_bumps_generation(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.patch(
+            reverse("update-join-request-status", args=[self.join_request.id]), {"status": "accepted"},
+            content_type="application/json", **bearer(self.leader),
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+
+        listing = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(listing.status_code, 200)
+        row = next(row for row in listing.json()["results"] if row["id"] == self.team.id)
+        self.assertEqual(row["capacity_left"], self.team.capacity_left - 1)
+
+    def test_roles_overlaid_per_user_on_one_cached_page(self):
+        self.assertEqual(self.roles(self.client.get(self.url)), {self.team.id: "default", self.other_team.id: "default"})
+        expected = {
+            self.leader: "owner", self.member: "member", self.requester: "pending", self.stranger: "default",
+        }
+        for user_id, role in expected.items():
+            with self.subTest(user_id=user_id):
+                self.assertEqual(self.roles(self.client.get(self.url, **bearer(user_id)))[self.team.id], role)
+        self.assertEqual(self.roles(self.client.get(self.url, **bearer(self.stranger)))[self.other_team.id], "owner")
+
+        # Every request after the first was served from the one cached page,
+        # which still carries no roles
+        self.assertEqual(self.counters(), (5, 1))
+        self.assertEqual(self.roles(self.client.get(self.url))[self.team.id], "default")
+
+    def test_matching_if_none_match_is_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        self.assertIn("Authorization", response["Vary"])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+        listing_cache.invalidate()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_is_per_user(self):
+        anonymous = self.client.get(self.url)["ETag"]
+        stranger = self.client.get(self.url, **bearer(self.stranger))["ETag"]
+        self.assertNotEqual(anonymous, stranger)
+
+        # A join request changes the requester's roles only
+        response = self.client.post(
+            reverse("create-team-join-request"), {"team_application": self.team.id, "message": "Me too"},
+            content_type="application/json", **bearer(self.stranger),
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=anonymous).status_code, 304)
+        after = self.client.get(self.url, HTTP_IF_NONE_MATCH=stranger, **bearer(self.stranger))
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(self.roles(after)[self.team.id], "pending")
+
+    @override_settings(TEAM_LISTING_CACHE_ENABLED=False)
+    def test_disabled_cache_serves_without_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+        self.assertEqual(self.counters(), (0, 0))
+
+
+class ConditionalGetTests(TestCase):
+    """Detail and user-teams ETags change with everything their body renders."""
+
+    def setUp(self):
+        CustomUser.objects.bulk_create([
+            CustomUser(id=user_id, email=f"user{user_id}@example.com", full_name=f"User {user_id}", skills=[])
+            for user_id in (1, 2, 3)
+        ])
+        Skill.objects.create(id=1, skill="Django")
+        self.team = create_team(leader_user_id=1, member_user_ids=[1, 2], skills=[1])
+        TeamMembership.objects.bulk_create([
+            TeamMembership(team=self.team, user_id=1, role="leader"), TeamMembership(team=self.team, user_id=2),
+        ])
+        # No S3 here; the URLs' content does not matter to the ETag
+        for name, presigned in (("generate_presigned_s3_url", None), ("generate_presigned_s3_urls", {})):
+            patcher = mock.patch(f"teams.serializers.{name}", return_value=presigned)
+            self.addCleanup(patcher.stop)
+            setattr(self, name, patcher.start())
+
+    def revalidate(self, url, etag, **headers):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag, **headers)
+
+    def assert_changes_etag(self, url, change, **headers):
+        etag = self.client.get(url, **headers)["ETag"]
+        self.assertEqual(self.revalidate(url, etag, **headers).status_code, 304)
+        change()
+        response = self.revalidate(url, etag, **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_detail_answers_304_with_validators(self):
+        url = reverse("team-detail", args=[self.team.id])
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("no-cache", first["Cache-Control"])
+        self.assertTrue(first.has_header("Last-Modified"))
+
+        self.generate_presigned_s3_urls.reset_mock()
+        response = self.revalidate(url, first["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], first["ETag"])
+        self.assertEqual(response.content, b"")
+        self.generate_presigned_s3_urls.assert_not_called()
+
+    def test_detail_etag_follows_team_members_replicas_and_presign_window(self):
+        url = reverse("team-detail", args=[self.team.id])
+        changes = [
+            lambda: TeamApplication.objects.filter(id=self.team.id).update(
+                title="Renamed", updated_at=django_timezone.now() + timedelta(seconds=1)
+            ),
+            lambda: TeamApplication.objects.filter(id=self.team.id).update(member_user_ids=[1, 2, 3]),
+            lambda: CustomUser.objects.filter(id=2).update(full_name="Member Renamed"),
+            lambda: CustomUser.objects.filter(id=2).update(profile_image="avatars/2.png"),
+            lambda: Skill.objects.filter(id=1).update(skill="Django REST"),
+        ]
+        for index, change in enumerate(changes):
+            with self.subTest(change=index):
+                self.assert_changes_etag(url, change)
+
+        etag = self.client.get(url)["ETag"]
+        with mock.patch("teams.utils.conditional.time.time", return_value=time.time() + PRESIGN_WINDOW_SECONDS):
+            self.assertEqual(self.revalidate(url, etag).status_code, 200)
+
+    def test_user_teams_answers_304_per_user(self):
+        url = reverse("user-teams")
+        etag = self.client.get(url, **bearer(2))["ETag"]
+        self.assertEqual(self.revalidate(url, etag, **bearer(2)).status_code, 304)
+        self.assertEqual(self.revalidate(url, etag, **bearer(1)).status_code, 200)
+
+    def test_user_teams_etag_follows_teams_and_replicas(self):
+        url = reverse("user-teams")
+        other = create_team(leader_user_id=3, member_user_ids=[3])
+        changes = [
+            lambda: TeamMembership.objects.create(team=other, user_id=2),
+            lambda: TeamApplication.objects.filter(id=self.team.id).update(
+                title="Renamed", updated_at=django_timezone.now() + timedelta(seconds=1)
+            ),
+            lambda: CustomUser.objects.filter(id=1).update(full_name="Leader Renamed"),
+            lambda: Skill.objects.filter(id=1).update(skill="Django REST"),
+        ]
+        for index, change in enumerate(changes):
+            with self.subTest(change=index):
+                self.assert_changes_etag(url, change, **bearer(2))
+
+
+class TeamSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Skill.objects.bulk_create([Skill(id=1, skill="Python"), Skill(id=2, skill="React"), Skill(id=3, skill="Go")])
+        cls.python = create_team(team_name="Snake Charmers", title="Python bots", skills=[1])
+        cls.full_stack = create_team(team_name="Full Stack", title="Web app", skills=[1, 2])
+        cls.everything = create_team(team_name="Polyglots", title="Everything", skills=[1, 2, 3])
+        cls.closed = create_team(team_name="Closed", title="Python", skills=[1, 2, 3], status="closed")
+        cls.go = create_team(team_name="Gophers", title="Chatbot in Go", description="A chatbot", skills=[3])
+
+    def search(self, **params):
+        response = self.client.get(reverse("team-skill-search"), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_resolve_skill_ids_accepts_ids_and_names(self):
+        self.assertEqual(resolve_skill_ids("3, python ,REACT,unknown,,"), [1, 2, 3])
+        self.assertEqual(resolve_skill_ids(None), [])
+
+    def test_open_teams_are_ranked_by_overlap(self):
+        body = self.search(skills="python,react")
+        self.assertEqual(
+            [(row["id"], row["match_count"]) for row in body["results"]],
+            [(self.everything.id, 2), (self.full_stack.id, 2), (self.python.id, 1)],
+        )
+        self.assertEqual((body["skills"], body["candidate_limit"]), ([1, 2], settings.TEAM_SKILL_SEARCH_CANDIDATES))
+
+    def test_match_all_requires_every_skill(self):
+        body = self.search(skills="1,2,3", match="all")
+        self.assertEqual([row["id"] for row in body["results"]], [self.everything.id])
+        body = self.search(skills="1,2,3", match="all", status="closed")
+        self.assertEqual([row["id"] for row in body["results"]], [self.closed.id])
+
+    def test_unknown_skills_return_nothing(self):
+        self.assertEqual(self.search(skills="cobol")["results"], [])
+
+    def test_only_the_newest_candidates_are_ranked(self):
+        ranked = rank_by_skill_overlap(TeamApplication.objects.filter(skills__overlap=[1], status="open"), [1, 2], 2)
+        # The oldest team is not a candidate, whatever its overlap
+        self.assertEqual([team.id for team in ranked], [self.everything.id, self.full_stack.id])
+        with override_settings(TEAM_SKILL_SEARCH_CANDIDATES=1):
+            body = self.search(skills="python")
+        self.assertEqual([row["id"] for row in body["results"]], [self.everything.id])
+        self.assertEqual(body["candidate_limit"], 1)
+
+    def test_overlap_follows_the_model_table(self):
+        ranked = rank_by_skill_overlap(TeamApplication.objects.filter(skills__overlap=[3]), [3], 10)
+        self.assertIn(f'"{TeamApplication._meta.db_table}"."skills"', str(ranked.query))
+
+    def test_full_text_search_ranks_matching_teams(self):
+        response = self.client.get(reverse("team-text-search"), {"q": "chatbot"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["mode"], "fulltext")
+        self.assertEqual([row["id"] for row in response.json()["results"]], [self.go.id])
+        self.assertEqual(self.client.get(reverse("team-text-search")).status_code, 400)
+
+
+class TeamSkillIndexTests(TestCase):
+    """
+    The incrementally maintained index must always equal one built from
+    scratch: same rows, same document frequencies, same ranking.
+    """
+    skill_ids = range(1, 13)
+
+    def setUp(self):
+        self.random = random.Random(6)
+        self.day = 0
+        for _ in range(60):
+            self.create_random_team()
+
+    def create_random_team(self, **fields):
+        # A distinct date per team keeps scores free of ties
+        self.day += 1
+        return create_team(
+            skills=self.random.sample(self.skill_ids, self.random.randint(1, 4)),
+            capacity_left=self.random.randint(1, 3),
+            hackathon_date=date.today() + timedelta(days=self.day),
+            **fields,
+        )
+
+    def assert_matches_rebuild(self, index):
+        rebuilt = TeamSkillIndex()
+        rebuilt.refresh(force=True)
+        open_ids = set(TeamApplication.objects.filter(status="open").values_list("id", flat=True))
+
+        self.assertEqual(set(index._row_of), open_ids)
+        self.assertEqual(index._size, len(open_ids))
+        for team_id, row in index._row_of.items():
+            self.assertEqual(int(index._ids[row]), team_id)
+        self.assertFalse(index._bits[index._size:].any(), "rows past the end must be cleared")
+
+        df = {skill_id: int(index._df[column]) for skill_id, column in index._column_of.items()}
+        rebuilt_df = {skill_id: int(rebuilt._df[column]) for skill_id, column in rebuilt._column_of.items()}
+        for skill_id in self.skill_ids:
+            self.assertEqual(df.get(skill_id, 0), rebuilt_df.get(skill_id, 0), f"df of skill {skill_id}")
+
+        for skills in ([1], [2, 5], [3, 7, 11], [99]):
+            top = [(team_id, round(score, 9)) for team_id, score in index.top(skills, 100)]
+            expected = [(team_id, round(score, 9)) for team_id, score in rebuilt.top(skills, 100)]
+            self.assertEqual(top, expected, f"top for skills {skills}")
+
+    def test_random_changes_and_deletions_match_rebuild(self):
+        index = TeamSkillIndex()
+        index.refresh(force=True)
+        self.assert_matches_rebuild(index)
+
+        for _ in range(8):
+            team_ids = list(TeamApplication.objects.values_list("id", flat=True))
+            for team_id in self.random.sample(team_ids, 8):
+                TeamApplication.objects.filter(id=team_id).update(
+                    status=self.random.choice(["open", "closed", "filled", "expired"]),
+                    skills=self.random.sample(self.skill_ids, self.random.randint(1, 4)),
+                    updated_at=django_timezone.now(),
+                )
+            for _ in range(3):
+                self.create_random_team()
+            TeamApplication.objects.filter(id__in=self.random.sample(team_ids, 2)).delete()
+
+            with override_settings(RECOMMENDER_RECONCILE_SECONDS=0):
+                index.refresh(force=True)
+            self.assert_matches_rebuild(index)
+
+    def test_deleted_teams_stay_until_reconciled(self):
+        index = TeamSkillIndex()
+        index.refresh(force=True)
+        victim_id = TeamApplication.objects.filter(status="open").values_list("id", flat=True).first()
+        TeamApplication.objects.filter(id=victim_id).delete()
+
+        index.refresh(force=True)
+        self.assertIn(victim_id, index._row_of)
+
+        with override_settings(RECOMMENDER_RECONCILE_SECONDS=0):
+            index.refresh(force=True)
+        self.assertNotIn(victim_id, index._row_of)
+        self.assert_matches_rebuild(index)
+
+
+class TeamRecommendationsViewTests(TestCase):
+    caller = 50
+
+    @classmethod
+    def setUpTestData(cls):
+        Skill.objects.bulk_create([Skill(id=1, skill="python"), Skill(id=2, skill="react")])
+        CustomUser.objects.create(id=cls.caller, email="me@example.com", full_name="Me", skills=[1])
+        soon = date.today() + timedelta(days=3)
+        cls.python_team = create_team(leader_user_id=10, skills=[1], hackathon_date=soon)
+        cls.react_team = create_team(leader_user_id=11, skills=[2], hackathon_date=soon)
+        cls.member_team = create_team(leader_user_id=12, skills=[1], hackathon_date=soon)
+        cls.applied_team = create_team(leader_user_id=13, skills=[1], hackathon_date=soon)
+        cls.led_team = create_team(leader_user_id=cls.caller, skills=[1], hackathon_date=soon)
+        TeamMembership.objects.create(team=cls.member_team, user_id=cls.caller, role="member")
+        TeamMembership.objects.create(team=cls.led_team, user_id=cls.caller, role="leader")
+        TeamJoinRequest.objects.create(team_application=cls.applied_team, user_id=cls.caller, message="Hi")
+
+    def setUp(self):
+        patcher = mock.patch("teams.views.team_skill_index", TeamSkillIndex())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def recommend(self, **params):
+        response = self.client.get(reverse("team-recommendations"), params, **bearer(self.caller))
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row["id"] for row in response.json()["results"]]
+
+    def test_stored_skills_rank_first(self):
+        self.assertEqual(self.recommend(), [self.python_team.id, self.react_team.id])
+
+    def test_skills_parameter_overrides_stored_skills(self):
+        self.assertEqual(self.recommend(skills="react"), [self.react_team.id, self.python_team.id])
+        self.assertEqual(self.recommend(skills="2"), [self.react_team.id, self.python_team.id])
+
+    def test_teams_of_the_caller_are_excluded(self):
+        ids = self.recommend(skills="python,react")
+        for team in (self.member_team, self.applied_team, self.led_team):
+            self.assertNotIn(team.id, ids)
+
+
+def user_event(user_id, **fields):
+    return {"id": user_id, "email": f"user{user_id}@example.com", "full_name": f"User {user_id}", **fields}
+
+
+class UpsertUsersTests(TestCase):
+    def upsert(self, *events):
+        return upsert_users([user_from_event(event) for event in events])
+
+    def test_last_event_per_user_wins(self):
+        self.assertEqual(self.upsert(
+            user_event(1, full_name="First", skills=[1]),
+            user_event(2),
+            user_event(1, full_name="Second", skills=[2]),
+        ), 2)
+        user = CustomUser.objects.get(id=1)
+        self.assertEqual((user.full_name, user.skills), ("Second", [2]))
+
+    def test_event_without_skills_keeps_stored_skills(self):
+        self.upsert(user_event(1, skills=[1, 2]))
+        self.upsert(user_event(1, full_name="Renamed"))
+        user = CustomUser.objects.get(id=1)
+        self.assertEqual((user.full_name, user.skills), ("Renamed", [1, 2]))
+
+    def test_event_without_skills_takes_them_from_an_earlier_event_of_its_batch(self):
+        self.upsert(user_event(1, skills=[1]))
+        self.upsert(user_event(1, skills=[3]), user_event(1, full_name="Renamed"))
+        self.assertEqual(CustomUser.objects.get(id=1).skills, [3])
+
+    def test_new_user_without_skills_gets_none(self):
+        self.upsert(user_event(1), user_event(2, skills=[4]))
+        self.assertEqual(dict(CustomUser.objects.values_list("id", "skills")), {1: [], 2: [4]})
+
+    def test_leader_rename_writes_team_updated_event(self):
+        self.upsert(user_event(1, full_name="Leader"), user_event(2, full_name="Member"))
+        team = create_team(leader_user_id=1)
+        create_team(leader_user_id=2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upsert(user_event(1, full_name="New Leader"), user_event(2, full_name="Member"))
+        events = list(OutboxEvent.objects.values_list("payload", flat=True))
+        self.assertEqual(events, [{
+            "event": "team.updated",
+            "teams": [{
+                "team_application_id": team.id, "team_name": team.team_name,
+                "leader_name": "New Leader", "leader_profile_image": None,
+            }],
+        }])
+
+    def test_unchanged_leader_writes_no_event(self):
+        self.upsert(user_event(1, full_name="Leader"))
+        create_team(leader_user_id=1)
+        self.upsert(user_event(1, full_name="Leader", skills=[5]))
+        self.assertFalse(OutboxEvent.objects.exists())
+
+
+class FakeChannel:
+    is_open = True
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.in_use = threading.Lock()
+
+    def exchange_declare(self, **kwargs):
+        self.connection.declared += 1
+
+    def queue_declare(self, **kwargs):
+        pass
+
+    def queue_bind(self, **kwargs):
+        pass
+
+    def confirm_delivery(self):
+        pass
+
+    def basic_publish(self, body, **kwargs):
+        # Two threads on one channel would be a pool bug
+        if not self.in_use.acquire(blocking=False):
+            raise AssertionError("channel shared between threads")
+        try:
+            time.sleep(0.001)
+            if self.connection.lose_after is not None and len(self.connection.sent) >= self.connection.lose_after:
+                self.connection.is_open = False
+                raise StreamLostError("connection lost")
+            if self.connection.nack:
+                raise NackError([])
+            self.connection.sent.append(json.loads(body))
+        finally:
+            self.in_use.release()
+
+
+class FakeConnection:
+    """pika.BlockingConnection stand-in: records what each connection sent."""
+    opened = []
+
+    def __init__(self, parameters):
+        self.is_open = True
+        self.sent, self.declared = [], 0
+        self.lose_after, self.nack = None, False
+        self._channel = FakeChannel(self)
+        FakeConnection.opened.append(self)
+
+    def channel(self):
+        return self._channel
+
+    def process_data_events(self, time_limit=None):
+        if not self.is_open:
+            raise StreamLostError("connection lost")
+
+    def close(self):
+        self.is_open = False
+
+
+class PublisherTests(SimpleTestCase):
+    def setUp(self):
+        FakeConnection.opened = []
+        patcher = mock.patch("team_service.producers.publisher.pika.BlockingConnection", FakeConnection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.publisher = Publisher("amqp://broker", "notifications", "notify", queue_name="notifications", pool_size=2)
+
+    def sent(self):
+        return [message for connection in FakeConnection.opened for message in connection.sent]
+
+    def test_connection_is_opened_once_and_reused(self):
+        self.publisher.publish_many([{"n": n} for n in range(3)])
+        self.publisher.publish({"n": 3})
+        self.assertEqual(len(FakeConnection.opened), 1)
+        self.assertEqual(FakeConnection.opened[0].declared, 1)
+        self.assertEqual(self.sent(), [{"n": n} for n in range(4)])
+
+    def test_lost_connection_retries_only_the_unconfirmed_rest(self):
+        self.publisher.publish({"n": 0})
+        first = FakeConnection.opened[0]
+        first.lose_after = 2
+        with self.assertLogs("team_service.producers.publisher", level="WARNING"):
+            self.publisher.publish_many([{"n": n} for n in range(1, 5)])
+
+        self.assertEqual(len(FakeConnection.opened), 2)
+        self.assertFalse(first.is_open)
+        self.assertEqual(self.sent(), [{"n": n} for n in range(5)])
+        # The replacement, not the broken connection, went back to the pool
+        self.publisher.publish({"n": 5})
+        self.assertEqual(FakeConnection.opened[1].sent[-1], {"n": 5})
+
+    def test_dead_idle_connection_is_replaced_before_publishing(self):
+        self.publisher.publish({"n": 0})
+        FakeConnection.opened[0].is_open = False
+        self.publisher.publish({"n": 1})
+        self.assertEqual([connection.sent for connection in FakeConnection.opened], [[{"n": 0}], [{"n": 1}]])
+
+    def test_gives_up_after_the_last_attempt(self):
+        with mock.patch.object(FakeConnection, "channel", side_effect=StreamLostError("refused")):
+            with self.assertLogs("team_service.producers.publisher", level="WARNING"), \
+                    self.assertRaises(StreamLostError):
+                self.publisher.publish({"n": 0})
+        self.assertEqual(len(FakeConnection.opened), self.publisher.attempts)
+        self.assertFalse(any(connection.is_open for connection in FakeConnection.opened))
+
+    def test_nack_is_not_retried(self):
+        self.publisher.publish({"n": 0})
+        FakeConnection.opened[0].nack = True
+        with self.assertRaises(PublishError):
+            self.publisher.publish({"n": 1})
+        self.assertEqual(len(FakeConnection.opened), 1)
+        self.assertFalse(FakeConnection.opened[0].is_open)
+
+    def test_threads_share_at_most_pool_size_connections(self):
+        errors = []
+
+        def publish(thread):
+            try:
+                for n in range(20):
+                    self.publisher.publish({"thread": thread, "n": n})
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=publish, args=(thread,)) for thread in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(FakeConnection.opened), self.publisher.pool_size)
+        self.assertEqual(len(self.sent()), 8 * 20)
+
+    def test_forked_process_opens_its_own_connections(self):
+        self.publisher.publish({"n": 0})
+        with mock.patch("team_service.producers.publisher.os.getpid", return_value=os.getpid() + 1):
+            self.publisher.publish({"n": 1})
+        self.assertEqual(len(FakeConnection.opened), 2)
+
+
+class VerifyUserTests(SimpleTestCase):
+    def setUp(self):
+        self.module_tokens = verify_user_module.verified_tokens
+        patcher = mock.patch.object(verify_user_module, "verified_tokens", VerifiedTokenCache(max_size=10))
+        self.tokens = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def token(self, **claims):
+        return bearer(9, **claims)["HTTP_AUTHORIZATION"].split()[1]
+
+    def test_module_cache_is_sized_from_settings(self):
+        self.assertEqual(self.module_tokens.max_size, settings.JWT_VERIFY_CACHE_SIZE)
+
+    def test_second_verification_skips_decoding(self):
+        token = self.token()
+        with mock.patch("hackmate_common.auth.jwt.decode", wraps=jwt.decode) as decode:
+            self.assertEqual(verify_user(token), 9)
+            self.assertEqual(verify_user(token), 9)
+        self.assertEqual(decode.call_count, 1)
+        counts = self.tokens.drain(force=True)
+        self.assertEqual((counts["auth.cache_miss"], counts["auth.cache_hit"], counts["auth.decode.count"]), (1, 1, 1))
+
+    def test_expired_and_invalid_tokens_fail(self):
+        with self.assertRaisesMessage(AuthenticationFailed, "Token has expired"):
+            verify_user(self.token(exp=int(time.time()) - 1))
+        with self.assertRaisesMessage(AuthenticationFailed, "Invalid token"):
+            verify_user("not.a.jwt")
+        self.assertEqual(self.tokens.drain(force=True)["auth.failed"], 2)
+
+
+class PublicViewsIgnoreTokensTests(TestCase):
+    """Views without authentication answer even when a bad token is sent."""
+
+    def test_bad_bearer_token_is_ignored(self):
+        team = create_team()
+        headers = {"HTTP_AUTHORIZATION": "Bearer expired.or.forged"}
+        urls = [
+            reverse("get-users"), reverse("get-skills"), f"/api/teams/{team.id}/meta/",
+            reverse("team-meta-batch") + f"?ids={team.id}", reverse("health-check"), reverse("metrics"),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertNotEqual(self.client.get(url, **headers).status_code, 401)
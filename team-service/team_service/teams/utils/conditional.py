@@ -0,0 +1,63 @@
+import hashlib
+import time
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .generate_s3_url import URL_EXPIRES_IN, presigned_url_cache
+
+# A presigned URL handed out may already be up to the URL cache's TTL old.
+# Rolling the ETag of responses that embed URLs this often, with 5 minutes
+# to spare, means a 304 never lets a client keep a URL past its expiry.
+PRESIGN_WINDOW_SECONDS = max(60, URL_EXPIRES_IN - presigned_url_cache.ttl - 300)
+
+
+def make_etag(*parts) -> str:
+    """
+    Builds a strong ETag from the given version parts (ids, timestamps,
+    cache generations, ...).
+    """
+    raw = ":".join(str(part) for part in parts)
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+
+def presign_window() -> int:
+    """Version part for responses containing presigned URLs."""
+    return int(time.time() // PRESIGN_WINDOW_SECONDS)
+
+
+def replica_parts(user_map=None, skill_map=None) -> list:
+    """
+    Version parts for the user and skill replica rows a response renders
+    (names, emails, avatars). The replicas carry no timestamps and change
+    through user_sync/skill_sync, so their content is the version.
+    """
+    parts = [
+        (user.id, user.full_name, user.email, user.avatar_key())
+        for user in sorted((user_map or {}).values(), key=lambda user: user.id)
+    ]
+    parts += sorted((skill_map or {}).items())
+    return parts
+
+
+def not_modified(request, etag, last_modified=None):
+    """
+    Returns a 304 response if the request's If-None-Match / If-Modified-Since
+    validators still match, otherwise None.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag, last_modified=None, vary_on_auth=False):
+    """
+    Attaches ETag / Last-Modified to a response and asks clients to
+    revalidate on every use, so unchanged resources come back as 304.
+    """
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    if vary_on_auth:
+        patch_vary_headers(response, ["Authorization"])
+    return response
@@ -0,0 +1,62 @@
+from datetime import date
+
+from django.db.models import Q
+
+VALID_STATUSES = {"open", "closed", "filled", "expired"}
+
+
+def parse_id_list(value: str | None) -> list[int]:
+    """
+    Parses a comma-separated list of integer IDs, e.g. "3,7,12".
+    """
+    if not value:
+        return []
+    try:
+        return [int(i) for i in value.split(",") if i.strip()]
+    except ValueError:
+        raise ValueError("IDs must be comma-separated integers")
+
+
+def _parse_date(value: str, name: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a date in YYYY-MM-DD format")
+
+
+def build_team_filters(params) -> Q:
+    """
+    Builds the server-side filter for team application listings from query
+    params:
+
+        status=open,filled          status is one of the given values
+        hackathon_from=2025-08-01   hackathon_date on or after the date
+        hackathon_to=2025-08-31     hackathon_date on or before the date
+        skills=3,7                  team requires all of the given skill IDs
+        has_capacity=true           capacity_left > 0
+
+    Raises:
+        ValueError: if any parameter is malformed.
+    """
+    filters = Q()
+
+    statuses = [s.strip() for s in params.get("status", "").split(",") if s.strip()]
+    if statuses:
+        unknown = set(statuses) - VALID_STATUSES
+        if unknown:
+            raise ValueError(f"Unknown status: {', '.join(sorted(unknown))}")
+        filters &= Q(status__in=statuses)
+
+    if params.get("hackathon_from"):
+        filters &= Q(hackathon_date__gte=_parse_date(params["hackathon_from"], "hackathon_from"))
+    if params.get("hackathon_to"):
+        filters &= Q(hackathon_date__lte=_parse_date(params["hackathon_to"], "hackathon_to"))
+
+    skill_ids = parse_id_list(params.get("skills"))
+    if skill_ids:
+        filters &= Q(skills__contains=skill_ids)
+
+    if params.get("has_capacity", "").lower() in ("1", "true", "yes"):
+        filters &= Q(capacity_left__gt=0)
+
+    return filters
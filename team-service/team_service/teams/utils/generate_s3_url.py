@@ -1,4 +1,9 @@
+import threading
+import time
+from collections import OrderedDict
+
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from django.conf import settings
 import logging
@@ -6,12 +11,84 @@ import logging
 # It's good practice to set up a logger for utility functions
 logger = logging.getLogger(__name__)
 
+URL_EXPIRES_IN = 3600  # URL expires in 1 hour (in seconds)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_s3_client():
+    """
+    Returns the process-wide S3 client, creating it on first use. boto3
+    clients are thread-safe, so one is shared by all request threads.
+    Set AWS_S3_ENDPOINT_URL to point it at a local stand-in (minio, moto).
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = boto3.client(
+                    's3',
+                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                    region_name=settings.AWS_S3_REGION_NAME,
+                    endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+                    config=Config(signature_version='s3v4')
+                )
+    return _client
+
+
+class PresignedURLCache:
+    """
+    Thread-safe LRU cache of presigned URLs keyed by object key. Entries are
+    dropped after `ttl` seconds, which must be shorter than the URLs'
+    ExpiresIn so a cached URL always has life left when handed out.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (url, cached_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            url, cached_at = entry
+            if time.monotonic() - cached_at >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return url
+
+    def set(self, key, url):
+        with self._lock:
+            self._entries[key] = (url, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+presigned_url_cache = PresignedURLCache(
+    max_size=settings.PRESIGNED_URL_CACHE_SIZE,
+    # Leave at least 5 minutes of validity on every URL we hand out
+    ttl=min(settings.PRESIGNED_URL_CACHE_TTL, URL_EXPIRES_IN - 300),
+)
+
+
 def generate_presigned_s3_url(object_key: str) -> str | None:
     """
     Generates a pre-signed URL for a given S3 object key.
 
     This function is designed to work with a CharField that stores the
     path to the file in S3 (e.g., 'profile_images/scdc9r8ud5pb1.jpg').
+    URLs are served from `presigned_url_cache` while they are fresh.
 
     Args:
         object_key: The key (path) of the object in the S3 bucket.
@@ -22,29 +99,33 @@ def generate_presigned_s3_url(object_key: str) -> str | None:
     if not object_key:
         return None
 
-    # Initialize the S3 client using credentials from Django settings
-    s3_client = boto3.client(
-        's3',
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_S3_REGION_NAME,
-        # You might need to add this for pre-signed URLs
-        config=boto3.session.Config(signature_version='s3v4')
-    )
+    cached = presigned_url_cache.get(object_key)
+    if cached is not None:
+        return cached
 
     try:
-        # Generate the pre-signed URL.
-        # The 'Key' is the object_key passed to the function.
-        presigned_url = s3_client.generate_presigned_url(
+        presigned_url = get_s3_client().generate_presigned_url(
             'get_object',
             Params={
                 'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
                 'Key': object_key
             },
-            ExpiresIn=3600  # URL expires in 1 hour (in seconds)
+            ExpiresIn=URL_EXPIRES_IN
         )
-        return presigned_url
     except ClientError as e:
         # Log the error for debugging purposes
         logger.error(f"Error generating pre-signed URL for key '{object_key}': {e}")
-        return None
\ No newline at end of file
+        return None
+
+    presigned_url_cache.set(object_key, presigned_url)
+    return presigned_url
+
+
+def generate_presigned_s3_urls(object_keys) -> dict:
+    """
+    Bulk variant for serializers: presigns each distinct key once.
+
+    Returns:
+        A dict mapping object key -> URL (or None).
+    """
+    return {key: generate_presigned_s3_url(key) for key in set(object_keys) if key}
@@ -0,0 +1,122 @@
+import time
+from collections import namedtuple
+
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
+
+from ..models import TeamJoinRequest
+from . import metrics
+
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 0.05  # seconds, doubled per retry
+
+# SQLSTATEs worth retrying: serialization_failure, deadlock_detected
+RETRYABLE_SQLSTATES = {"40001", "40P01"}
+
+metrics.register(
+    "join_accept.accepted",
+    "join_accept.full",
+    "join_accept.already_member",
+    "join_accept.already_decided",
+    "join_accept.retries",
+)
+
+AcceptedTeam = namedtuple("AcceptedTeam", ["capacity_left", "status", "member_user_ids"])
+
+
+class JoinRequestConflict(Exception):
+    """The request was already decided, the team has no capacity left or the user is already a member."""
+
+
+# Claims a seat only while one is left and the user isn't a member yet.
+# Postgres re-checks the WHERE clause after waiting on the row lock, so
+# concurrent accepts serialize on the team row and never oversubscribe it.
+CLAIM_SEAT_SQL = """
+UPDATE teams_teamapplication
+SET capacity_left = capacity_left - 1,
+    member_user_ids = array_append(member_user_ids, %(user_id)s),
+    status = CASE WHEN capacity_left - 1 = 0 THEN 'filled' ELSE status END,
+    updated_at = now()
+WHERE id = %(team_id)s
+  AND capacity_left > 0
+  AND NOT (%(user_id)s = ANY(member_user_ids))
+RETURNING capacity_left, status, member_user_ids
+"""
+
+# Tells apart why CLAIM_SEAT_SQL matched no row
+IS_MEMBER_SQL = """
+SELECT %(user_id)s = ANY(member_user_ids) FROM teams_teamapplication WHERE id = %(team_id)s
+"""
+
+INSERT_MEMBERSHIP_SQL = """
+INSERT INTO teams_teammembership (team_id, user_id, role, joined_at)
+VALUES (%(team_id)s, %(user_id)s, 'member', now())
+ON CONFLICT (team_id, user_id) DO NOTHING
+"""
+
+
+def _decide(join_request_id, new_status):
+    updated = TeamJoinRequest.objects.filter(
+        id=join_request_id, status="pending"
+    ).update(status=new_status, updated_at=timezone.now())
+    if not updated:
+        status = TeamJoinRequest.objects.filter(id=join_request_id).values_list("status", flat=True).first()
+        metrics.incr("join_accept.already_decided")
+        raise JoinRequestConflict(f"Request already {status}")
+
+
+def _with_retries(fn):
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            return fn()
+        except OperationalError as e:
+            sqlstate = getattr(getattr(e, "__cause__", None), "pgcode", None)
+            if sqlstate not in RETRYABLE_SQLSTATES or attempt == MAX_ATTEMPTS:
+                raise
+            metrics.incr("join_accept.retries")
+            time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+
+
+def accept_join_request(join_request) -> AcceptedTeam:
+    """
+    Accepts a pending join request in one short transaction: flips the
+    request to accepted, claims a seat with a single conditional UPDATE
+    (marking the team filled when it takes the last one) and records the
+    membership.
+
+    Raises:
+        JoinRequestConflict: if the request was already decided, the team
+            is full or the user is already a member.
+    """
+    params = {"team_id": join_request.team_application_id, "user_id": int(join_request.user_id)}
+
+    def attempt():
+        with transaction.atomic():
+            _decide(join_request.id, "accepted")
+            with connection.cursor() as cursor:
+                cursor.execute(CLAIM_SEAT_SQL, params)
+                row = cursor.fetchone()
+                if row is None:
+                    cursor.execute(IS_MEMBER_SQL, params)
+                    is_member = cursor.fetchone()
+                    if is_member and is_member[0]:
+                        metrics.incr("join_accept.already_member")
+                        raise JoinRequestConflict("User is already a member of this team")
+                    metrics.incr("join_accept.full")
+                    raise JoinRequestConflict("Team is already full")
+                cursor.execute(INSERT_MEMBERSHIP_SQL, params)
+        return AcceptedTeam(*row)
+
+    result = _with_retries(attempt)
+    metrics.incr("join_accept.accepted")
+    return result
+
+
+def reject_join_request(join_request):
+    """
+    Rejects a pending join request.
+
+    Raises:
+        JoinRequestConflict: if the request was already decided.
+    """
+    _with_retries(lambda: _decide(join_request.id, "rejected"))
@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.http import urlencode
+
+from ..models import TeamJoinRequest, TeamMembership
+from . import metrics
+
+# Bumping the generation makes every cached page unreachable at once, so
+# invalidation never has to enumerate keys. Generations start from the
+# current time so a cache restart can never resurrect an old ETag.
+GENERATION_KEY = "team_listing:generation"
+USER_GENERATION_KEY = "team_listing:user:{}"
+
+metrics.register("team_listing_cache.hit", "team_listing_cache.miss")
+
+logger = logging.getLogger(__name__)
+
+
+def enabled() -> bool:
+    """
+    Whether listing pages and ETags are served from the cache
+    (TEAM_LISTING_CACHE_ENABLED). Invalidations also come from other
+    processes (the celery expiry task, consumers), so production needs a
+    cache shared by all of them; under locmem, as in tests and single
+    process runs, a warning is logged once.
+    """
+    global _warned
+    if not settings.TEAM_LISTING_CACHE_ENABLED:
+        return False
+    if not _warned:
+        _warned = True
+        if isinstance(caches["default"], LocMemCache):
+            logger.warning("Team listing cache is process-local (locmem): invalidations from other processes will not reach it")
+    return True
+
+
+_warned = False
+
+
+def _get_generation(key) -> int:
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key) or 0
+
+
+def _bump_generation(key):
+    cache.add(key, time.time_ns(), timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def _generation() -> int:
+    return _get_generation(GENERATION_KEY)
+
+
+def _query_string(params) -> str:
+    return urlencode(sorted((k, v) for k, v in params.items() if k != "format"))
+
+
+def page_key(params) -> str:
+    """
+    Cache key for a listing page under the current generation. Resolve it
+    once per request, before reading the database, so a page computed while
+    an invalidation lands is stored under the generation it was read from.
+    """
+    if not enabled():
+        return None
+    digest = hashlib.sha1(_query_string(params).encode()).hexdigest()
+    return f"team_listing:{_generation()}:{digest}"
+
+
+def get_page(key):
+    """
+    Returns the cached user-independent payload for a listing page, or None.
+    """
+    if key is None:
+        return None
+    payload = cache.get(key)
+    metrics.incr("team_listing_cache.hit" if payload is not None else "team_listing_cache.miss")
+    return payload
+
+
+def set_page(key, payload):
+    if key is None:
+        return
+    cache.set(key, payload, timeout=settings.TEAM_LISTING_CACHE_TTL)
+
+
+def invalidate():
+    """
+    Drops every cached listing page. Call after any write that changes what
+    the public listing shows (team created, join request decided, expiry).
+    """
+    _bump_generation(GENERATION_KEY)
+
+
+def invalidate_user(user_id):
+    """
+    Marks the per-user part of the listing (pending requests) as changed
+    without touching the shared pages.
+    """
+    _bump_generation(USER_GENERATION_KEY.format(int(user_id)))
+
+
+def version_parts(params, user_id):
+    """
+    Everything a listing response depends on, for building its ETag: the
+    shared generation, the query and, for signed-in callers, their own
+    generation. None when the cache is disabled: without generations
+    there is nothing safe to validate against.
+    """
+    if not enabled():
+        return None
+    parts = [_generation(), _query_string(params)]
+    if user_id is not None:
+        parts += [int(user_id), _get_generation(USER_GENERATION_KEY.format(int(user_id)))]
+    return parts
+
+
+def apply_user_roles(payload, user_id):
+    """
+    Overlays `user_role` for `user_id` on a cached payload. Membership and
+    pending requests are looked up only for the teams on the page.
+    """
+    if user_id is None:
+        return payload
+
+    user_id = int(user_id)
+    team_ids = [row["id"] for row in payload["results"]]
+
+    member_team_ids = set(
+        TeamMembership.objects.filter(
+            user_id=user_id, team_id__in=team_ids
+        ).values_list("team_id", flat=True)
+    )
+    pending_team_ids = set(
+        TeamJoinRequest.objects.filter(
+            user_id=user_id, status="pending", team_application_id__in=team_ids
+        ).values_list("team_application_id", flat=True)
+    )
+
+    results = []
+    for row in payload["results"]:
+        if int(row["leader_user_id"]) == user_id:
+            role = "owner"
+        elif row["id"] in member_team_ids:
+            role = "member"
+        elif row["id"] in pending_team_ids:
+            role = "pending"
+        else:
+            role = "default"
+        results.append({**row, "user_role": role})
+
+    return {**payload, "results": results}
@@ -0,0 +1,41 @@
+from django.core.cache import cache
+
+# Counters live in the Django cache so every worker process reports into
+# the same numbers when a shared backend is configured.
+KEY_PREFIX = "metrics:"
+
+_registered = set()
+
+
+def register(*names):
+    """
+    Declares counter names so they show up in `snapshot()` even before
+    they are first incremented.
+    """
+    _registered.update(names)
+
+
+def incr(name: str, amount: int = 1):
+    _registered.add(name)
+    key = KEY_PREFIX + name
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        # Key was evicted between add() and incr()
+        cache.set(key, amount, timeout=None)
+
+
+def observe(name: str, seconds: float):
+    """
+    Records a duration as a count and a running total in microseconds
+    (`<name>.count` / `<name>.total_us`).
+    """
+    incr(f"{name}.count")
+    incr(f"{name}.total_us", int(seconds * 1_000_000))
+
+
+def snapshot() -> dict:
+    keys = {KEY_PREFIX + name: name for name in sorted(_registered)}
+    values = cache.get_many(keys.keys())
+    return {name: values.get(key, 0) for key, name in keys.items()}
@@ -0,0 +1,70 @@
+TEAM_UPDATED_EVENT = "team.updated"
+
+
+def team_context(team_app, leader=None):
+    """
+    The team fields notification-service stores on each notification row,
+    so it can render notifications without calling back into this service.
+    """
+    return {
+        "team_name": team_app.team_name,
+        "leader_name": leader.full_name if leader else None,
+        "leader_profile_image": leader.avatar_key("small") if leader else None,
+    }
+
+
+def join_decision_events(team_app, requester_id, new_status, member_user_ids=(), new_member_name="A new member", leader=None):
+    """
+    Builds the notification events for a decided join request.
+
+    Accepted: every existing member hears about the new member (as a single
+    team event with a recipient list), and the requester is told they were
+    added. Rejected: only the requester is told. Every event carries the
+    team context of `leader`'s team.
+    """
+    context = team_context(team_app, leader)
+
+    if new_status != "accepted":
+        return [{
+            "user_id": requester_id,
+            "team_application_id": team_app.id,
+            "message": f"Your request to join team '{team_app.team_name}' was declined",
+            "type": "request_rejected",
+            **context,
+        }]
+
+    # One team event for all existing members; the notification consumer
+    # expands it into a row per recipient.
+    recipient_ids = [member_id for member_id in member_user_ids if member_id != requester_id]
+    events = []
+    if recipient_ids:
+        events.append({
+            "recipient_ids": recipient_ids,
+            "team_application_id": team_app.id,
+            "message": f"{new_member_name} has joined your team '{team_app.team_name}'",
+            "type": "new_member_added",
+            **context,
+        })
+    events.append({
+        "user_id": requester_id,
+        "team_application_id": team_app.id,
+        "message": f"You have been added to team '{team_app.team_name}'",
+        "type": "request_accepted",
+        **context,
+    })
+    return events
+
+
+def team_updated_event(team_apps, leader=None):
+    """
+    A team.updated event carrying fresh team context for `team_apps`, so
+    notification-service can patch the rows it already stored. Sent
+    through the same outbox and queue as notifications.
+    """
+    return {
+        "event": TEAM_UPDATED_EVENT,
+        "teams": [
+            {"team_application_id": team_app.id, **team_context(team_app, leader)}
+            for team_app in team_apps
+        ],
+    }
@@ -0,0 +1,73 @@
+import select
+
+from django.db import connection, transaction
+
+from ..models import OutboxEvent
+from . import metrics
+
+NOTIFY_CHANNEL = "team_outbox"
+
+metrics.register("outbox.enqueued", "outbox.published")
+
+
+def enqueue(events):
+    """
+    Stores notification events in the outbox. Must run inside the
+    transaction that makes the corresponding state change, so the events
+    exist if and only if the change commits. A NOTIFY (delivered on commit)
+    wakes the relay immediately.
+    """
+    if not events:
+        return
+    OutboxEvent.objects.bulk_create([OutboxEvent(payload=event) for event in events])
+    with connection.cursor() as cursor:
+        cursor.execute(f"NOTIFY {NOTIFY_CHANNEL}")
+    metrics.incr("outbox.enqueued", len(events))
+
+
+def relay_batch(publisher, batch_size=500) -> int:
+    """
+    Publishes up to `batch_size` of the oldest outbox events and deletes
+    them once the broker has confirmed them. Rows are claimed with
+    FOR UPDATE SKIP LOCKED, so several relays can drain concurrently. If
+    publishing fails the transaction rolls back and the rows are retried;
+    delivery is at-least-once.
+
+    Returns the number of events published.
+    """
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .order_by("id")
+            .values_list("id", "payload")[:batch_size]
+        )
+        if not events:
+            return 0
+
+        publisher.publish_many([payload for _, payload in events])
+        OutboxEvent.objects.filter(id__in=[event_id for event_id, _ in events]).delete()
+
+    metrics.incr("outbox.published", len(events))
+    return len(events)
+
+
+def listen():
+    """
+    Subscribes this process's database connection to outbox notifications.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+
+
+def wait_for_events(timeout):
+    """
+    Blocks until an outbox NOTIFY arrives or `timeout` seconds pass.
+    """
+    pg_connection = connection.connection
+    if pg_connection.notifies:
+        # Already received while the last batch was being relayed
+        pg_connection.notifies.clear()
+        return
+    if select.select([pg_connection], [], [], timeout)[0]:
+        pg_connection.poll()
+        pg_connection.notifies.clear()
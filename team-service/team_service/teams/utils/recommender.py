@@ -0,0 +1,233 @@
+import math
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Max
+
+from ..models import TeamApplication
+from . import metrics
+
+# Score = overlap weight * IDF-weighted skill overlap (0..1)
+#       + capacity weight * free slots (0..1, saturating)
+#       + date weight     * hackathon proximity (0..1, decaying)
+OVERLAP_WEIGHT = 0.6
+CAPACITY_WEIGHT = 0.2
+DATE_WEIGHT = 0.2
+CAPACITY_SATURATION = 4     # slots beyond this don't score higher
+DATE_DECAY_DAYS = 30.0
+
+# Rows changed in a transaction that commits after a refresh may carry an
+# older updated_at than the watermark, so each refresh re-reads this window.
+WATERMARK_OVERLAP = timedelta(seconds=60)
+
+metrics.register("recommender.refresh", "recommender.rows_applied", "recommender.rows_removed")
+
+
+class TeamSkillIndex:
+    """
+    In-memory index of open teams for vectorized scoring.
+
+    Each team is a row; required skills are stored as a bitset of uint64
+    words (one bit per skill column), next to capacity_left and the
+    hackathon date as parallel NumPy arrays. The index is built once and
+    then kept current by applying only the teams whose `updated_at` moved
+    past the last seen watermark.
+
+    Only open teams have a row. A team that closes, fills or expires is
+    removed by moving the last row into its slot, so the rows stay dense
+    and `_df` and the row count used for IDF describe open teams only.
+    Deleted teams leave no updated row behind; they are dropped when the
+    index is reconciled with the open team ids every
+    RECOMMENDER_RECONCILE_SECONDS.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._row_of = {}           # team id -> row
+        self._skills_of = {}        # team id -> skill ids, for df bookkeeping
+        self._column_of = {}        # skill id -> bit column
+        self._df = np.zeros(0, dtype=np.int64)
+        self._size = 0
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._capacity_left = np.zeros(0, dtype=np.int32)
+        self._hackathon_day = np.zeros(0, dtype=np.int32)
+        self._bits = np.zeros((0, 1), dtype=np.uint64)
+        self._watermark = None
+        self._refreshed_at = 0.0
+        self._reconciled_at = time.monotonic()
+
+    # --- maintenance -------------------------------------------------------
+
+    def refresh(self, force=False):
+        if not force and time.monotonic() - self._refreshed_at < settings.RECOMMENDER_REFRESH_SECONDS:
+            return
+
+        with self._lock:
+            if not force and time.monotonic() - self._refreshed_at < settings.RECOMMENDER_REFRESH_SECONDS:
+                return
+
+            teams = TeamApplication.objects.all()
+            if self._watermark is None:
+                teams = teams.filter(status="open", capacity_left__gt=0)
+            else:
+                teams = teams.filter(updated_at__gte=self._watermark - WATERMARK_OVERLAP)
+
+            rows = teams.values_list(
+                "id", "skills", "capacity_left", "hackathon_date", "status", "updated_at"
+            )
+
+            applied = 0
+            watermark = self._watermark
+            for team_id, skills, capacity_left, hackathon_date, status, updated_at in rows.iterator():
+                self._apply(team_id, skills, capacity_left, hackathon_date, status == "open")
+                if watermark is None or updated_at > watermark:
+                    watermark = updated_at
+                applied += 1
+
+            if watermark is None:
+                watermark = TeamApplication.objects.aggregate(m=Max("updated_at"))["m"]
+
+            removed = 0
+            if time.monotonic() - self._reconciled_at >= settings.RECOMMENDER_RECONCILE_SECONDS:
+                removed = self._reconcile()
+
+            self._watermark = watermark
+            self._refreshed_at = time.monotonic()
+
+        metrics.incr("recommender.refresh")
+        metrics.incr("recommender.rows_applied", applied)
+        if removed:
+            metrics.incr("recommender.rows_removed", removed)
+
+    def _reconcile(self):
+        """Drops rows of teams that no longer exist or are no longer open."""
+        open_ids = set(TeamApplication.objects.filter(status="open").values_list("id", flat=True))
+        gone = [team_id for team_id in self._row_of if team_id not in open_ids]
+        for team_id in gone:
+            self._remove(team_id)
+        self._reconciled_at = time.monotonic()
+        return len(gone)
+
+    def _apply(self, team_id, skills, capacity_left, hackathon_date, is_open):
+        if not is_open:
+            if team_id in self._row_of:
+                self._remove(team_id)
+            return
+
+        row = self._row_of.get(team_id)
+        if row is None:
+            row = self._append_row(team_id)
+        else:
+            self._bits[row, :] = 0
+            self._df[[self._column_of[s] for s in self._skills_of[team_id]]] -= 1
+
+        skills = sorted(set(skills))
+        for skill_id in skills:
+            column = self._column(skill_id)
+            self._bits[row, column >> 6] |= np.uint64(1) << np.uint64(column & 63)
+        self._df[[self._column_of[s] for s in skills]] += 1
+
+        self._skills_of[team_id] = skills
+        self._capacity_left[row] = capacity_left
+        self._hackathon_day[row] = hackathon_date.toordinal()
+
+    def _remove(self, team_id):
+        row = self._row_of.pop(team_id)
+        self._df[[self._column_of[s] for s in self._skills_of.pop(team_id)]] -= 1
+
+        # Fill the gap with the last row so rows [0, size) stay dense
+        last = self._size - 1
+        if row != last:
+            moved_id = int(self._ids[last])
+            self._ids[row] = moved_id
+            self._capacity_left[row] = self._capacity_left[last]
+            self._hackathon_day[row] = self._hackathon_day[last]
+            self._bits[row, :] = self._bits[last, :]
+            self._row_of[moved_id] = row
+        self._bits[last, :] = 0
+        self._size = last
+
+    def _append_row(self, team_id):
+        if self._size == len(self._ids):
+            grow = max(1024, self._size)
+            self._ids = np.concatenate([self._ids, np.zeros(grow, dtype=np.int64)])
+            self._capacity_left = np.concatenate([self._capacity_left, np.zeros(grow, dtype=np.int32)])
+            self._hackathon_day = np.concatenate([self._hackathon_day, np.zeros(grow, dtype=np.int32)])
+            self._bits = np.vstack([self._bits, np.zeros((grow, self._bits.shape[1]), dtype=np.uint64)])
+
+        row = self._size
+        self._size += 1
+        self._ids[row] = team_id
+        self._row_of[team_id] = row
+        return row
+
+    def _column(self, skill_id):
+        column = self._column_of.get(skill_id)
+        if column is None:
+            column = len(self._column_of)
+            self._column_of[skill_id] = column
+            self._df = np.append(self._df, 0)
+            if column >> 6 >= self._bits.shape[1]:
+                extra = np.zeros((self._bits.shape[0], self._bits.shape[1]), dtype=np.uint64)
+                self._bits = np.hstack([self._bits, extra])
+        return column
+
+    # --- scoring -----------------------------------------------------------
+
+    def top(self, skill_ids, limit, exclude_ids=(), today=None):
+        """
+        Returns [(team_id, score), ...] for the best `limit` open teams for a
+        user with `skill_ids`, best first.
+        """
+        today = (today or date.today()).toordinal()
+
+        with self._lock:
+            n = self._size
+            if n == 0:
+                return []
+
+            days = self._hackathon_day[:n] - today
+            capacity_left = self._capacity_left[:n]
+            eligible = (days >= 0) & (capacity_left > 0)
+
+            overlap = np.zeros(n, dtype=np.float64)
+            total_weight = 0.0
+            for skill_id in set(skill_ids):
+                column = self._column_of.get(skill_id)
+                df = self._df[column] if column is not None else 0
+                # Rarer skills say more about fit than ubiquitous ones
+                weight = math.log(1.0 + n / (1.0 + df))
+                total_weight += weight
+                if column is None or df == 0:
+                    continue
+                word = self._bits[:n, column >> 6]
+                has_skill = (word >> np.uint64(column & 63)) & np.uint64(1)
+                overlap += has_skill.astype(np.float64) * weight
+
+            if total_weight:
+                overlap /= total_weight
+
+            capacity = np.minimum(capacity_left, CAPACITY_SATURATION) / CAPACITY_SATURATION
+            proximity = np.exp(-np.maximum(days, 0) / DATE_DECAY_DAYS)
+            scores = (
+                OVERLAP_WEIGHT * overlap
+                + CAPACITY_WEIGHT * capacity
+                + DATE_WEIGHT * proximity
+            )
+
+            excluded = [self._row_of[i] for i in exclude_ids if i in self._row_of]
+            eligible[excluded] = False
+            candidates = np.flatnonzero(eligible)
+            if len(candidates) == 0:
+                return []
+
+            k = min(limit, len(candidates))
+            best = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            return [(int(self._ids[row]), float(scores[row])) for row in best]
+
+
+team_skill_index = TeamSkillIndex()
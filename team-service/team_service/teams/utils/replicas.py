@@ -0,0 +1,165 @@
+import csv
+import io
+import json
+from collections import defaultdict
+
+from django.db import connection, transaction
+
+from ..models import CustomUser, Skill, TeamApplication
+from . import listing_cache, metrics, outbox
+from .notifications import team_updated_event
+
+USER_FIELDS = ("email", "full_name", "profile_image", "profile_image_variants", "skills")
+
+metrics.register("replicas.users_upserted", "replicas.skills_upserted")
+
+
+def user_from_event(data):
+    """
+    An unsaved CustomUser from a user.created payload (KeyError/TypeError
+    if malformed). `skills` is None when the payload does not carry them.
+    """
+    return CustomUser(
+        id=data["id"],
+        email=data["email"],
+        full_name=data["full_name"],
+        profile_image=data.get("profile_image"),
+        profile_image_variants=data.get("profile_image_variants") or {},
+        skills=data.get("skills"),
+    )
+
+
+def skill_from_event(data):
+    """An unsaved Skill from a skill.created payload (KeyError/TypeError if malformed)."""
+    return Skill(id=data["id"], skill=data["skill"])
+
+
+def latest_by_id(rows):
+    """
+    Keeps the last row per id, sorted by id. Postgres rejects an upsert
+    touching the same row twice, and a stable order keeps concurrent
+    batches from deadlocking.
+    """
+    latest = {}
+    for row in rows:
+        latest[row.id] = row
+    return [latest[row_id] for row_id in sorted(latest)]
+
+
+def upsert_users(users):
+    """
+    Inserts or updates replica users with one INSERT ... ON CONFLICT. When
+    a team leader's name or avatar changes, a team.updated event for their
+    teams goes into the outbox in the same transaction, so stored
+    notifications get patched. Users whose events carry no skills keep
+    the skills already stored.
+    """
+    latest = {}
+    for user in users:
+        if user.skills is None and user.id in latest:
+            # An earlier event of the batch knew the skills
+            user.skills = latest[user.id].skills
+        latest[user.id] = user
+    users = latest_by_id(users)
+    without_skills = {user.id for user in users if user.skills is None}
+    for user in users:
+        if user.id in without_skills:
+            user.skills = []  # only written when the row is new
+
+    with transaction.atomic():
+        previous = CustomUser.objects.only("id", "full_name", "profile_image", "profile_image_variants").in_bulk(
+            [user.id for user in users]
+        )
+        CustomUser.objects.bulk_create(
+            [user for user in users if user.id not in without_skills],
+            update_conflicts=True, unique_fields=["id"], update_fields=USER_FIELDS,
+        )
+        CustomUser.objects.bulk_create(
+            [user for user in users if user.id in without_skills],
+            update_conflicts=True, unique_fields=["id"], update_fields=[f for f in USER_FIELDS if f != "skills"],
+        )
+
+        # Cached listing pages show leader names; drop them when a team
+        # leader's name appears or changes
+        renamed = [user.id for user in users if user.id not in previous or previous[user.id].full_name != user.full_name]
+        if renamed and TeamApplication.objects.filter(leader_user_id__in=renamed).exists():
+            transaction.on_commit(listing_cache.invalidate)
+
+        changed = {
+            user.id: user for user in users
+            if user.id in previous and (
+                (previous[user.id].full_name, previous[user.id].avatar_key("small"))
+                != (user.full_name, user.avatar_key("small"))
+            )
+        }
+        if changed:
+            teams_by_leader = defaultdict(list)
+            for team in TeamApplication.objects.filter(leader_user_id__in=changed).only("id", "team_name", "leader_user_id"):
+                teams_by_leader[team.leader_user_id].append(team)
+            outbox.enqueue([
+                team_updated_event(teams, leader=changed[leader_id])
+                for leader_id, teams in teams_by_leader.items()
+            ])
+
+    metrics.incr("replicas.users_upserted", len(users))
+    return len(users)
+
+
+def upsert_skills(skills):
+    """Inserts or updates replica skills with one INSERT ... ON CONFLICT."""
+    skills = latest_by_id(skills)
+    Skill.objects.bulk_create(skills, update_conflicts=True, unique_fields=["id"], update_fields=["skill"])
+    # Cached listing pages show skill names
+    if skills:
+        listing_cache.invalidate()
+    metrics.incr("replicas.skills_upserted", len(skills))
+    return len(skills)
+
+
+# Column order of the rows copy_rows() loads, per replica table
+COPY_COLUMNS = {
+    "users": ("id", "email", "full_name", "profile_image", "profile_image_variants", "skills"),
+    "skills": ("id", "skill"),
+}
+COPY_MODELS = {"users": CustomUser, "skills": Skill}
+
+
+def copy_row(table, data):
+    """A user.created/skill.created payload as a row of COPY_COLUMNS[table]."""
+    if table == "skills":
+        return [data["id"], data["skill"]]
+    return [
+        data["id"],
+        data["email"],
+        data["full_name"],
+        data.get("profile_image"),  # None is written as an unquoted empty field: NULL
+        json.dumps(data.get("profile_image_variants") or {}),
+        "{" + ",".join(str(int(skill_id)) for skill_id in data.get("skills", [])) + "}",
+    ]
+
+
+def copy_rows(table, rows):
+    """
+    Bulk loads rows into a replica table: COPY into a temporary staging
+    table, then one INSERT ... ON CONFLICT (id) DO UPDATE from it, so rows
+    that already exist are refreshed. Rows must have unique ids.
+    """
+    model = COPY_MODELS[table]
+    quote = connection.ops.quote_name
+    db_table = quote(model._meta.db_table)
+    columns = ", ".join(quote(column) for column in COPY_COLUMNS[table])
+    updates = ", ".join(f"{quote(column)} = EXCLUDED.{quote(column)}" for column in COPY_COLUMNS[table] if column != "id")
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"CREATE TEMP TABLE replica_stage (LIKE {db_table} INCLUDING DEFAULTS)")
+        cursor.copy_expert(f"COPY replica_stage ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.execute(
+            f"INSERT INTO {db_table} ({columns}) SELECT {columns} FROM replica_stage "
+            f"ON CONFLICT (id) DO UPDATE SET {updates}"
+        )
+        cursor.execute("DROP TABLE replica_stage")
+    return len(rows)
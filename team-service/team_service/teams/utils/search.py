@@ -0,0 +1,93 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connection
+from django.db.models import F, IntegerField
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Lower
+
+from ..models import Skill, TeamApplication
+
+
+def resolve_skill_ids(value: str | None) -> list[int]:
+    """
+    Resolves a comma-separated list of skills into skill IDs using the local
+    `Skill` replica. Each entry may be a numeric ID or a skill name
+    (case-insensitive), so "3,react,Django" is valid. Unknown names are
+    dropped.
+    """
+    if not value:
+        return []
+
+    ids, names = set(), set()
+    for token in value.split(","):
+        token = token.strip()
+        if not token:
+            continue
+        if token.isdigit():
+            ids.add(int(token))
+        else:
+            names.add(token.lower())
+
+    if names:
+        ids.update(
+            Skill.objects.annotate(name=Lower("skill"))
+            .filter(name__in=names)
+            .values_list("id", flat=True)
+        )
+
+    return sorted(ids)
+
+
+def skill_overlap_count(skill_ids: list[int]) -> RawSQL:
+    """
+    Expression counting how many of `skill_ids` a team application requires,
+    i.e. the size of the intersection of the two arrays.
+    """
+    table = connection.ops.quote_name(TeamApplication._meta.db_table)
+    return RawSQL(
+        "cardinality(ARRAY("
+        f"SELECT unnest({table}.skills) "
+        "INTERSECT SELECT unnest(%s::integer[])))",
+        (skill_ids,),
+        output_field=IntegerField(),
+    )
+
+
+def rank_by_skill_overlap(queryset, skill_ids: list[int], candidates: int):
+    """
+    Orders `queryset` (already filtered on the skill arrays) by
+    `skill_overlap_count`, best match first. Only the `candidates` newest
+    matching rows are ranked: they are picked by a capped subquery that the
+    GIN indexes on `skills` serve, so a common skill does not compute the
+    overlap for, and sort, every team that requires it.
+    """
+    candidate_ids = queryset.order_by("-created_at", "-id").values("id")[:candidates]
+    return (
+        TeamApplication.objects.filter(id__in=candidate_ids)
+        .annotate(match_count=skill_overlap_count(skill_ids))
+        .order_by("-match_count", "-created_at", "-id")
+    )
+
+
+def full_text_search(text: str):
+    """
+    Ranked full-text search over team name, title and description using the
+    stored `search_vector` column and its GIN index.
+    """
+    query = SearchQuery(text, search_type="websearch", config="english")
+    return (
+        TeamApplication.objects.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", "-created_at", "-id")
+    )
+
+
+def team_name_trigram_search(text: str):
+    """
+    Typo-tolerant team name lookup. `trigram_similar` compiles to the `%`
+    operator, which is served by the gin_trgm_ops index on `team_name`.
+    """
+    return (
+        TeamApplication.objects.filter(team_name__trigram_similar=text)
+        .annotate(rank=TrigramSimilarity("team_name", text))
+        .order_by("-rank", "-created_at", "-id")
+    )
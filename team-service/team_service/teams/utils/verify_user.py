@@ -1,19 +1,36 @@
-import jwt
 import os
-from rest_framework.exceptions import AuthenticationFailed
+
+from django.conf import settings
+from hackmate_common.auth import AUTH_METRICS, VerifiedTokenCache, decode_token
+
+from . import metrics
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 
+metrics.register(*AUTH_METRICS)
+
+verified_tokens = VerifiedTokenCache(
+    max_size=settings.JWT_VERIFY_CACHE_SIZE,
+    flush_interval=settings.AUTH_METRICS_FLUSH_SECONDS,
+)
+
+
+def flush_metrics(force=False):
+    """Adds this process's auth counters to the shared metrics once they are due."""
+    verified_tokens.flush(metrics.incr, force)
+
+
 def verify_user(token):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-    except jwt.ExpiredSignatureError:
-        raise AuthenticationFailed("Token has expired")
-    except jwt.InvalidTokenError:
-        raise AuthenticationFailed("Invalid token")
-
-    user_id = payload.get("user_id")
-    if not user_id:
-        raise AuthenticationFailed("user_id not found")
-
-    return user_id
\ No newline at end of file
+    """
+    Returns the user_id from a valid token, raising AuthenticationFailed
+    otherwise. Tokens seen before are answered from `verified_tokens`
+    without decoding again.
+    """
+    digest = VerifiedTokenCache.digest(token)
+    user_id = verified_tokens.get(digest)
+    if user_id is None:
+        payload = decode_token(token, SECRET_KEY, verified_tokens)
+        user_id = payload["user_id"]
+        verified_tokens.set(digest, user_id, payload.get("exp"))
+    flush_metrics()
+    return user_id
@@ -1,27 +1,35 @@
 from django.shortcuts import render
 from rest_framework.views import APIView
-from .serializers import FetchSkillsSerializer, CustomUserSerializer, CreateTeamApplicationSerializer,TeamApplicationListSerializer, TeamJoinRequestSerializer, TeamJoinRequestStatusUpdateSerializer
+from .serializers import FetchSkillsSerializer, CustomUserSerializer, CreateTeamApplicationSerializer,TeamApplicationListSerializer, TeamJoinRequestSerializer, TeamJoinRequestStatusUpdateSerializer, TeamSkillMatchSerializer, TeamSearchResultSerializer, TeamRecommendationSerializer
 from rest_framework.response import Response
 import requests
 import os
-from .models import TeamApplication, TeamJoinRequest, CustomUser, Skill
+from django.conf import settings
+from .models import TeamApplication, TeamJoinRequest, TeamMembership, CustomUser, Skill
 from datetime import date
-from .utils.verify_user import verify_user
-from rest_framework.exceptions import AuthenticationFailed
+from .authentication import OptionalJWTAuthentication
+from .utils.filters import build_team_filters, parse_id_list
+from .utils.pagination import decode_cursor, paginate_keyset, parse_page_size
+from .utils import listing_cache, outbox
+from .utils.conditional import make_etag, not_modified, presign_window, replica_parts, set_validators
+from .utils.notifications import join_decision_events
+from .utils.join_requests import JoinRequestConflict, accept_join_request, reject_join_request
+from .utils.recommender import team_skill_index
+from .utils.search import full_text_search, rank_by_skill_overlap, resolve_skill_ids, team_name_trigram_search
+from rest_framework.permissions import IsAuthenticated
 from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
 
 # Create your views here.
 
 class CreateTeamApplicationView(APIView):
+    permission_classes = [IsAuthenticated]
+
     def post(self, request):
-        # Step 1: Validate token using the local verify_user
-        try:
-            token = request.headers.get('Authorization', '').split(' ')[1]
-            user_id = verify_user(token)
-        except IndexError:
-            return Response({"error": "Authorization header is missing or invalid"}, status=401)
-        except AuthenticationFailed as e:
-            return Response({"error": str(e)}, status=401)
+        # Step 1: Caller authenticated by JWTAuthentication
+        user_id = request.user.id
+        token = request.auth
 
         # Step 2: Verify the user exists in the local db
         try:
@@ -57,18 +65,22 @@ class CreateTeamApplicationView(APIView):
         except (KeyError, TypeError):
             return Response({"error": "Invalid response format from skill service"}, status=500)
 
-        # Step 5: Create TeamApplication
+        # Step 5: Create TeamApplication and the leader's membership together
         try:
-            team_app = TeamApplication.objects.create(
-                leader_user_id=user_id,
-                skills=skill_ids,
-                member_user_ids=[user_id],
-                capacity_left=validated_data['capacity'] - 1,
-                **validated_data
-            )
+            with transaction.atomic():
+                team_app = TeamApplication.objects.create(
+                    leader_user_id=user_id,
+                    skills=skill_ids,
+                    member_user_ids=[user_id],
+                    capacity_left=validated_data['capacity'] - 1,
+                    **validated_data
+                )
+                TeamMembership.objects.create(team=team_app, user_id=user_id, role="leader")
         except Exception as e:
             return Response({"error": "Could not create team application", "details": str(e)}, status=500)
 
+        listing_cache.invalidate()
+
         return Response({
             "message": "Team application created successfully",
             "team_id": team_app.id,
@@ -78,40 +90,204 @@ class CreateTeamApplicationView(APIView):
 
 
 class ListTeamApplicationsView(APIView):
+    authentication_classes = [OptionalJWTAuthentication]
+
     def get(self, request):
+        # Step 1: Identify the caller; a missing or invalid token means anonymous
+        user_id = request.user.id
+
+        # Step 2: Answer conditional requests without touching the database
+        version = listing_cache.version_parts(request.query_params, user_id)
+        etag = make_etag(*version) if version is not None else None
+        if etag is not None:
+            response = not_modified(request, etag)
+            if response is not None:
+                return set_validators(response, etag, vary_on_auth=True)
+
+        # Step 3: Serve the user-independent page from the shared cache
+        cache_key = listing_cache.page_key(request.query_params)
+        payload = listing_cache.get_page(cache_key)
+        if payload is None:
+            # Step 4: Parse filters and the page cursor
+            try:
+                filters = build_team_filters(request.query_params)
+                cursor = decode_cursor(request.query_params.get("cursor"))
+                page_size = parse_page_size(request.query_params.get("limit"))
+            except ValueError as e:
+                return Response({"error": str(e)}, status=400)
+
+            # Step 5: Fetch one page of team applications, newest first
+            team_apps, next_cursor = paginate_keyset(
+                TeamApplication.objects.filter(filters), cursor, page_size
+            )
+
+            # Step 6: Prepare maps for this page only to avoid N+1 queries
+            user_ids = set(app.leader_user_id for app in team_apps)
+            skill_ids = set(skill_id for app in team_apps for skill_id in app.skills)
+
+            user_map = {
+                user.id: user for user in CustomUser.objects.filter(id__in=user_ids)
+            }
+            skill_map = {
+                skill.id: skill.skill for skill in Skill.objects.filter(id__in=skill_ids)
+            }
+
+            # Step 7: Serialize without a current user; roles are overlaid below
+            serializer = TeamApplicationListSerializer(
+                team_apps,
+                many=True,
+                context={
+                    "user_map": user_map,
+                    "skill_map": skill_map,
+                    "current_user_id": None,
+                },
+            )
+            payload = {"results": list(serializer.data), "next_cursor": next_cursor}
+            listing_cache.set_page(cache_key, payload)
+
+        # Step 8: Overlay the caller's role on each team
+        response = Response(listing_cache.apply_user_roles(payload, user_id), status=200)
+        if etag is None:
+            return response
+        return set_validators(response, etag, vary_on_auth=True)
+    
+
+
+class TeamSkillSearchView(APIView):
+    """
+    GET /api/teams/search/skills/?skills=python,react,7&match=any
+
+    Finds teams whose required skills overlap the given skills (names or IDs)
+    and ranks them by how many of those skills they require. `match=all`
+    only returns teams requiring every given skill. Accepts the same status,
+    hackathon date and has_capacity filters as the team listing; status
+    defaults to open.
+
+    Only the TEAM_SKILL_SEARCH_CANDIDATES (default 1000) newest matching
+    teams are ranked, so an older team with a bigger overlap can be left
+    out when more teams match. The response reports the cap as
+    `candidate_limit`.
+    """
+    authentication_classes = [OptionalJWTAuthentication]
+
+    def get(self, request):
+        # Step 1: Identify the caller (optional)
+        user_id = request.user.id
+
+        # Step 2: Resolve skills and filters
+        skill_ids = resolve_skill_ids(request.query_params.get("skills"))
+        candidate_limit = settings.TEAM_SKILL_SEARCH_CANDIDATES
+        if not skill_ids:
+            return Response({"results": [], "skills": [], "candidate_limit": candidate_limit}, status=200)
+
+        params = {k: v for k, v in request.query_params.items() if k != "skills"}
+        params.setdefault("status", "open")
         try:
-            # Step 1: Extract and verify JWT token
-            token = request.headers.get("Authorization", "").split(" ")[1]
-            user_id = verify_user(token)  # This should return the user_id
-        except IndexError:
-            user_id = None  # No token means unauthenticated
-        except AuthenticationFailed:
-            user_id = None  # Invalid token means unauthenticated
+            filters = build_team_filters(params)
+            page_size = parse_page_size(request.query_params.get("limit"))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        # Step 3: GIN-indexed array match, ranked by overlap size
+        if request.query_params.get("match") == "all":
+            filters &= Q(skills__contains=skill_ids)
+        else:
+            filters &= Q(skills__overlap=skill_ids)
 
-        # Step 2: Fetch all team applications
-        team_apps = TeamApplication.objects.all().order_by("-created_at")
+        team_apps = list(
+            rank_by_skill_overlap(TeamApplication.objects.filter(filters), skill_ids, candidate_limit)[:page_size]
+        )
 
-        # Step 3: Prepare maps to avoid N+1 queries
-        user_ids = set(app.leader_user_id for app in team_apps)
-        skill_ids = set(skill_id for app in team_apps for skill_id in app.skills)
+        # Step 4: Enrich the result set only
+        user_map = {
+            user.id: user
+            for user in CustomUser.objects.filter(id__in={app.leader_user_id for app in team_apps})
+        }
+        skill_map = {
+            skill.id: skill.skill
+            for skill in Skill.objects.filter(id__in={s for app in team_apps for s in app.skills})
+        }
+
+        user_join_requests_map = set()
+        if user_id:
+            user_join_requests_map = set(
+                TeamJoinRequest.objects.filter(
+                    user_id=user_id,
+                    status="pending",
+                    team_application_id__in=[app.id for app in team_apps],
+                ).values_list("team_application_id", flat=True)
+            )
 
+        serializer = TeamSkillMatchSerializer(
+            team_apps,
+            many=True,
+            context={
+                "user_map": user_map,
+                "skill_map": skill_map,
+                "current_user_id": user_id,
+                "user_join_requests_map": user_join_requests_map,
+            },
+        )
+        return Response(
+            {"results": serializer.data, "skills": skill_ids, "candidate_limit": candidate_limit}, status=200
+        )
+
+
+
+class TeamTextSearchView(APIView):
+    """
+    GET /api/teams/search/?q=chatbot
+
+    Ranked full-text search over team name, title and description. When the
+    query matches nothing (e.g. a misspelled team name) it falls back to a
+    trigram similarity lookup on team_name. Both paths are index-backed.
+    Accepts the same filters as the team listing.
+    """
+    authentication_classes = [OptionalJWTAuthentication]
+
+    def get(self, request):
+        # Step 1: Identify the caller (optional)
+        user_id = request.user.id
+
+        # Step 2: Validate query and filters
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            return Response({"error": "q is required"}, status=400)
+
+        try:
+            filters = build_team_filters(request.query_params)
+            page_size = parse_page_size(request.query_params.get("limit"))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        # Step 3: Full-text search, falling back to trigram on team name
+        mode = "fulltext"
+        team_apps = list(full_text_search(text).filter(filters)[:page_size])
+        if not team_apps:
+            mode = "trigram"
+            team_apps = list(team_name_trigram_search(text).filter(filters)[:page_size])
+
+        # Step 4: Enrich the result set only
         user_map = {
-            user.id: user for user in CustomUser.objects.filter(id__in=user_ids)
+            user.id: user
+            for user in CustomUser.objects.filter(id__in={app.leader_user_id for app in team_apps})
         }
         skill_map = {
-            skill.id: skill.skill for skill in Skill.objects.filter(id__in=skill_ids)
+            skill.id: skill.skill
+            for skill in Skill.objects.filter(id__in={s for app in team_apps for s in app.skills})
         }
 
-        # Step 4: If user is logged in, find all pending join requests made by them
         user_join_requests_map = set()
         if user_id:
-            pending_requests = TeamJoinRequest.objects.filter(
-                user_id=user_id, status="pending"
-            ).values_list("team_application_id", flat=True)
-            user_join_requests_map = set(pending_requests)
+            user_join_requests_map = set(
+                TeamJoinRequest.objects.filter(
+                    user_id=user_id,
+                    status="pending",
+                    team_application_id__in=[app.id for app in team_apps],
+                ).values_list("team_application_id", flat=True)
+            )
 
-        # Step 5: Serialize with custom context
-        serializer = TeamApplicationListSerializer(
+        serializer = TeamSearchResultSerializer(
             team_apps,
             many=True,
             context={
@@ -121,22 +297,92 @@ class ListTeamApplicationsView(APIView):
                 "user_join_requests_map": user_join_requests_map,
             },
         )
+        return Response({"results": serializer.data, "mode": mode}, status=200)
+
+
+
+class TeamRecommendationsView(APIView):
+    """
+    GET /api/recommendations/?limit=10[&skills=python,7]
+
+    Top open teams for the caller, scored on IDF-weighted overlap between
+    the caller's skills and each team's required skills, free capacity and
+    how soon the hackathon is. Scoring runs over an in-memory NumPy index
+    of open teams; `skills` overrides the caller's stored skills.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        # Step 1: Caller authenticated by JWTAuthentication
+        user_id = request.user.id
+
+        try:
+            page_size = parse_page_size(request.query_params.get("limit"))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        # Step 2: Caller's skills, from the query or the user replica
+        if request.query_params.get("skills"):
+            skill_ids = resolve_skill_ids(request.query_params["skills"])
+        else:
+            skill_ids = (
+                CustomUser.objects.filter(id=user_id).values_list("skills", flat=True).first() or []
+            )
+
+        # Step 3: Teams the caller already leads, belongs to or applied to
+        exclude_ids = set(
+            TeamMembership.objects.filter(user_id=user_id).values_list("team_id", flat=True)
+        )
+        exclude_ids.update(
+            TeamJoinRequest.objects.filter(user_id=user_id).values_list("team_application_id", flat=True)
+        )
+
+        # Step 4: Vectorized scoring over the in-memory index
+        team_skill_index.refresh()
+        ranked = team_skill_index.top(skill_ids, page_size, exclude_ids=exclude_ids)
+        scores = dict(ranked)
+
+        # Step 5: Load and enrich the winners; the index may lag the DB slightly
+        teams_by_id = TeamApplication.objects.filter(
+            id__in=scores.keys(), status="open", capacity_left__gt=0
+        ).in_bulk()
+        team_apps = []
+        for team_id, score in ranked:
+            team = teams_by_id.get(team_id)
+            if team is not None:
+                team.score = score
+                team_apps.append(team)
+
+        user_map = {
+            user.id: user
+            for user in CustomUser.objects.filter(id__in={app.leader_user_id for app in team_apps})
+        }
+        skill_map = {
+            skill.id: skill.skill
+            for skill in Skill.objects.filter(id__in={s for app in team_apps for s in app.skills})
+        }
+
+        serializer = TeamRecommendationSerializer(
+            team_apps,
+            many=True,
+            context={
+                "user_map": user_map,
+                "skill_map": skill_map,
+                "current_user_id": user_id,
+                "user_join_requests_map": set(),
+            },
+        )
+        return Response({"results": serializer.data}, status=200)
 
-        return Response(serializer.data, status=200)
-    
 
 
 class CreateTeamJoinRequestView(APIView):
+    permission_classes = [IsAuthenticated]
+
     def post(self, request):
-        # Step 1: Validate token using local utility
-        try:
-            token = request.headers.get('Authorization', '').split(' ')[1]
-            user_id = verify_user(token)
-        except IndexError:
-            return Response({"error": "Authorization header is missing or invalid"}, status=401)
-        except AuthenticationFailed as e:
-            return Response({"error": str(e)}, status=401)
-        
+        # Step 1: Caller authenticated by JWTAuthentication
+        user_id = request.user.id
+
         # Step 2: Verify user exists locally
         try:
             CustomUser.objects.get(id=user_id)
@@ -170,6 +416,7 @@ class CreateTeamJoinRequestView(APIView):
                 user_id=user_id,
                 message=message,
             )
+            listing_cache.invalidate_user(user_id)
             serializer = TeamJoinRequestSerializer(join_request)
             return Response(serializer.data, status=201)
         except Exception as e:
@@ -178,14 +425,11 @@ class CreateTeamJoinRequestView(APIView):
 
 
 class ListTeamJoinRequestsView(APIView):
+    permission_classes = [IsAuthenticated]
+
     def get(self, request, team_id):
-        # — your existing auth + leader check —
-        auth_header = request.headers.get("Authorization", "")
-        try:
-            token = auth_header.split()[1]
-            user_id = verify_user(token)
-        except Exception:
-            return Response({"error": "Invalid or missing token"}, status=401)
+        # — leader check; the caller is authenticated by JWTAuthentication —
+        user_id = request.user.id
 
         try:
             team_app = TeamApplication.objects.get(id=team_id)
@@ -239,18 +483,13 @@ class ListTeamJoinRequestsView(APIView):
 
 
 
-from team_service.producers.send_notification import publish_notification_event
 
 class UpdateJoinRequestStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+
     def patch(self, request, request_id):
-        # Step 1: Authenticate requester
-        try:
-            token = request.headers.get('Authorization', '').split(' ')[1]
-            user_id = verify_user(token)
-        except IndexError:
-            return Response({"error": "Authorization header is missing or invalid"}, status=401)
-        except AuthenticationFailed as e:
-            return Response({"error": str(e)}, status=401)
+        # Step 1: Caller authenticated by JWTAuthentication
+        user_id = request.user.id
 
         # Step 2: Fetch join request and verify leader
         try:
@@ -271,58 +510,135 @@ class UpdateJoinRequestStatusView(APIView):
         if serializer.is_valid():
             new_status = serializer.validated_data.get('status')
 
-            if new_status == 'accepted':
-                if team_app.capacity_left <= 0:
-                    return Response({"error": "Team is already full"}, status=400)
+            # Requester and leader (the caller) in one query
+            users = CustomUser.objects.in_bulk([join_request.user_id, user_id])
+            requester = users.get(join_request.user_id)
+            new_member_name = requester.full_name if requester else "A new member"
+
+            # Conditional single-statement updates; no read-modify-write races.
+            # Notifications go to the outbox in the same transaction and are
+            # published by the relay, so the broker is off the request path.
+            try:
+                with transaction.atomic():
+                    member_user_ids = ()
+                    if new_status == 'accepted':
+                        member_user_ids = accept_join_request(join_request).member_user_ids
+                    else:
+                        reject_join_request(join_request)
+
+                    # Notify the requester and, on acceptance, the existing members
+                    outbox.enqueue(join_decision_events(
+                        team_app, join_request.user_id, new_status,
+                        member_user_ids=member_user_ids,
+                        new_member_name=new_member_name,
+                        leader=users.get(user_id),
+                    ))
+            except JoinRequestConflict as e:
+                return Response({"error": str(e)}, status=400)
+
+            listing_cache.invalidate()
+
+            return Response({"message": f"Request {new_status} successfully"})
+
+        return Response(serializer.errors, status=400)
 
-                # Add new member and reduce capacity
-                team_app.member_user_ids.append(join_request.user_id)
-                team_app.capacity_left -= 1
 
-                # Check if team is now full
-                if team_app.capacity_left == 0:
-                    team_app.status = "filled"
 
-                team_app.save()
 
-            serializer.save()
+class BulkUpdateJoinRequestStatusView(APIView):
+    """
+    PATCH /api/join-requests/status/
+    {"decisions": [{"request_id": 4, "status": "accepted"}, ...]}
 
-            # Notification for other team members
+    Applies many accept/reject decisions in one transaction. Accepts are
+    applied in the given order and stop claiming seats once a team is full;
+    each decision gets its own result. All resulting notifications are
+    written to the outbox in the same transaction.
+    """
+    MAX_DECISIONS = 100
+    permission_classes = [IsAuthenticated]
+
+    def patch(self, request):
+        # Step 1: Caller authenticated by JWTAuthentication
+        user_id = request.user.id
+
+        # Step 2: Validate the decision list
+        decisions = request.data.get("decisions")
+        if not isinstance(decisions, list) or not decisions:
+            return Response({"error": "decisions must be a non-empty list"}, status=400)
+        if len(decisions) > self.MAX_DECISIONS:
+            return Response({"error": f"At most {self.MAX_DECISIONS} decisions per call"}, status=400)
+
+        parsed = []
+        for decision in decisions:
+            serializer = TeamJoinRequestStatusUpdateSerializer(data=decision, partial=True)
             try:
-                new_member = CustomUser.objects.get(id=join_request.user_id)
-                new_member_name = new_member.full_name
-            except CustomUser.DoesNotExist:
-                new_member_name = "A new member"
+                request_id = int(decision["request_id"])
+            except (KeyError, TypeError, ValueError):
+                return Response({"error": "Each decision needs an integer request_id"}, status=400)
+            if not serializer.is_valid() or "status" not in serializer.validated_data:
+                return Response({"request_id": request_id, "errors": serializer.errors or {"status": ["This field is required."]}}, status=400)
+            parsed.append((request_id, serializer.validated_data["status"]))
+
+        if len({request_id for request_id, _ in parsed}) != len(parsed):
+            return Response({"error": "Duplicate request_id in decisions"}, status=400)
+
+        # Step 3: Load every request and its team in one query; caller must lead them all
+        join_requests = TeamJoinRequest.objects.select_related('team_application').in_bulk(
+            [request_id for request_id, _ in parsed]
+        )
+        missing = [request_id for request_id, _ in parsed if request_id not in join_requests]
+        if missing:
+            return Response({"error": "Join request not found", "request_ids": missing}, status=404)
+        if any(int(jr.team_application.leader_user_id) != int(user_id) for jr in join_requests.values()):
+            return Response({"error": "Only the team leader can update the request status"}, status=403)
 
-            for member_id in team_app.member_user_ids:
-                if member_id == join_request.user_id:
+        # Requesters plus the leader (the caller) in one query
+        users = CustomUser.objects.in_bulk(
+            [jr.user_id for jr in join_requests.values()] + [user_id]
+        )
+        leader = users.get(user_id)
+
+        # Step 4: Apply all decisions in one transaction
+        results, events = [], []
+        with transaction.atomic():
+            for request_id, new_status in parsed:
+                join_request = join_requests[request_id]
+                team_app = join_request.team_application
+                try:
+                    if new_status == 'accepted':
+                        accepted = accept_join_request(join_request)
+                        member_user_ids = accepted.member_user_ids
+                    else:
+                        reject_join_request(join_request)
+                        member_user_ids = ()
+                except JoinRequestConflict as e:
+                    results.append({"request_id": request_id, "status": "skipped", "error": str(e)})
                     continue
 
-                notification_payload = {
-                    "user_id": member_id,
-                    "team_application_id": team_app.id,
-                    "message": f"{new_member_name} has joined your team '{team_app.team_name}'",
-                    "type": "new_member_added"
-                }
-                publish_notification_event(notification_payload)
-
-            # Notification to new member
-            notification_payload = {
-                "user_id": join_request.user_id,
-                "team_application_id": team_app.id,
-                "message": f"You have been added to team '{team_app.team_name}'",
-                "type": "request_accepted"
-            }
-            publish_notification_event(notification_payload)
+                results.append({"request_id": request_id, "status": new_status})
+                requester = users.get(join_request.user_id)
+                events.extend(join_decision_events(
+                    team_app, join_request.user_id, new_status,
+                    member_user_ids=member_user_ids,
+                    new_member_name=requester.full_name if requester else "A new member",
+                    leader=leader,
+                ))
 
-            return Response({"message": f"Request {new_status} successfully"})
+            outbox.enqueue(events)
 
-        return Response(serializer.errors, status=400)
+        # Step 5: Invalidate the listing once for the whole batch
+        if events:
+            listing_cache.invalidate()
 
+        return Response({"results": results}, status=200)
 
 
 
 class FetchUserView(APIView):
+    # Public views ignore tokens, so a stale one sent along is no 401
+    authentication_classes = []
+
     def get(self, request):
         users = CustomUser.objects.all()
         serializer = CustomUserSerializer(users, many=True)
@@ -330,25 +646,24 @@ class FetchUserView(APIView):
 
 
 class FetchSkillsView(APIView):
+    authentication_classes = []
+
     def get(self, request):
         skills = Skill.objects.all()
         serializer = FetchSkillsSerializer(skills, many=True)
         return Response({"data": serializer.data})
 
 
-from .utils.generate_s3_url import generate_presigned_s3_url
-
 class TeamMetaView(APIView):
+    authentication_classes = []
+
     def get(self, request, team_id):
         try:
             team = TeamApplication.objects.get(id=team_id)
             leader = CustomUser.objects.get(id=team.leader_user_id)
 
             image_url = leader.profile_image
-            print("URLLLLLLLLLLL")
-            print(generate_presigned_s3_url(leader.profile_image))
-            print("\n\n\n\n\n\n\n\n")
-            
+
             return Response({
                 "team_name": team.team_name,
                 "leader_name": leader.full_name,
@@ -362,12 +677,53 @@ class TeamMetaView(APIView):
 
 
 
+class TeamMetaBatchView(APIView):
+    """
+    GET /api/teams/meta/?ids=3,7,12
+    Returns {"teams": {"3": {"team_name", "leader_name", "profile_image"}, ...}}
+    for every team that exists, in two queries regardless of how many IDs
+    are asked for.
+    """
+    MAX_IDS = 200
+    authentication_classes = []
+
+    def get(self, request):
+        try:
+            team_ids = set(parse_id_list(request.query_params.get("ids")))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        if len(team_ids) > self.MAX_IDS:
+            return Response({"error": f"At most {self.MAX_IDS} ids per call"}, status=400)
+
+        teams = list(
+            TeamApplication.objects.filter(id__in=team_ids).values_list("id", "team_name", "leader_user_id")
+        )
+        leaders = {
+            user["id"]: user
+            for user in CustomUser.objects.filter(
+                id__in={leader_user_id for _, _, leader_user_id in teams}
+            ).values("id", "full_name", "profile_image")
+        }
+
+        result = {}
+        for team_id, team_name, leader_user_id in teams:
+            leader = leaders.get(leader_user_id, {})
+            result[str(team_id)] = {
+                "team_name": team_name,
+                "leader_name": leader.get("full_name"),
+                "profile_image": leader.get("profile_image"),
+            }
+        return Response({"teams": result})
+
+
+
 
 from rest_framework import status
 from .serializers import TeamApplicationDetailSerializer
-# or whatever function you use to decode JWT manually
 
 class TeamApplicationDetailView(APIView):
+    authentication_classes = [OptionalJWTAuthentication]
+
     def get(self, request, pk):
         # Step 1: Get the team application
         try:
@@ -375,16 +731,7 @@ class TeamApplicationDetailView(APIView):
         except TeamApplication.DoesNotExist:
             return Response({"detail": "Team not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        # Step 2: Extract user ID (optional, in case you still need it later)
-        auth_header = request.headers.get("Authorization", "")
-        token = auth_header.split(" ")[1] if " " in auth_header else None
-
-        try:
-            user_id = verify_user(token) if token else None
-        except (AuthenticationFailed, ValueError, TypeError):
-            user_id = None
-
-        # Step 3: Build user + skill maps
+        # Step 2: Build user + skill maps
         all_user_ids = set([app.leader_user_id] + app.member_user_ids)
         skill_ids = app.skills
 
@@ -395,6 +742,18 @@ class TeamApplicationDetailView(APIView):
             skill.id: skill.skill for skill in Skill.objects.filter(id__in=skill_ids)
         }
 
+        # Step 3: Answer conditional requests before presigning avatars. The
+        # body also depends on the members, their replica rows and the
+        # presigned URLs' lifetime, not only on the team row.
+        updated_at = app.updated_at
+        etag = make_etag(
+            "team", pk, updated_at.isoformat(), app.member_user_ids,
+            *replica_parts(user_map, skill_map), presign_window(),
+        )
+        response = not_modified(request, etag)
+        if response is not None:
+            return set_validators(response, etag, updated_at)
+
         # Step 4: Serialize with context (no join requests)
         serializer = TeamApplicationDetailSerializer(
             app,
@@ -404,29 +763,22 @@ class TeamApplicationDetailView(APIView):
                 "skill_map": skill_map,
             },
         )
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        response = Response(serializer.data, status=status.HTTP_200_OK)
+        return set_validators(response, etag, updated_at)
 
 
 
 
-from django.db.models import Q
-
 class UserTeamsView(APIView):
+    permission_classes = [IsAuthenticated]
+
     def get(self, request):
-        try:
-            token = request.headers.get('Authorization', '').split(' ')[1]
-            user_id = verify_user(token)
-        except IndexError:
-            return Response({"error": "Authorization header is missing or invalid"}, status=401)
-        except AuthenticationFailed as e:
-            return Response({"error": str(e)}, status=401)
-
-
-        # Fetch all relevant teams
-        teams = TeamApplication.objects.filter(
-            Q(leader_user_id=user_id) |
-            Q(member_user_ids__contains=[user_id])
-        )
+        user_id = request.user.id
+
+        # Fetch all relevant teams through the (user_id, team) membership index
+        teams = list(TeamApplication.objects.filter(
+            id__in=TeamMembership.objects.filter(user_id=user_id).values("team_id")
+        ))
 
         # Fetch all needed user and skill data for enrichment
         all_user_ids = set()
@@ -439,6 +791,18 @@ class UserTeamsView(APIView):
         user_map = {user.id: user for user in CustomUser.objects.filter(id__in=all_user_ids)}
         skill_map = {skill.id: skill.skill for skill in Skill.objects.filter(id__in=all_skill_ids)}
 
+        # Answer conditional requests from the teams' versions and the
+        # replica rows the response renders (leader names, skill names)
+        last_updated = max((team.updated_at for team in teams), default=None)
+        etag = make_etag(
+            "user-teams", user_id,
+            *sorted((team.id, team.updated_at.isoformat()) for team in teams),
+            *replica_parts(user_map, skill_map),
+        )
+        response = not_modified(request, etag)
+        if response is not None:
+            return set_validators(response, etag, last_updated, vary_on_auth=True)
+
         # Map of team IDs that user has sent join requests to (optional if not needed here)
         user_join_requests = set()
 
@@ -450,6 +814,8 @@ class UserTeamsView(APIView):
                 "user_map": user_map,
                 "skill_map": skill_map,
                 "user_join_requests_map": user_join_requests,
+                "member_team_ids": {team.id for team in teams},
             }
         )
-        return Response(serializer.data)
\ No newline at end of file
+        response = Response(serializer.data)
+        return set_validators(response, etag, last_updated, vary_on_auth=True)
\ No newline at end of file
@@ -0,0 +1,5 @@
+from hackmate_common.dead_letters import DeadLettersCommand
+
+
+class Command(DeadLettersCommand):
+    example_queue = "user-service.image-variants"
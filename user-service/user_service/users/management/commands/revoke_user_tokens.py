@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.models import CustomUser
+from users.rabbitmq.sender_users import publish_tokens_revoked
+
+
+class Command(BaseCommand):
+    help = "Revokes every token issued so far to a user (e.g. a compromised account)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("email")
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(email=options["email"])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}")
+
+        # Tokens carry a whole-second iat; anything issued up to now is revoked
+        publish_tokens_revoked(user.id, int(time.time()) + 1)
+        self.stdout.write(f"Revoked tokens of user {user.id}.")
@@ -23,6 +23,9 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     skills = models.ManyToManyField('Skill', blank=True)
     # profile_image = models.URLField(null=True, blank=True)
     profile_image = models.ImageField(upload_to="profile_images/", null=True, blank=True)
+    # Resized copies of profile_image written by the image variant worker,
+    # e.g. {"small": "profile_images/abc_64.webp", "medium": "profile_images/abc_256.webp"}
+    profile_image_variants = models.JSONField(default=dict, blank=True)
 
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
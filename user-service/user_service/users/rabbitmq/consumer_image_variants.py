@@ -0,0 +1,61 @@
+import logging
+import os
+import django
+
+# Django setup
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "user_service.settings")
+django.setup()
+
+from django.conf import settings
+from PIL import UnidentifiedImageError
+from users.models import CustomUser
+from hackmate_common.rabbitmq import Consumer, PermanentError
+from users.rabbitmq.sender_users import publish_user_created
+from users.utils.image_variants import generate_profile_image_variants
+
+
+def process_user_image(user_id, profile_image):
+    """
+    Generates the variants for a user's profile image, stores their keys on
+    the user and re-publishes user.created so replicas pick them up.
+    """
+    try:
+        user = CustomUser.objects.get(id=user_id)
+    except CustomUser.DoesNotExist:
+        print(f"[!] User {user_id} no longer exists, skipping")
+        return
+
+    # The job is stale if the image was replaced or removed since it was queued
+    if not user.profile_image or user.profile_image.name != profile_image:
+        print(f"[!] Profile image of user {user_id} changed, skipping")
+        return
+
+    user.profile_image_variants = generate_profile_image_variants(user.profile_image.name)
+    user.save(update_fields=["profile_image_variants"])
+    publish_user_created(user)
+    print(f"[✓] Generated profile image variants for user {user_id}: {user.profile_image_variants}")
+
+
+def handle_job(data):
+    try:
+        user_id = data["user_id"]
+    except (KeyError, TypeError) as e:
+        raise PermanentError(f"Invalid profile image job: missing {e}")
+
+    try:
+        process_user_image(user_id, data.get("profile_image"))
+    except UnidentifiedImageError as e:
+        # Not an image Pillow can read; retrying will not help, but the
+        # job stays in the dead-letter queue for inspection
+        raise PermanentError(f"Profile image of user {user_id} is not a readable image: {e}")
+
+
+def run_consumer():
+    consumer = Consumer(settings.IMAGE_VARIANTS_QUEUE)
+    # Resizing is CPU bound; take one job at a time and run more consumers to scale
+    consumer.run(handle_job, prefetch_count=1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    run_consumer()
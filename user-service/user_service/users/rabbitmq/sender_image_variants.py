@@ -0,0 +1,21 @@
+import pika, json
+from django.conf import settings
+
+
+def publish_image_variants_job(user):
+    """
+    Queues a user's profile image for thumbnail generation. The work is done
+    by users/rabbitmq/consumer_image_variants.py so registration never waits
+    on Pillow or on the extra S3 round trips.
+    """
+    connection = pika.BlockingConnection(pika.URLParameters(settings.RABBITMQ_URL))
+    channel = connection.channel()
+
+    channel.queue_declare(settings.IMAGE_VARIANTS_QUEUE, durable=True)
+    channel.basic_publish(
+        exchange="",
+        routing_key=settings.IMAGE_VARIANTS_QUEUE,
+        body=json.dumps({"user_id": user.id, "profile_image": user.profile_image.name}),
+        properties=pika.BasicProperties(content_type='application/json', delivery_mode=2)
+    )
+    connection.close()
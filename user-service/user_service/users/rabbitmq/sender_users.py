@@ -3,6 +3,22 @@ from django.conf import settings
 from django.core.files.storage import default_storage
 
 
+def user_event_payload(user, skill_ids=None):
+    """
+    The user.created payload; also the row format of the replica export.
+    `skill_ids` saves a query per user when the caller loaded them in bulk.
+    """
+    return {
+        "id": user.id,
+        "email": user.email,
+        "full_name": user.full_name,
+        "profile_image": user.profile_image.name if user.profile_image else None,
+        # Empty until the image variant worker has run; it then re-publishes
+        "profile_image_variants": user.profile_image_variants,
+        "skills": list(user.skills.values_list("id", flat=True)) if skill_ids is None else skill_ids,
+    }
+
+
 def publish_user_created(user):
     params = pika.URLParameters(settings.RABBITMQ_URL)
     conn = pika.BlockingConnection(params)
@@ -10,12 +26,7 @@ def publish_user_created(user):
 
     ch.exchange_declare(settings.USER_EVENTS_EXCHANGE, exchange_type='topic', durable=True)
     print(user.profile_image.name)
-    payload = {
-        "id": user.id,
-        "email": user.email,
-        "full_name": user.full_name,
-        "profile_image": user.profile_image.name if user.profile_image else None
-    }
+    payload = user_event_payload(user)
     ch.basic_publish(
         exchange=settings.USER_EVENTS_EXCHANGE,
         routing_key=settings.USER_CREATED_ROUTING_KEY,
@@ -23,3 +34,23 @@ def publish_user_created(user):
         properties=pika.BasicProperties(content_type='application/json', delivery_mode=2)
     )
     conn.close()
+
+
+def publish_tokens_revoked(user_id, revoked_before):
+    """
+    Tells services that verify JWTs locally to reject this user's tokens
+    issued before `revoked_before` (unix seconds).
+    """
+    params = pika.URLParameters(settings.RABBITMQ_URL)
+    conn = pika.BlockingConnection(params)
+    ch = conn.channel()
+
+    ch.exchange_declare(settings.USER_EVENTS_EXCHANGE, exchange_type='topic', durable=True)
+    payload = {"user_id": user_id, "revoked_before": revoked_before}
+    ch.basic_publish(
+        exchange=settings.USER_EVENTS_EXCHANGE,
+        routing_key=settings.USER_TOKENS_REVOKED_ROUTING_KEY,
+        body=json.dumps(payload),
+        properties=pika.BasicProperties(content_type='application/json', delivery_mode=2)
+    )
+    conn.close()
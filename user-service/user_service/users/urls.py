@@ -1,11 +1,14 @@
 from django.urls import path
-from .views import LoginView, RegisterView, VerifyUser, SyncAndReturnSkillsView, UserBatchDetailView, PublicUserDetailView
+from .views import LoginView, RegisterView, ProfileImageUploadIntentView, VerifyUser, SyncAndReturnSkillsView, UserBatchDetailView, PublicUserDetailView, ReplicaExportView
 
 urlpatterns = [
     path('login/', LoginView.as_view(), name='login'),
     path('register/', RegisterView.as_view(), name='register'),
+    path('register/profile-image/', ProfileImageUploadIntentView.as_view(), name='profile-image-upload-intent'),
     path('verify-user/', VerifyUser.as_view(), name='verify-user'),
     path('sync-get-skills/', SyncAndReturnSkillsView.as_view(), name='sync-skill'),
     path("users/details/", UserBatchDetailView.as_view(), name="user-batch-detail"),
     path("users/<int:user_id>/", PublicUserDetailView.as_view(), name="public-user-detail"),
+    path("export/users/", ReplicaExportView.as_view(), {"kind": "users"}, name="export-users"),
+    path("export/skills/", ReplicaExportView.as_view(), {"kind": "skills"}, name="export-skills"),
 ]
\ No newline at end of file
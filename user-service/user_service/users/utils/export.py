@@ -0,0 +1,45 @@
+import json
+from collections import defaultdict
+
+from ..models import CustomUser, Skill
+from ..rabbitmq.sender_users import user_event_payload
+
+# Rows fetched per query while streaming a page
+CHUNK_SIZE = 2000
+
+
+def _keyset_chunks(queryset, after, limit):
+    """Yields lists of rows with id > `after` in id order, at most `limit` rows in total."""
+    remaining = limit
+    while remaining > 0:
+        rows = list(queryset.filter(id__gt=after).order_by("id")[:min(CHUNK_SIZE, remaining)])
+        if not rows:
+            return
+        yield rows
+        after = rows[-1].id
+        remaining -= len(rows)
+
+
+def export_users(after, limit):
+    """
+    Yields NDJSON lines of up to `limit` users with id > `after`, in id
+    order and in the user.created payload format. Each chunk costs two
+    queries (users, then their skill ids), however large the page.
+    """
+    users = CustomUser.objects.only("id", "email", "full_name", "profile_image", "profile_image_variants")
+    through = CustomUser.skills.through
+    for chunk in _keyset_chunks(users, after, limit):
+        skill_ids = defaultdict(list)
+        for user_id, skill_id in through.objects.filter(
+            customuser_id__in=[user.id for user in chunk]
+        ).order_by("customuser_id", "skill_id").values_list("customuser_id", "skill_id"):
+            skill_ids[user_id].append(skill_id)
+        for user in chunk:
+            yield json.dumps(user_event_payload(user, skill_ids[user.id])) + "\n"
+
+
+def export_skills(after, limit):
+    """Yields NDJSON lines of up to `limit` skills with id > `after`, in the skill.created payload format."""
+    for chunk in _keyset_chunks(Skill.objects.all(), after, limit):
+        for skill in chunk:
+            yield json.dumps({"id": skill.id, "skill": skill.skill}) + "\n"
@@ -0,0 +1,56 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# name -> square edge in pixels. Every variant is a WebP centre crop.
+VARIANT_SIZES = {
+    "small": 64,
+    "medium": 256,
+}
+WEBP_QUALITY = 80
+
+
+def variant_key(original_key, size):
+    """
+    'profile_images/abc.jpg' -> 'profile_images/abc_64.webp', stored next to
+    the original.
+    """
+    stem, _ = os.path.splitext(original_key)
+    return f"{stem}_{size}.webp"
+
+
+def render_variant(image, size):
+    """
+    Crops the image to a centred square and resizes it to size x size,
+    returning the encoded WebP bytes.
+    """
+    thumbnail = ImageOps.fit(image, (size, size), method=Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    thumbnail.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def generate_profile_image_variants(original_key):
+    """
+    Reads the original upload from storage and writes every variant next to
+    it. Existing variant objects are overwritten, so reprocessing is safe.
+
+    Returns:
+        A dict mapping variant name -> storage key.
+    """
+    with default_storage.open(original_key, "rb") as original:
+        image = Image.open(original)
+        # Respect camera rotation, then drop EXIF (and any GPS data) with it
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+        variants = {}
+        for name, size in VARIANT_SIZES.items():
+            key = variant_key(original_key, size)
+            if default_storage.exists(key):
+                default_storage.delete(key)
+            variants[name] = default_storage.save(key, ContentFile(render_variant(image, size)))
+    return variants
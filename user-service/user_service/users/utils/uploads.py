@@ -0,0 +1,84 @@
+import uuid
+
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+
+UPLOAD_TOKEN_SALT = "users.profile-image-upload"
+
+
+class UploadVerificationError(Exception):
+    pass
+
+
+def _s3_client():
+    # S3Boto3Storage already holds a configured client; reuse it
+    return default_storage.connection.meta.client
+
+
+def create_profile_image_upload(content_type):
+    """
+    Builds a presigned POST policy that lets the browser upload a profile
+    image straight to the bucket. The policy pins the key and content type
+    and caps the size, so the client can upload exactly one object of the
+    declared type.
+
+    Returns:
+        {"url", "fields", "key", "upload_token"}; the client posts `fields`
+        plus the file to `url`, then registers with `upload_token`.
+    """
+    extension = settings.PROFILE_IMAGE_CONTENT_TYPES[content_type]
+    key = f"{settings.PROFILE_IMAGE_UPLOAD_PREFIX}{uuid.uuid4().hex}.{extension}"
+
+    post = _s3_client().generate_presigned_post(
+        Bucket=default_storage.bucket_name,
+        Key=key,
+        Fields={"Content-Type": content_type},
+        Conditions=[
+            {"Content-Type": content_type},
+            ["content-length-range", 1, settings.PROFILE_IMAGE_MAX_BYTES],
+        ],
+        ExpiresIn=settings.PROFILE_IMAGE_UPLOAD_EXPIRES,
+    )
+    return {
+        "url": post["url"],
+        "fields": post["fields"],
+        "key": key,
+        # Signed so registration can only claim keys this endpoint issued
+        "upload_token": signing.dumps(key, salt=UPLOAD_TOKEN_SALT),
+    }
+
+
+def verify_profile_image_upload(upload_token):
+    """
+    Checks an upload token from create_profile_image_upload and confirms the
+    object really landed in the bucket within the allowed size and type.
+
+    Returns:
+        The storage key of the uploaded image.
+
+    Raises:
+        UploadVerificationError if the token is invalid or expired, or the
+        object is missing or does not match the policy.
+    """
+    try:
+        # Tokens outlive the POST policy a little so a slow upload can finish
+        key = signing.loads(
+            upload_token,
+            salt=UPLOAD_TOKEN_SALT,
+            max_age=settings.PROFILE_IMAGE_UPLOAD_EXPIRES * 2,
+        )
+    except signing.BadSignature:
+        raise UploadVerificationError("Invalid or expired profile image upload token.")
+
+    try:
+        head = _s3_client().head_object(Bucket=default_storage.bucket_name, Key=key)
+    except ClientError:
+        raise UploadVerificationError("Profile image has not been uploaded.")
+
+    if head["ContentLength"] > settings.PROFILE_IMAGE_MAX_BYTES:
+        raise UploadVerificationError("Profile image is too large.")
+    if head.get("ContentType") not in settings.PROFILE_IMAGE_CONTENT_TYPES:
+        raise UploadVerificationError("Unsupported profile image type.")
+    return key
@@ -8,9 +8,15 @@ import jwt
 import os
 from .rabbitmq.sender_users import publish_user_created
 from .rabbitmq.sender_skill_created import publish_skill_created_event
+from .rabbitmq.sender_image_variants import publish_image_variants_job
 from .serializers import UserDetailSerializer, CustomUserDetailSerializer
 from django.core.files.storage import default_storage
 from rest_framework.exceptions import NotFound
+from django.conf import settings
+from .utils.uploads import UploadVerificationError, create_profile_image_upload, verify_profile_image_upload
+from .utils.export import export_skills, export_users
+from django.http import StreamingHttpResponse
+import hmac
 
 class LoginView(APIView):
     def post(self, request):
@@ -41,9 +47,20 @@ class RegisterView(APIView):
         
         skills_names = request.POST.getlist("skills")
         profile_image_file = request.FILES.get("profile_image")
+        profile_image_upload = request.data.get("profile_image_upload")
         print('check 1')
         if CustomUser.objects.filter(email=email).exists():
             return Response({"error": "Email already registered."}, status=400)
+
+        # Images uploaded straight to the bucket are referenced by their
+        # upload token; a multipart file is still accepted as a fallback
+        if profile_image_upload:
+            try:
+                profile_image_file = verify_profile_image_upload(profile_image_upload)
+            except UploadVerificationError as e:
+                return Response({"error": str(e)}, status=400)
+            if CustomUser.objects.filter(profile_image=profile_image_file).exists():
+                return Response({"error": "Profile image upload already used."}, status=400)
         print('check 2')
         valid_skills = []
         for skill_name in skills_names:
@@ -66,6 +83,9 @@ class RegisterView(APIView):
         
         user.skills.set(valid_skills)
         publish_user_created(user)
+        if user.profile_image:
+            # Thumbnails are generated in the background
+            publish_image_variants_job(user)
         print('check 5')
         token = generate_jwt(user)
         return Response({
@@ -81,6 +101,26 @@ class RegisterView(APIView):
 
 
 
+class ProfileImageUploadIntentView(APIView):
+    """
+    POST /api/register/profile-image/
+    Body: {"content_type": "image/jpeg"}
+    Returns a presigned POST for uploading the image directly to S3, and the
+    upload_token to pass to RegisterView as `profile_image_upload`.
+    """
+    def post(self, request):
+        content_type = request.data.get("content_type")
+        if content_type not in settings.PROFILE_IMAGE_CONTENT_TYPES:
+            return Response(
+                {"error": f"content_type must be one of: {', '.join(settings.PROFILE_IMAGE_CONTENT_TYPES)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        upload = create_profile_image_upload(content_type)
+        upload["max_bytes"] = settings.PROFILE_IMAGE_MAX_BYTES
+        return Response(upload, status=status.HTTP_201_CREATED)
+
+
 class VerifyUser(APIView):
     def get(self, request):
         try:
@@ -149,3 +189,31 @@ class PublicUserDetailView(APIView):
         except CustomUser.DoesNotExist:
             raise NotFound("User not found.")
 
+
+class ReplicaExportView(APIView):
+    """
+    GET /api/export/users/?after=<id>&limit=<n> (and /api/export/skills/)
+    Streams rows with id > after in id order as NDJSON, for services that
+    keep a replica of users and skills. Resume with the last id received.
+    Requires `Authorization: Bearer <REPLICA_EXPORT_TOKEN>`.
+    """
+    authentication_classes = []
+    exporters = {"users": export_users, "skills": export_skills}
+
+    def get(self, request, kind):
+        # Step 1: Only other services holding the export token may read
+        expected = settings.REPLICA_EXPORT_TOKEN
+        provided = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not expected or not hmac.compare_digest(provided.encode(), expected.encode()):
+            return Response({"error": "Invalid export token."}, status=status.HTTP_403_FORBIDDEN)
+
+        # Step 2: Parse the keyset position and page size
+        try:
+            after = int(request.query_params.get("after", 0))
+            limit = int(request.query_params.get("limit", settings.REPLICA_EXPORT_MAX_PAGE))
+        except ValueError:
+            return Response({"error": "after and limit must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.REPLICA_EXPORT_MAX_PAGE))
+
+        # Step 3: Stream the page without building it in memory
+        return StreamingHttpResponse(self.exporters[kind](after, limit), content_type="application/x-ndjson")